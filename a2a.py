@@ -7,6 +7,7 @@ Provides the A2AServerConfig class for A2A server integration and the send_a2a_t
 import requests
 import uuid
 import httpx
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,13 +15,21 @@ logger = logging.getLogger(__name__)
 class A2AServerConfig:
     """
     Represents an A2A server configuration for tool integration.
-    Provides methods to list available tools and connect (no-op).
+    Provides methods to list available tools, connect (no-op) and cleanup, which closes the pooled HTTP client.
     """
     def __init__(self, base_url, headers, name):
         self.type = "a2a"
         self.base_url = base_url
         self.headers = headers
         self.name = name
+        self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """HTTP client shared by this server's requests, so connections are reused."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=10)
+        return self._client
 
     async def list_tools(self):
         """
@@ -28,11 +37,8 @@ class A2AServerConfig:
         Returns a list of skills.
         """
         agent_card_url = f"{self.base_url}/.well-known/agent.json"
-        if self.headers and "Authorization" in self.headers:
-            logger.debug(f"A2A list_tools Authorization header: {self.headers['Authorization']}")
-            print(f"A2A list_tools Authorization header: {self.headers['Authorization']}")
-        async with httpx.AsyncClient() as client:
-            response = await client.get(agent_card_url, headers=self.headers, timeout=10)
+        logger.debug("A2A list_tools for %s (authenticated: %s)", self.name, bool(self.headers and "Authorization" in self.headers))
+        response = await self.client.get(agent_card_url, headers=self.headers)
         if response.status_code != 200:
             raise RuntimeError(f"Failed to get agent card: {response.status_code}")
         agent_card = response.json()
@@ -44,20 +50,40 @@ class A2AServerConfig:
         """
         return
 
-def send_a2a_task(agent_base_url, user_text, headers=None):
-    """
-    Send a task to an A2A agent and return the agent's reply as text.
-    Raises RuntimeError on failure or incomplete response.
-    """
-    if headers and "Authorization" in headers:
-        logger.debug(f"A2A send_a2a_task Authorization header: {headers['Authorization']}")
-        print(f"A2A send_a2a_task Authorization header: {headers['Authorization']}")
-    agent_card_url = f"{agent_base_url}/.well-known/agent.json"
-    response = requests.get(agent_card_url, headers=headers, timeout=10)
-    if response.status_code != 200:
-        raise RuntimeError(f"Failed to get agent card: {response.status_code}")
-    # agent_card = response.json()  # Not used further
+    async def send_task(self, user_text, timeout=10):
+        """
+        Send a task and return the agent's reply as text. If the caller is cancelled (the user interrupted),
+        the task is cancelled on the A2A server with tasks/cancel.
+        Raises RuntimeError on failure.
+        """
+        logger.debug("A2A send_task to %s (authenticated: %s)", self.name, bool(self.headers and "Authorization" in self.headers))
+        task_id, jsonrpc_payload = _task_request(user_text)
+        try:
+            result = await self.client.post(f"{self.base_url}/tasks/send", json=jsonrpc_payload,
+                                            headers=self.headers, timeout=timeout)
+        except asyncio.CancelledError:
+            await self.cancel_task(task_id)
+            raise
+        if result.status_code != 200:
+            raise RuntimeError(f"Task request failed: {result.status_code}, {result.text}")
+        return _reply_text(result.json())
+
+    async def cancel_task(self, task_id):
+        """Ask the A2A server to stop working on a task. Best effort."""
+        payload = {"jsonrpc": "2.0", "id": str(uuid.uuid4()), "method": "tasks/cancel", "params": {"id": task_id}}
+        try:
+            await self.client.post(f"{self.base_url}/tasks/cancel", json=payload, headers=self.headers, timeout=2)
+        except Exception as e:
+            logger.debug("A2A tasks/cancel to %s failed: %r", self.name, e)
 
+    async def cleanup(self):
+        """Close pooled connections to the A2A server."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+def _task_request(user_text):
+    """Build a tasks/send JSON-RPC request. Returns (task id, payload)."""
     task_id = str(uuid.uuid4())
     session_id = str(uuid.uuid4())
     task_payload = {
@@ -77,12 +103,10 @@ def send_a2a_task(agent_base_url, user_text, headers=None):
         "method": "tasks/send",
         "params": task_payload
     }
+    return task_id, jsonrpc_payload
 
-    tasks_send_url = f"{agent_base_url}/tasks/send"
-    result = requests.post(tasks_send_url, json=jsonrpc_payload, headers=headers, timeout=10)
-    if result.status_code != 200:
-        raise RuntimeError(f"Task request failed: {result.status_code}, {result.text}")
-    task_response = result.json()
+def _reply_text(task_response):
+    """Extract the agent's reply from a tasks/send response."""
     result_obj = task_response.get("result", {})
 
     if result_obj.get("status", {}).get("state") == "completed":
@@ -100,4 +124,24 @@ def send_a2a_task(agent_base_url, user_text, headers=None):
         else:
             return "No messages in response!"
     else:
-        return f"Task did not complete. Status: {result_obj.get('status')}" 
\ No newline at end of file
+        return f"Task did not complete. Status: {result_obj.get('status')}"
+
+def send_a2a_task(agent_base_url, user_text, headers=None):
+    """
+    Send a task to an A2A agent and return the agent's reply as text.
+    Raises RuntimeError on failure or incomplete response.
+    Blocking; agent code uses A2AServerConfig.send_task instead.
+    """
+    logger.debug("A2A send_a2a_task to %s (authenticated: %s)", agent_base_url, bool(headers and "Authorization" in headers))
+    agent_card_url = f"{agent_base_url}/.well-known/agent.json"
+    response = requests.get(agent_card_url, headers=headers, timeout=10)
+    if response.status_code != 200:
+        raise RuntimeError(f"Failed to get agent card: {response.status_code}")
+    # agent_card = response.json()  # Not used further
+
+    _, jsonrpc_payload = _task_request(user_text)
+    tasks_send_url = f"{agent_base_url}/tasks/send"
+    result = requests.post(tasks_send_url, json=jsonrpc_payload, headers=headers, timeout=10)
+    if result.status_code != 200:
+        raise RuntimeError(f"Task request failed: {result.status_code}, {result.text}")
+    return _reply_text(result.json())
@@ -0,0 +1,81 @@
+"""
+a2a_fanout.py
+
+Provides the A2AFanout server type: one tool that sends the same prompt to a group of A2A agents concurrently and
+merges their replies. Replies that arrive within the deadline are merged; agents that are slower are cancelled
+and noted in the merged reply, so one slow agent can't hold up the others.
+"""
+
+import time
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+
+from metrics import A2A_FANOUT_REPLIES
+
+logger = logging.getLogger(__name__)
+
+
+def merge_replies(results: List[Tuple[str, str, Optional[str]]], deadline: float) -> str:
+    """
+    Merge (agent name, status, reply) results into one text, one section per agent.
+    status is 'ok', 'timeout' or 'error' (reply then holds the error).
+    """
+    sections = []
+    for name, status, reply in results:
+        if status == "ok":
+            sections.append(f"[{name}]\n{reply}")
+        elif status == "timeout":
+            sections.append(f"[{name}] No reply within {deadline:g} seconds.")
+        else:
+            sections.append(f"[{name}] Failed: {reply}")
+    return "\n\n".join(sections)
+
+
+class A2AFanout:
+    """
+    A group of A2A servers exposed as a single tool.
+    Members are A2AServerConfig instances (anything with `name` and an async `send_task(text)`).
+    """
+
+    def __init__(self, name: str, members: List, deadline: float = 10.0, description: Optional[str] = None):
+        self.type = "a2a_fanout"
+        self.name = name
+        self.members = members
+        self.deadline = deadline
+        self.description = description or (
+            "Ask these agents at the same time and get all their answers: " + ", ".join(m.name for m in members)
+        )
+
+    async def send_task(self, user_text: str) -> str:
+        started = time.perf_counter()
+        tasks = {asyncio.ensure_future(member.send_task(user_text)): member for member in self.members}
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=self.deadline)
+        finally:
+            # Slow members (or all of them, if the caller is cancelled) are cancelled on their servers
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        results = []
+        for task, member in tasks.items():
+            if task in pending:
+                results.append((member.name, "timeout", None))
+            elif task.exception() is not None:
+                results.append((member.name, "error", str(task.exception())))
+            else:
+                results.append((member.name, "ok", task.result()))
+            A2A_FANOUT_REPLIES.inc(fanout=self.name, status=results[-1][1])
+        logger.info(f"A2A fan-out {self.name}: {sum(r[1] == 'ok' for r in results)}/{len(results)} replies "
+                    f"in {time.perf_counter() - started:.2f}s")
+        return merge_replies(results, self.deadline)
+
+    async def connect(self):
+        """No-op: members hold their own connections."""
+        return
+
+    async def cleanup(self):
+        """No-op: members are cleaned up as servers of their own."""
+        return
@@ -5,10 +5,15 @@ Defines the FunctionAgent class, a LiveKit agent that uses MCP tools from one or
 """
 
 import os
+import time
 import logging
-from livekit.agents.voice import Agent
+from livekit.agents import NOT_GIVEN
+from livekit.agents.voice import Agent, ModelSettings
 from livekit.agents.llm import ChatChunk
 from livekit.plugins import openai, silero, elevenlabs
+from answer_cache import answer_cache_from_env
+from preemptive import preemptive_from_env
+from tracing import tracer
 
 class FunctionAgent(Agent):
     """
@@ -19,7 +24,11 @@ class FunctionAgent(Agent):
     user feedback when a tool call is detected.
     """
 
-    def __init__(self):
+    def __init__(self, *, stt=NOT_GIVEN, llm=NOT_GIVEN, tts=NOT_GIVEN, vad=NOT_GIVEN, tenant=None):
+        """
+        Plugins not passed in are built from the environment (OpenAI STT/LLM, ElevenLabs TTS, Silero VAD);
+        the benchmarks pass fakes to run the pipeline headless. `tenant` scopes the shared answer cache.
+        """
         # Load system prompt from file if present, else from env, else use a minimal default
         prompt_path = os.environ.get("AGENT_SYSTEM_PROMPT_FILE", "system_prompt.txt")
         if os.path.exists(prompt_path):
@@ -27,36 +36,95 @@ class FunctionAgent(Agent):
                 instructions = f.read()
         else:
             instructions = os.environ.get("AGENT_SYSTEM_PROMPT", "You are a helpful assistant communicating through voice. Use the available MCP tools to answer questions.")
+        if llm is NOT_GIVEN:
+            llm = self._llm_from_env()
+        if stt is NOT_GIVEN:
+            # Realtime transcription produces the interim transcripts preemptive generation needs
+            stt = openai.STT(use_realtime=True) if os.environ.get("AGENT_STT_REALTIME") == "1" else openai.STT()
+        if tts is NOT_GIVEN:
+            tts = elevenlabs.TTS(voice_id="IRHApOXLvnW57QJPQH2P")
+        if vad is NOT_GIVEN:
+            vad = silero.VAD.load()
+        super().__init__(
+            instructions=instructions,
+            stt=stt,
+            llm=llm,
+            tts=tts,
+            vad=vad,
+            allow_interruptions=True
+        )
+        self._answer_cache = answer_cache_from_env(tenant)
+        self._preemptive = preemptive_from_env(
+            generate=lambda chat_ctx: Agent.default.llm_node(self, chat_ctx, self.tools, ModelSettings()),
+            chat_ctx_provider=lambda: self.chat_ctx,
+        )
+
+    @staticmethod
+    def _llm_from_env():
         # Make LLM model and backend configurable via env var
         llm_model = os.environ.get("AGENT_LLM_MODEL", "gpt-4.1-mini")
-        llm_backend = os.environ.get("AGENT_LLM_BACKEND", "openai")  # 'openai' or 'ollama'
+        llm_backend = os.environ.get("AGENT_LLM_BACKEND", "openai")  # 'openai', 'ollama' or 'router'
         if llm_backend == "ollama":
-            llm = openai.LLM.with_ollama(
+            return openai.LLM.with_ollama(
                 model=llm_model,
                 base_url=os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434/v1"),
             )
-        else:
-            llm = openai.LLM(model=llm_model, timeout=60)
-        super().__init__(
-            instructions=instructions,
-            stt=openai.STT(),
-            llm=llm,
-            tts=elevenlabs.TTS(voice_id="IRHApOXLvnW57QJPQH2P"),
-            vad=silero.VAD.load(),
-            allow_interruptions=True
-        )
+        if llm_backend == "router":
+            # Simple turns go to the local Ollama model, multi-step turns to the cloud model
+            from llm_router import router_from_env
+            return router_from_env(
+                cloud_llm=openai.LLM(model=llm_model, timeout=60),
+                local_llm=openai.LLM.with_ollama(
+                    model=os.environ.get("AGENT_LOCAL_LLM_MODEL", "llama3.2"),
+                    base_url=os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434/v1"),
+                ),
+            )
+        return openai.LLM(model=llm_model, timeout=60)
+
+    async def on_enter(self):
+        if self._preemptive is not None:
+            self._preemptive.attach(self.session)
+
+    async def on_exit(self):
+        if self._preemptive is not None:
+            self._preemptive.detach()
+            logging.info(f"Preemptive generation stats: {self._preemptive.stats.summary()}")
+
+    async def on_user_turn_completed(self, turn_ctx, new_message):
+        # Everything that happens for this turn (LLM, tools, TTS) shares one trace
+        tracer.begin_turn()
 
     async def llm_node(self, chat_ctx, tools, model_settings):
-        """Override the llm_node to say a message when a tool call is detected."""
+        """Override the llm_node to say a message when a tool call is detected and to replay cached answers."""
         activity = self._activity
         tool_call_detected = False
+        started = time.perf_counter()
+        first_chunk = True
 
-        # Get the original response from the parent class
-        async for chunk in super().llm_node(chat_ctx, tools, model_settings):
+        cache_turn = self._answer_cache.begin_turn(chat_ctx) if self._answer_cache else None
+        if cache_turn is not None and cache_turn.cached_text is not None:
+            logging.info("Answering from the answer cache")
+            yield cache_turn.cached_text
+            return
+
+        # Continue a matching speculative generation, else get the original response from the parent class
+        source = self._preemptive.take(chat_ctx) if self._preemptive else None
+        if source is None:
+            source = super().llm_node(chat_ctx, tools, model_settings)
+        async for chunk in source:
             # Check if this chunk contains a tool call
             if isinstance(chunk, ChatChunk) and chunk.delta and chunk.delta.tool_calls and not tool_call_detected:
                 # Say the checking message only once when we detect the first tool call
                 tool_call_detected = True
                 activity.say("Sure, I'll check that for you.")
 
-            yield chunk 
\ No newline at end of file
+            if first_chunk:
+                first_chunk = False
+                tracer.record("llm.first_token", time.perf_counter() - started)
+            if cache_turn is not None:
+                cache_turn.observe_chunk(chunk)
+            yield chunk
+
+        tracer.record("llm", time.perf_counter() - started, tool_call=tool_call_detected)
+        if cache_turn is not None:
+            cache_turn.finish() 
\ No newline at end of file
@@ -0,0 +1,289 @@
+"""
+answer_cache.py
+
+Provides a turn-level answer cache keyed by the normalized user utterance and the versions of the tool
+results the answer depended on, so repeated questions can be answered without an LLM call.
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Pattern
+
+from utils import normalize_utterance
+
+logger = logging.getLogger(__name__)
+
+# Lookups by result across every cache in the process, for the metrics collector
+_totals: Dict[str, int] = {"hit": 0, "miss": 0}
+
+# Tool names that change remote state; running one invalidates every cached answer
+DEFAULT_MUTATING_PATTERN = re.compile(
+    r"^(create|add|update|edit|set|delete|remove|move|archive|unarchive|close|reopen|assign|"
+    r"unassign|rename|copy|attach|mark|post|put|patch|send|upload)",
+    re.IGNORECASE,
+)
+
+
+def _canonical_arguments(arguments: Optional[str]) -> str:
+    if not arguments:
+        return "{}"
+    try:
+        return json.dumps(json.loads(arguments), sort_keys=True, separators=(",", ":"))
+    except (TypeError, ValueError):
+        return arguments
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ToolResultVersions:
+    """
+    Tracks a version number per (tool, arguments) pair.
+    The version only changes when a refreshed result differs from the previous one.
+    """
+
+    def __init__(self):
+        self._versions: Dict[str, tuple] = {}
+
+    @staticmethod
+    def key(tool_name: str, arguments: Optional[str]) -> str:
+        return f"{tool_name}:{_canonical_arguments(arguments)}"
+
+    def record(self, key: str, output: str) -> bool:
+        """
+        Record a tool result.
+        Returns True if the result changed since it was last seen.
+        """
+        digest = _digest(output or "")
+        previous = self._versions.get(key)
+        if previous is None:
+            self._versions[key] = (1, digest)
+            return False
+        version, previous_digest = previous
+        if previous_digest == digest:
+            return False
+        self._versions[key] = (version + 1, digest)
+        return True
+
+    def current(self, key: str) -> Optional[int]:
+        entry = self._versions.get(key)
+        return entry[0] if entry else None
+
+
+@dataclass
+class CachedAnswer:
+    text: str
+    deps: Dict[str, int]
+    created_at: float = field(default_factory=time.monotonic)
+
+
+class AnswerCache:
+    """
+    LRU cache of final answers.
+
+    Entries are keyed by the normalized utterance and a fingerprint of the previous assistant message,
+    and carry the versions of the tool results they were generated from. An entry is dropped when one
+    of those results is refreshed with different content, when a mutating tool runs, or after `ttl`.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float = 300.0,
+                 mutating_pattern: Pattern = DEFAULT_MUTATING_PATTERN):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.mutating_pattern = mutating_pattern
+        self.versions = ToolResultVersions()
+        self._entries: "OrderedDict[str, CachedAnswer]" = OrderedDict()
+        self._seen_calls: "OrderedDict[str, None]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(utterance: str, context: str = "") -> str:
+        return f"{normalize_utterance(utterance)}|{_digest(normalize_utterance(context))[:16]}"
+
+    def is_mutating(self, tool_name: str) -> bool:
+        return bool(self.mutating_pattern.match(tool_name or ""))
+
+    def lookup(self, key: str) -> Optional[str]:
+        """
+        Returns the cached answer for the key if it is still valid, else None.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self._count("miss")
+            return None
+        stale = time.monotonic() - entry.created_at > self.ttl or any(
+            self.versions.current(dep) != version for dep, version in entry.deps.items()
+        )
+        if stale:
+            del self._entries[key]
+            self._count("miss")
+            return None
+        self._entries.move_to_end(key)
+        self._count("hit")
+        return entry.text
+
+    def _count(self, result: str) -> None:
+        if result == "hit":
+            self.hits += 1
+        else:
+            self.misses += 1
+        _totals[result] += 1
+
+    def store(self, key: str, text: str, deps: Dict[str, int]) -> None:
+        self._entries[key] = CachedAnswer(text=text, deps=dict(deps))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate_all(self) -> None:
+        if self._entries:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def invalidate_dependents(self, dep: str) -> None:
+        stale = [key for key, entry in self._entries.items() if dep in entry.deps]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+
+    def observe_tool_result(self, call_id: str, tool_name: str, arguments: Optional[str], output: str) -> None:
+        """
+        Feed a tool result into the cache. Each call_id is processed once.
+        """
+        if call_id in self._seen_calls:
+            return
+        self._seen_calls[call_id] = None
+        while len(self._seen_calls) > 4 * self.max_entries:
+            self._seen_calls.popitem(last=False)
+
+        if self.is_mutating(tool_name):
+            logger.debug(f"Mutating tool '{tool_name}' ran, invalidating cached answers")
+            self.invalidate_all()
+            return
+        dep = ToolResultVersions.key(tool_name, arguments)
+        if self.versions.record(dep, output):
+            self.invalidate_dependents(dep)
+
+    def begin_turn(self, chat_ctx) -> "CacheTurn":
+        """
+        Inspect the chat context for one llm_node call.
+        Returns a CacheTurn that holds the cached answer (if any) and collects the new answer.
+        """
+        return CacheTurn(self, chat_ctx)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+
+class CacheTurn:
+    """State for a single llm_node call against the answer cache."""
+
+    def __init__(self, cache: AnswerCache, chat_ctx):
+        self.cache = cache
+        self.key: Optional[str] = None
+        self.cached_text: Optional[str] = None
+        self.deps: Dict[str, int] = {}
+        self.cacheable = True
+        self._text: List[str] = []
+        self._has_tool_calls = False
+
+        items = list(chat_ctx.items)
+        user_index = None
+        for i in range(len(items) - 1, -1, -1):
+            item = items[i]
+            if getattr(item, "type", None) == "message" and item.role == "user":
+                user_index = i
+                break
+        if user_index is None:
+            self.cacheable = False
+            return
+
+        context = ""
+        for item in reversed(items[:user_index]):
+            if getattr(item, "type", None) == "message" and item.role == "assistant":
+                context = item.text_content or ""
+                break
+        self.key = cache.make_key(items[user_index].text_content or "", context)
+
+        calls = {}
+        turn_items = items[user_index + 1:]
+        for item in turn_items:
+            item_type = getattr(item, "type", None)
+            if item_type == "function_call":
+                calls[item.call_id] = item
+            elif item_type == "function_call_output":
+                call = calls.get(item.call_id)
+                arguments = call.arguments if call is not None else None
+                if item.is_error:
+                    self.cacheable = False
+                    continue
+                cache.observe_tool_result(item.call_id, item.name, arguments, item.output)
+                if cache.is_mutating(item.name):
+                    self.cacheable = False
+                    continue
+                dep = ToolResultVersions.key(item.name, arguments)
+                self.deps[dep] = cache.versions.current(dep)
+
+        # Only a fresh turn (nothing after the user message yet) can be answered from cache
+        if not turn_items:
+            self.cached_text = cache.lookup(self.key)
+
+    def observe_chunk(self, chunk) -> None:
+        if isinstance(chunk, str):
+            self._text.append(chunk)
+            return
+        delta = getattr(chunk, "delta", None)
+        if delta is None:
+            return
+        if getattr(delta, "tool_calls", None):
+            self._has_tool_calls = True
+        if getattr(delta, "content", None):
+            self._text.append(delta.content)
+
+    def finish(self) -> None:
+        """Store the generated answer if it was a final, tool-backed, read-only answer."""
+        text = "".join(self._text).strip()
+        if not (self.cacheable and self.key and self.deps and text) or self._has_tool_calls:
+            return
+        self.cache.store(self.key, text, self.deps)
+
+
+# Shared caches by tenant, so an answer built from one tenant's boards is never replayed to another
+_shared_caches: Dict[Optional[str], AnswerCache] = {}
+
+
+def answer_cache_from_env(tenant: Optional[str] = None) -> Optional[AnswerCache]:
+    """
+    Returns an AnswerCache if AGENT_ANSWER_CACHE is enabled, else None.
+    With AGENT_ANSWER_CACHE_SCOPE=session (the default) every call returns a new cache, so an agent only replays
+    answers within its own conversation and never serves one built before another user changed the data.
+    AGENT_ANSWER_CACHE_SCOPE=shared returns the process-wide cache of `tenant`.
+    """
+    if os.environ.get("AGENT_ANSWER_CACHE", "0").lower() not in ("1", "true", "yes"):
+        return None
+    if os.environ.get("AGENT_ANSWER_CACHE_SCOPE", "session") != "shared":
+        return _cache_from_env()
+    if tenant not in _shared_caches:
+        _shared_caches[tenant] = _cache_from_env()
+    return _shared_caches[tenant]
+
+
+def _cache_from_env() -> AnswerCache:
+    return AnswerCache(
+        max_entries=int(os.environ.get("AGENT_ANSWER_CACHE_SIZE", "256")),
+        ttl=float(os.environ.get("AGENT_ANSWER_CACHE_TTL", "60")),
+    )
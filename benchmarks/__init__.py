@@ -0,0 +1,6 @@
+"""
+benchmarks
+
+Load and latency benchmarks for the MCP, A2A and voice pipeline layers, driven against local stand-in servers.
+Run a benchmark with `python -m benchmarks.<name> --help`.
+"""
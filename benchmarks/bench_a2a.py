@@ -0,0 +1,103 @@
+"""
+benchmarks/bench_a2a.py
+
+Benchmarks A2A tool invocations through the tools generated by filtered_prepare_dynamic_tools, against the
+async fake A2A server (or example/a2a-server.py with --example): list_tools time, then requests/s, tail
+latency and event-loop blocking at rising concurrency.
+
+    python -m benchmarks.bench_a2a --latency-ms 50 --concurrency 1,4,16,64 --output bench_a2a.jsonl
+"""
+
+import time
+import asyncio
+import logging
+import argparse
+
+from a2a import A2AServerConfig
+from tool_integration import filtered_prepare_dynamic_tools
+from benchmarks.common import LoopLagProbe, parse_levels, run_metadata, summarize, write_results
+from benchmarks.fake_a2a_server import FakeA2AOptions, running_example_server, running_fake_a2a_server
+
+
+async def bench_list_tools(server: A2AServerConfig, iterations: int) -> dict:
+    latencies = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        await server.list_tools()
+        latencies.append(time.perf_counter() - started)
+    return summarize(latencies)
+
+
+async def bench_invoke(tool, concurrency: int, calls: int) -> dict:
+    """
+    Call the tool `calls` times from `concurrency` callers. Only successful calls are timed.
+    Raises RuntimeError when every call fails, so a broken setup doesn't pass for a result.
+    """
+    latencies, errors = [], []
+    remaining = calls
+
+    async def caller():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                await tool(prompt="What's due today?")
+            except Exception as e:
+                errors.append(e)
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    probe = LoopLagProbe().start()
+    started = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    loop_lag = await probe.stop()
+    if not latencies:
+        raise RuntimeError(f"All {calls} A2A tool calls failed at concurrency {concurrency}: {errors[0]!r}")
+    if errors:
+        logging.warning(f"{len(errors)}/{calls} A2A tool calls failed at concurrency {concurrency}: {errors[0]!r}")
+    return {"concurrency": concurrency, "errors": len(errors), **summarize(latencies, wall), "loop_lag": loop_lag}
+
+
+async def run_against(base_url: str, args) -> dict:
+    results = {}
+    server = A2AServerConfig(base_url=base_url, headers={}, name="bench-a2a")
+    results["list_tools"] = await bench_list_tools(server, args.iterations)
+    tools = await filtered_prepare_dynamic_tools([server], {})
+    if not tools:
+        raise RuntimeError(f"A2A agent at {base_url} exposes no skills")
+    results["invoke"] = []
+    for level in parse_levels(args.concurrency):
+        results["invoke"].append(await bench_invoke(tools[0], level, max(args.calls, level * 4)))
+    return results
+
+
+async def run(args) -> dict:
+    results = run_metadata("a2a", vars(args))
+    if args.example:
+        async with running_example_server(args.example_port) as base_url:
+            results.update(await run_against(base_url, args))
+    else:
+        async with running_fake_a2a_server(FakeA2AOptions(args.skills, args.latency_ms)) as base_url:
+            results.update(await run_against(base_url, args))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skills", type=int, default=3, help="Number of skills the fake server exposes")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Server-side latency per task")
+    parser.add_argument("--example", action="store_true", help="Benchmark example/a2a-server.py instead")
+    parser.add_argument("--example-port", type=int, default=5001, help="Port example/a2a-server.py listens on")
+    parser.add_argument("--concurrency", default="1,4,16,64", help="Comma-separated concurrent caller counts")
+    parser.add_argument("--calls", type=int, default=200, help="Tool calls per concurrency level (at least 4 per caller)")
+    parser.add_argument("--iterations", type=int, default=5, help="Repetitions for list_tools")
+    parser.add_argument("--output", default="-", help="Output file (.json overwrites, .jsonl appends, - for stdout)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    write_results(asyncio.run(run(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
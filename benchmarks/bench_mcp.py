@@ -0,0 +1,117 @@
+"""
+benchmarks/bench_mcp.py
+
+Benchmarks the MCP client stack (MCPServerSse, MCPClient with HMAC middleware, MCPUtil tool wrappers)
+against the in-process fake MCP SSE server: connect time, uncached list_tools time, and call_tool
+throughput and tail latency at rising concurrency.
+
+    python -m benchmarks.bench_mcp --concurrency 1,4,16,64,256 --output bench_mcp.jsonl
+"""
+
+import time
+import base64
+import asyncio
+import logging
+import argparse
+
+from mcp_client import MCPClient, MCPServerSse
+from mcp_client.util import MCPUtil
+from benchmarks.common import parse_levels, run_metadata, summarize, write_results
+from benchmarks.fake_mcp_server import FakeServerOptions, running_fake_mcp_server
+
+SECRET_KEY = base64.b64encode(b"benchmark-secret").decode()
+
+
+def make_server(url: str, use_auth: bool) -> MCPServerSse:
+    if use_auth:
+        return MCPClient(url=url, secret_key=SECRET_KEY, name="bench").server
+    return MCPServerSse(params={"url": url}, cache_tools_list=True, name="bench")
+
+
+async def bench_connect(url: str, iterations: int, use_auth: bool) -> dict:
+    latencies = []
+    for _ in range(iterations):
+        server = make_server(url, use_auth)
+        started = time.perf_counter()
+        await server.connect()
+        latencies.append(time.perf_counter() - started)
+        await server.cleanup()
+    return summarize(latencies)
+
+
+async def bench_list_tools(server: MCPServerSse, iterations: int) -> dict:
+    latencies = []
+    for _ in range(iterations):
+        server.invalidate_tools_cache()
+        started = time.perf_counter()
+        await server.list_tools()
+        latencies.append(time.perf_counter() - started)
+    return summarize(latencies)
+
+
+async def bench_call_tool(server: MCPServerSse, concurrency: int, calls: int) -> dict:
+    tool = (await server.list_tools())[0]
+    function_tool = MCPUtil.to_function_tool(tool, server, convert_schemas_to_strict=True)
+    latencies, errors = [], 0
+    remaining = calls
+
+    async def caller():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            result = await function_tool.on_invoke_tool(None, '{"query": "cards due today", "limit": null}')
+            latencies.append(time.perf_counter() - started)
+            # Transport errors come back as "Error calling tool ...", server-side failures as an isError result
+            if result.startswith("Error calling tool") or "Injected failure" in result:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+    return {"concurrency": concurrency, "errors": errors, **summarize(latencies, wall)}
+
+
+async def run(args) -> dict:
+    options = FakeServerOptions(
+        tool_count=args.tools,
+        payload_bytes=args.payload_bytes,
+        latency_ms=args.latency_ms,
+        failure_rate=args.failure_rate,
+    )
+    results = run_metadata("mcp", vars(args))
+    async with running_fake_mcp_server(options) as url:
+        results["connect"] = await bench_connect(url, args.iterations, args.auth)
+        server = make_server(url, args.auth)
+        # Failures are part of the measurement; don't let retries hide them behind retry_delay
+        server.max_retries = 1
+        await server.connect()
+        try:
+            results["list_tools"] = await bench_list_tools(server, args.iterations)
+            results["call_tool"] = []
+            for level in parse_levels(args.concurrency):
+                calls = max(args.calls, level * 4)
+                results["call_tool"].append(await bench_call_tool(server, level, calls))
+        finally:
+            await server.cleanup()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tools", type=int, default=50, help="Number of tools the fake server exposes")
+    parser.add_argument("--payload-bytes", type=int, default=2048, help="Size of each tool result")
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="Server-side latency per tool call")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of tool calls that fail")
+    parser.add_argument("--concurrency", default="1,4,16,64,256", help="Comma-separated concurrent caller counts")
+    parser.add_argument("--calls", type=int, default=500, help="Tool calls per concurrency level (at least 4 per caller)")
+    parser.add_argument("--iterations", type=int, default=5, help="Repetitions for connect and list_tools")
+    parser.add_argument("--no-auth", dest="auth", action="store_false", help="Skip the HMAC auth middleware")
+    parser.add_argument("--output", default="-", help="Output file (.json overwrites, .jsonl appends, - for stdout)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    write_results(asyncio.run(run(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
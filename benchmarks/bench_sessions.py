@@ -0,0 +1,171 @@
+"""
+benchmarks/bench_sessions.py
+
+Headless voice-pipeline load generator: runs N simultaneous AgentSessions of FunctionAgent in one process,
+with fake STT/LLM/TTS plugins and real MCP tool calls against the in-process fake MCP server, and reports
+CPU, memory, event-loop lag and per-turn latency (end of user speech to first agent audio) as N grows.
+
+    python -m benchmarks.bench_sessions --sessions 1,5,10,25,50 --turns 5 --output bench_sessions.jsonl
+"""
+
+import os
+import time
+import asyncio
+import logging
+import argparse
+import resource
+
+from livekit.agents.voice import AgentSession
+from mcp_client import MCPServerSse
+from mcp_client.agent_tools import MCPToolsIntegration
+from agent_core import FunctionAgent
+from benchmarks.common import LoopLagProbe, parse_levels, run_metadata, summarize, write_results
+from benchmarks.fake_mcp_server import FakeServerOptions, running_fake_mcp_server
+from benchmarks.fakes import FakeLLM, FakeSTT, FakeTTS, NullAudioOutput, ScriptedReply, SilentAudioInput
+
+TRANSCRIPTS = [
+    "What cards are due today?",
+    "Move the design review card to done.",
+    "Thanks, that's all.",
+]
+
+
+def scripted_replies(tool_every: int) -> list:
+    """Every `tool_every`-th turn calls the first fake MCP tool before answering."""
+    replies = []
+    for i in range(max(1, tool_every)):
+        if i == 0 and tool_every > 0:
+            replies.append(ScriptedReply("You have three cards due today, the first is the design review.",
+                                         tool="tool_000", arguments={"query": "due today"}))
+        else:
+            replies.append(ScriptedReply("Done. Anything else I can help you with?"))
+    return replies
+
+
+def current_rss_mb() -> float:
+    """Resident set size from /proc when available, else the peak from getrusage."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class SessionDriver:
+    """Plays the user side of one session: speaks a scripted turn, waits for the agent's reply, repeats."""
+
+    def __init__(self, index: int, url: str, args):
+        self.index = index
+        self.url = url
+        self.args = args
+        self.stt = FakeSTT(TRANSCRIPTS, words_per_second=args.words_per_second)
+        self.latencies = []
+        self.timeouts = 0
+        self.server = None
+        self.session = None
+        self._state = "initializing"
+        self._state_changed = asyncio.Event()
+
+    def _on_agent_state_changed(self, ev) -> None:
+        self._state = ev.new_state
+        self._state_changed.set()
+
+    async def _wait_for_state(self, state: str) -> None:
+        while self._state != state:
+            self._state_changed.clear()
+            await self._state_changed.wait()
+
+    async def start(self) -> None:
+        self.server = MCPServerSse(params={"url": self.url}, cache_tools_list=True, name=f"bench-{self.index}")
+        agent = await MCPToolsIntegration.create_agent_with_tools(
+            agent_class=FunctionAgent,
+            mcp_servers=[self.server],
+            agent_kwargs={
+                "stt": self.stt,
+                "llm": FakeLLM(scripted_replies(self.args.tool_every), ttft=self.args.llm_ttft),
+                "tts": FakeTTS(ttfb=self.args.tts_ttfb),
+                "vad": None,
+            },
+        )
+        self.session = AgentSession(turn_detection="stt", min_endpointing_delay=self.args.endpointing_delay)
+        self.session.on("agent_state_changed", self._on_agent_state_changed)
+        self.session.input.audio = SilentAudioInput()
+        self.session.output.audio = NullAudioOutput()
+        await self.session.start(agent=agent)
+
+    async def run_turns(self, turns: int) -> None:
+        for _ in range(turns):
+            try:
+                await asyncio.wait_for(self._wait_for_state("listening"), self.args.turn_timeout)
+                end_of_speech = await asyncio.wait_for(self.stt.say(), self.args.turn_timeout)
+                await asyncio.wait_for(self._wait_for_state("speaking"), self.args.turn_timeout)
+                self.latencies.append(time.monotonic() - end_of_speech)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+
+    async def close(self) -> None:
+        if self.session is not None:
+            await self.session.aclose()
+        if self.server is not None:
+            await self.server.cleanup()
+
+
+async def bench_level(url: str, sessions: int, args) -> dict:
+    drivers = [SessionDriver(i, url, args) for i in range(sessions)]
+    started_rss = current_rss_mb()
+    await asyncio.gather(*(d.start() for d in drivers))
+    probe = LoopLagProbe().start()
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(d.run_turns(args.turns) for d in drivers))
+    finally:
+        wall = time.perf_counter() - started
+        end_usage = resource.getrusage(resource.RUSAGE_SELF)
+        loop_lag = await probe.stop()
+        rss = current_rss_mb()
+        await asyncio.gather(*(d.close() for d in drivers), return_exceptions=True)
+    cpu = (end_usage.ru_utime - usage.ru_utime) + (end_usage.ru_stime - usage.ru_stime)
+    latencies = [latency for d in drivers for latency in d.latencies]
+    return {
+        "sessions": sessions,
+        "timeouts": sum(d.timeouts for d in drivers),
+        "turn_latency": summarize(latencies, wall),
+        "cpu_percent": round(cpu / wall * 100, 1) if wall > 0 else None,
+        "rss_mb": round(rss, 1),
+        "rss_per_session_mb": round((rss - started_rss) / sessions, 2) if sessions else None,
+        "loop_lag": loop_lag,
+    }
+
+
+async def run(args) -> dict:
+    results = run_metadata("sessions", vars(args))
+    options = FakeServerOptions(tool_count=args.tools, latency_ms=args.mcp_latency_ms)
+    async with running_fake_mcp_server(options) as url:
+        results["levels"] = []
+        for level in parse_levels(args.sessions):
+            results["levels"].append(await bench_level(url, level, args))
+            logging.warning(f"{level} sessions: {results['levels'][-1]}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", default="1,5,10,25", help="Comma-separated concurrent session counts")
+    parser.add_argument("--turns", type=int, default=5, help="User turns per session")
+    parser.add_argument("--tool-every", type=int, default=2, help="Call an MCP tool every N turns (0 disables)")
+    parser.add_argument("--tools", type=int, default=20, help="Number of tools the fake MCP server exposes")
+    parser.add_argument("--mcp-latency-ms", type=float, default=50.0, help="Fake MCP tool call latency")
+    parser.add_argument("--llm-ttft", type=float, default=0.3, help="Fake LLM time to first token (seconds)")
+    parser.add_argument("--tts-ttfb", type=float, default=0.2, help="Fake TTS time to first byte (seconds)")
+    parser.add_argument("--words-per-second", type=float, default=2.5, help="Speaking rate of the fake user")
+    parser.add_argument("--endpointing-delay", type=float, default=0.5, help="AgentSession min_endpointing_delay")
+    parser.add_argument("--turn-timeout", type=float, default=30.0, help="Seconds before a turn counts as timed out")
+    parser.add_argument("--output", default="-", help="Output file (.json overwrites, .jsonl appends, - for stdout)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    write_results(asyncio.run(run(args)), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+benchmarks/common.py
+
+Shared helpers for the benchmarks: latency summaries, run metadata and machine-readable result output.
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import platform
+import subprocess
+from typing import Any, Dict, List, Optional
+
+from utils import percentile
+
+
+def summarize(latencies: List[float], wall_time: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Summarize latencies (seconds) as milliseconds percentiles, plus throughput when wall_time is given.
+    Returns a dict of summary statistics.
+    """
+    summary = {
+        "count": len(latencies),
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else None,
+        **{f"p{p}_ms": round(percentile(latencies, p) * 1000, 3) if latencies else None for p in (50, 95, 99)},
+        "max_ms": round(max(latencies) * 1000, 3) if latencies else None,
+    }
+    if wall_time is not None:
+        summary["wall_s"] = round(wall_time, 3)
+        summary["throughput_per_s"] = round(len(latencies) / wall_time, 2) if wall_time > 0 else None
+    return summary
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            stderr=subprocess.DEVNULL, text=True,
+        ).strip()
+    except Exception:
+        return None
+
+
+def run_metadata(name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "benchmark": name,
+        "git_commit": git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "params": params,
+    }
+
+
+def write_results(results: Dict[str, Any], output: Optional[str]) -> None:
+    """
+    Write results as JSON to `output`, or to stdout when output is None or '-'.
+    A path ending in .jsonl is appended to, so successive runs build a history.
+    """
+    if not output or output == "-":
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return
+    if output.endswith(".jsonl"):
+        with open(output, "a") as f:
+            f.write(json.dumps(results) + "\n")
+    else:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+class LoopLagProbe:
+    """
+    Measures event-loop blocking: a task sleeps for `interval` repeatedly and records how late it wakes up.
+    Time the loop spends in synchronous code (blocking HTTP calls, JSON encoding, ...) shows up as lag.
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.lags: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, loop.time() - expected))
+
+    def start(self) -> "LoopLagProbe":
+        self.lags = []
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def stop(self) -> Dict[str, Any]:
+        """
+        Stop probing.
+        Returns lag percentiles plus the total time the loop was blocked past the probe interval.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        summary = summarize(self.lags)
+        summary["blocked_ms"] = round(sum(self.lags) * 1000, 3)
+        return summary
+
+
+def parse_levels(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
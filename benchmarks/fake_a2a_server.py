@@ -0,0 +1,138 @@
+"""
+benchmarks/fake_a2a_server.py
+
+An async stand-in for example/a2a-server.py's EchoAgent with a configurable number of skills and
+injectable per-task latency, so A2A client behaviour can be measured under concurrency.
+"""
+
+import sys
+import asyncio
+import argparse
+import threading
+import subprocess
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+EXAMPLE_SERVER = Path(__file__).resolve().parent.parent / "example" / "a2a-server.py"
+
+
+@dataclass
+class FakeA2AOptions:
+    skill_count: int = 3
+    latency_ms: float = 0.0
+
+
+def build_app(options: FakeA2AOptions) -> Starlette:
+    """
+    Build the Starlette app serving the agent card and the JSON-RPC tasks/send endpoint.
+    Skills are named echo_0, echo_1, ... and all echo the prompt back.
+    """
+    agent_card = {
+        "name": "EchoAgent",
+        "description": "A simple agent that echoes back user messages.",
+        "version": "1.0",
+        "capabilities": {"streaming": False, "pushNotifications": False},
+        "skills": [
+            {"id": f"echo_{i}", "name": f"echo_{i}", "description": f"Echo skill number {i}"}
+            for i in range(options.skill_count)
+        ],
+    }
+
+    async def get_agent_card(request: Request):
+        return JSONResponse(agent_card)
+
+    async def send_task(request: Request):
+        req = await request.json()
+        task = req.get("params", req)
+        try:
+            user_message = task["message"]["parts"][0]["text"]
+        except (KeyError, IndexError, TypeError):
+            return JSONResponse({"jsonrpc": "2.0", "id": req.get("id"), "error": {"error": "Invalid request format"}},
+                                status_code=400)
+        if options.latency_ms:
+            await asyncio.sleep(options.latency_ms / 1000)
+        result = {
+            "id": task.get("id"),
+            "status": {"state": "completed"},
+            "messages": [task["message"], {"role": "agent", "parts": [{"text": f"Hello! You said: '{user_message}'"}]}],
+        }
+        return JSONResponse({"jsonrpc": "2.0", "id": req.get("id"), "result": result})
+
+    return Starlette(routes=[
+        Route("/.well-known/agent.json", get_agent_card, methods=["GET"]),
+        Route("/tasks/send", send_task, methods=["POST"]),
+    ])
+
+
+@asynccontextmanager
+async def running_fake_a2a_server(options: FakeA2AOptions, host: str = "127.0.0.1", port: int = 0):
+    """
+    Run the fake A2A server on its own event loop in a background thread, so a client that blocks the caller's
+    loop can't stall the server (and the server's work doesn't show up as the client's loop lag).
+    Yields the base URL.
+    """
+    config = uvicorn.Config(build_app(options), host=host, port=port, log_level="warning", lifespan="off",
+                            timeout_graceful_shutdown=1)
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, name="fake-a2a-server", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("Fake A2A server failed to start")
+        await asyncio.sleep(0.01)
+    bound_port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://{host}:{bound_port}"
+    finally:
+        server.should_exit = True
+        await asyncio.to_thread(thread.join)
+
+
+@asynccontextmanager
+async def running_example_server(port: int = 5001, startup_timeout: float = 10.0):
+    """
+    Launch example/a2a-server.py (Flask) in a subprocess and wait for its agent card.
+    Yields the base URL.
+    """
+    process = subprocess.Popen([sys.executable, str(EXAMPLE_SERVER)], stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient() as client:
+            deadline = asyncio.get_running_loop().time() + startup_timeout
+            while True:
+                try:
+                    if (await client.get(f"{base_url}/.well-known/agent.json")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if process.poll() is not None or asyncio.get_running_loop().time() > deadline:
+                    raise RuntimeError(f"Example A2A server did not start (exit code {process.poll()})")
+                await asyncio.sleep(0.1)
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait(timeout=5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the fake A2A server standalone")
+    parser.add_argument("--port", type=int, default=5002)
+    parser.add_argument("--skills", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+    print(f"Fake A2A server on http://127.0.0.1:{args.port}")
+    uvicorn.run(build_app(FakeA2AOptions(args.skills, args.latency_ms)), host="127.0.0.1", port=args.port,
+                log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
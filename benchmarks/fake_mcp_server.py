@@ -0,0 +1,117 @@
+"""
+benchmarks/fake_mcp_server.py
+
+An in-process stand-in for the Trello MCP server over HTTP+SSE, with a configurable number of tools,
+response payload size, per-call latency and failure rate.
+"""
+
+import random
+import asyncio
+import argparse
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+import uvicorn
+import mcp.types as types
+from mcp.server.lowlevel import Server
+from mcp.server.sse import SseServerTransport
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Mount, Route
+
+
+@dataclass
+class FakeServerOptions:
+    tool_count: int = 20
+    payload_bytes: int = 1024
+    latency_ms: float = 0.0
+    failure_rate: float = 0.0
+    seed: int = 0
+
+
+def build_app(options: FakeServerOptions) -> Starlette:
+    """
+    Build the Starlette app serving the MCP SSE endpoint at /sse.
+    Tools are named tool_000, tool_001, ... and accept a free-form `query` argument.
+    """
+    rng = random.Random(options.seed)
+    server = Server("fake-trello")
+    payload = "x" * options.payload_bytes
+    tools = [
+        types.Tool(
+            name=f"tool_{i:03d}",
+            description=f"Fake Trello tool number {i}",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "Free-form query"},
+                    "limit": {"type": "integer", "description": "Maximum number of results"},
+                },
+                "required": ["query"],
+            },
+        )
+        for i in range(options.tool_count)
+    ]
+
+    @server.list_tools()
+    async def list_tools() -> list[types.Tool]:
+        return tools
+
+    @server.call_tool()
+    async def call_tool(name: str, arguments: dict) -> list[types.TextContent]:
+        if options.latency_ms:
+            await asyncio.sleep(options.latency_ms / 1000)
+        if options.failure_rate and rng.random() < options.failure_rate:
+            raise RuntimeError(f"Injected failure in {name}")
+        return [types.TextContent(type="text", text=payload)]
+
+    transport = SseServerTransport("/messages/")
+
+    async def handle_sse(request):
+        async with transport.connect_sse(request.scope, request.receive, request._send) as (read, write):
+            await server.run(read, write, server.create_initialization_options())
+        return Response()
+
+    return Starlette(routes=[
+        Route("/sse", endpoint=handle_sse),
+        Mount("/messages/", app=transport.handle_post_message),
+    ])
+
+
+@asynccontextmanager
+async def running_fake_mcp_server(options: FakeServerOptions, host: str = "127.0.0.1", port: int = 0):
+    """
+    Run the fake server on the current event loop.
+    Yields the SSE URL to connect to.
+    """
+    config = uvicorn.Config(build_app(options), host=host, port=port, log_level="warning", lifespan="off",
+                            timeout_graceful_shutdown=1)
+    server = uvicorn.Server(config)
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.01)
+    bound_port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://{host}:{bound_port}/sse"
+    finally:
+        server.should_exit = True
+        await task
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the fake MCP SSE server standalone")
+    parser.add_argument("--port", type=int, default=8093)
+    parser.add_argument("--tools", type=int, default=20)
+    parser.add_argument("--payload-bytes", type=int, default=1024)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    options = FakeServerOptions(args.tools, args.payload_bytes, args.latency_ms, args.failure_rate)
+    print(f"Fake MCP server on http://127.0.0.1:{args.port}/sse")
+    uvicorn.run(build_app(options), host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+benchmarks/fakes.py
+
+Fake STT, LLM and TTS plugins plus headless audio input/output for running AgentSessions without a room or
+any cloud provider. Timings (recognition delay, time to first token, synthesis latency, playback) are
+configurable so load tests exercise the pipeline at realistic pacing.
+"""
+
+import json
+import time
+import uuid
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from livekit import rtc
+from livekit.agents import DEFAULT_API_CONNECT_OPTIONS, llm, stt, tts
+from livekit.agents.voice import io
+
+SAMPLE_RATE = 24000
+
+
+def silence(duration: float, sample_rate: int = SAMPLE_RATE) -> rtc.AudioFrame:
+    return rtc.AudioFrame.create(sample_rate, 1, int(duration * sample_rate))
+
+
+class SilentAudioInput(io.AudioInput):
+    """Microphone stand-in: yields silent frames paced in real time, like a live participant track."""
+
+    def __init__(self, frame_duration: float = 0.02, sample_rate: int = SAMPLE_RATE):
+        super().__init__()
+        self.frame_duration = frame_duration
+        self.sample_rate = sample_rate
+        self._next_at: Optional[float] = None
+
+    async def __anext__(self) -> rtc.AudioFrame:
+        now = time.monotonic()
+        self._next_at = (self._next_at or now) + self.frame_duration
+        await asyncio.sleep(max(0.0, self._next_at - now))
+        return silence(self.frame_duration, self.sample_rate)
+
+
+class NullAudioOutput(io.AudioOutput):
+    """Speaker stand-in: discards audio but reports playback as finished after its real-time duration."""
+
+    def __init__(self):
+        super().__init__()
+        self._pushed = 0.0
+        self._started_at: Optional[float] = None
+        self._playback: Optional[asyncio.Task] = None
+
+    async def capture_frame(self, frame: rtc.AudioFrame) -> None:
+        await super().capture_frame(frame)
+        if self._started_at is None:
+            self._started_at = time.monotonic()
+        self._pushed += frame.samples_per_channel / frame.sample_rate
+
+    def flush(self) -> None:
+        super().flush()
+        if self._started_at is None:
+            self.on_playback_finished(playback_position=0.0, interrupted=False)
+            return
+        remaining = self._pushed - (time.monotonic() - self._started_at)
+        position = self._pushed
+        self._reset()
+        self._playback = asyncio.create_task(self._finish_after(remaining, position))
+
+    async def _finish_after(self, delay: float, position: float) -> None:
+        await asyncio.sleep(max(0.0, delay))
+        self._playback = None
+        self.on_playback_finished(playback_position=position, interrupted=False)
+
+    def clear_buffer(self) -> None:
+        played = time.monotonic() - self._started_at if self._started_at is not None else 0.0
+        if self._playback is not None:
+            self._playback.cancel()
+            self._playback = None
+        position = min(played, self._pushed)
+        self._reset()
+        self.on_playback_finished(playback_position=position, interrupted=True)
+
+    def _reset(self) -> None:
+        self._pushed = 0.0
+        self._started_at = None
+
+
+class FakeSTT(stt.STT):
+    """
+    Scripted speech recognition.
+
+    say() queues an utterance; the stream emits START_OF_SPEECH on the next audio frame and the final
+    transcript plus END_OF_SPEECH once enough audio has arrived to have spoken it at `words_per_second`.
+    Use with AgentSession(turn_detection="stt") so no VAD is needed.
+    """
+
+    def __init__(self, transcripts: Optional[List[str]] = None, words_per_second: float = 2.5,
+                 recognition_delay: float = 0.1):
+        super().__init__(capabilities=stt.STTCapabilities(streaming=True, interim_results=False))
+        self.transcripts = transcripts or ["What cards are due today?"]
+        self.words_per_second = words_per_second
+        self.recognition_delay = recognition_delay
+        self._utterances: asyncio.Queue = asyncio.Queue()
+        self._said = 0
+
+    def say(self, text: Optional[str] = None) -> asyncio.Future:
+        """
+        Queue the next utterance (the next scripted transcript when text is None).
+        Returns a future resolved with the monotonic time its END_OF_SPEECH was emitted.
+        """
+        if text is None:
+            text = self.transcripts[self._said % len(self.transcripts)]
+        self._said += 1
+        done = asyncio.get_running_loop().create_future()
+        self._utterances.put_nowait((text, done))
+        return done
+
+    def _final(self, text: str) -> stt.SpeechEvent:
+        return stt.SpeechEvent(
+            type=stt.SpeechEventType.FINAL_TRANSCRIPT,
+            alternatives=[stt.SpeechData(language="en", text=text, confidence=1.0)],
+        )
+
+    async def _recognize_impl(self, buffer, *, language=None, conn_options=DEFAULT_API_CONNECT_OPTIONS):
+        await asyncio.sleep(self.recognition_delay)
+        text, done = await self._utterances.get()
+        if not done.done():
+            done.set_result(time.monotonic())
+        return self._final(text)
+
+    def stream(self, *, language=None, conn_options=DEFAULT_API_CONNECT_OPTIONS) -> "FakeRecognizeStream":
+        return FakeRecognizeStream(stt=self, conn_options=conn_options)
+
+
+class FakeRecognizeStream(stt.RecognizeStream):
+    async def _run(self) -> None:
+        fake: FakeSTT = self._stt
+        current = None
+        heard = 0.0
+        async for item in self._input_ch:
+            if not isinstance(item, rtc.AudioFrame):
+                continue
+            if current is None:
+                try:
+                    current = fake._utterances.get_nowait()
+                except asyncio.QueueEmpty:
+                    continue
+                heard = 0.0
+                self._event_ch.send_nowait(stt.SpeechEvent(type=stt.SpeechEventType.START_OF_SPEECH))
+            heard += item.samples_per_channel / item.sample_rate
+            text, done = current
+            if heard >= len(text.split()) / fake.words_per_second:
+                current = None
+                await asyncio.sleep(fake.recognition_delay)
+                self._event_ch.send_nowait(fake._final(text))
+                self._event_ch.send_nowait(stt.SpeechEvent(type=stt.SpeechEventType.END_OF_SPEECH))
+                if not done.done():
+                    done.set_result(time.monotonic())
+
+
+@dataclass
+class ScriptedReply:
+    """
+    One scripted LLM response. With a tool, the model first calls it with `arguments`, then answers
+    with `text` once the tool output is in the chat context.
+    """
+    text: str
+    tool: Optional[str] = None
+    arguments: Dict[str, Any] = field(default_factory=dict)
+
+
+class FakeLLM(llm.LLM):
+    """Streams scripted replies and tool calls with a configurable time to first token and token interval."""
+
+    def __init__(self, script: Optional[List[ScriptedReply]] = None, ttft: float = 0.3,
+                 token_interval: float = 0.02):
+        super().__init__()
+        self.script = script or [ScriptedReply("You have three cards due today.")]
+        self.ttft = ttft
+        self.token_interval = token_interval
+        self._turn = 0
+        self._pending: Optional[ScriptedReply] = None
+
+    def chat(self, *, chat_ctx: llm.ChatContext, tools=None, conn_options=DEFAULT_API_CONNECT_OPTIONS,
+             **kwargs) -> "FakeLLMStream":
+        last = chat_ctx.items[-1] if chat_ctx.items else None
+        if self._pending is not None and getattr(last, "type", None) == "function_call_output":
+            # Answer with the tool result in context
+            reply, tool_call = self._pending.text, None
+            self._pending = None
+        else:
+            scripted = self.script[self._turn % len(self.script)]
+            self._turn += 1
+            if scripted.tool:
+                self._pending = scripted
+                reply = None
+                tool_call = llm.FunctionToolCall(
+                    name=scripted.tool, arguments=json.dumps(scripted.arguments), call_id=uuid.uuid4().hex[:12]
+                )
+            else:
+                reply, tool_call = scripted.text, None
+        return FakeLLMStream(self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options,
+                             reply=reply, tool_call=tool_call)
+
+
+class FakeLLMStream(llm.LLMStream):
+    def __init__(self, fake: FakeLLM, *, reply: Optional[str], tool_call, **kwargs):
+        super().__init__(fake, **kwargs)
+        self._fake = fake
+        self._reply = reply
+        self._tool_call = tool_call
+
+    async def _run(self) -> None:
+        request_id = uuid.uuid4().hex
+        await asyncio.sleep(self._fake.ttft)
+        if self._tool_call is not None:
+            self._event_ch.send_nowait(llm.ChatChunk(
+                id=request_id, delta=llm.ChoiceDelta(role="assistant", tool_calls=[self._tool_call])
+            ))
+            return
+        for i, word in enumerate(self._reply.split()):
+            if i:
+                await asyncio.sleep(self._fake.token_interval)
+            self._event_ch.send_nowait(llm.ChatChunk(
+                id=request_id, delta=llm.ChoiceDelta(role="assistant", content=word if i == 0 else " " + word)
+            ))
+
+
+class FakeTTS(tts.TTS):
+    """Returns silence as long as the text would take to speak, after a configurable synthesis latency."""
+
+    def __init__(self, ttfb: float = 0.2, chars_per_second: float = 15.0, frame_duration: float = 0.1):
+        super().__init__(capabilities=tts.TTSCapabilities(streaming=False), sample_rate=SAMPLE_RATE, num_channels=1)
+        self.ttfb = ttfb
+        self.chars_per_second = chars_per_second
+        self.frame_duration = frame_duration
+
+    def synthesize(self, text: str, *, conn_options=DEFAULT_API_CONNECT_OPTIONS) -> "FakeChunkedStream":
+        return FakeChunkedStream(tts=self, input_text=text, conn_options=conn_options)
+
+
+class FakeChunkedStream(tts.ChunkedStream):
+    async def _run(self) -> None:
+        fake: FakeTTS = self._tts
+        request_id = uuid.uuid4().hex
+        await asyncio.sleep(fake.ttfb)
+        remaining = len(self._input_text) / fake.chars_per_second
+        while remaining > 0:
+            duration = min(fake.frame_duration, remaining)
+            remaining -= duration
+            self._event_ch.send_nowait(tts.SynthesizedAudio(
+                request_id=request_id, frame=silence(duration), is_final=remaining <= 0
+            ))
@@ -0,0 +1,188 @@
+"""
+config_watcher.py
+
+Reloads mcp_servers.yaml while jobs are running. The watcher polls the file's modification time, diffs the new
+server list against the live one by server name and applies only what changed: added servers are connected,
+removed ones closed, servers whose connection settings changed are replaced, and servers whose `allowed_tools`
+changed are just re-filtered. The agent's tool set is then swapped in a single update.
+"""
+
+import os
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CONFIG_PATH = "mcp_servers.yaml"
+
+
+@dataclass
+class ConfigDiff:
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    # Connection settings changed: the server is rebuilt and reconnected
+    changed: List[str] = field(default_factory=list)
+    # Only allowed_tools changed: the existing connection is kept
+    refiltered: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed or self.refiltered)
+
+
+def _connection_settings(conf: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: v for k, v in conf.items() if k != "allowed_tools"}
+
+
+def diff_configs(old: Dict[str, Dict[str, Any]], new: Dict[str, Dict[str, Any]]) -> ConfigDiff:
+    """Compare server configs keyed by name."""
+    diff = ConfigDiff(
+        added=[name for name in new if name not in old],
+        removed=[name for name in old if name not in new],
+    )
+    for name in new:
+        if name not in old:
+            continue
+        if _connection_settings(old[name]) != _connection_settings(new[name]):
+            diff.changed.append(name)
+        elif old[name].get("allowed_tools") != new[name].get("allowed_tools"):
+            diff.refiltered.append(name)
+    return diff
+
+
+def configs_by_name(configs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    return {conf.get("name", ""): conf for conf in configs}
+
+
+class ConfigWatcher:
+    """
+    Keeps `servers` (live servers by name) and the agent's tools in sync with the config file at `path`.
+    `servers` is shared with the caller and updated in place, so shutdown cleanup sees the current servers.
+    `build(conf, servers)` creates new servers (tool_integration.build_server by default).
+    """
+
+    def __init__(self, agent, servers: Dict[str, Any], configs: Dict[str, Dict[str, Any]],
+                 path: str = CONFIG_PATH, interval: float = 5.0, build: Optional[Callable] = None):
+        self.agent = agent
+        self.build = build
+        self.servers = servers
+        self.configs = configs
+        self.path = path
+        self.interval = interval
+        self.tools: Dict[str, list] = {}
+        self.own_tools: list = []
+        self._mtime = self._read_mtime()
+        self._task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def _read_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except FileNotFoundError:
+            return None
+
+    async def _prepare(self, name: str) -> None:
+        from tool_integration import prepare_server_tools
+
+        try:
+            self.tools[name] = await prepare_server_tools(self.servers[name], self.configs[name].get("allowed_tools"))
+        except Exception as e:
+            logger.error(f"Failed to prepare tools for {name}: {e}")
+            self.tools[name] = []
+
+    async def start(self) -> "ConfigWatcher":
+        """Index the current tools per server and start polling."""
+        for name in self.servers:
+            await self._prepare(name)
+        # Tools the agent has that don't come from a server are kept across swaps
+        server_tools = {getattr(tool, "__name__", None) for tools in self.tools.values() for tool in tools}
+        self.own_tools = [tool for tool in self.agent.tools if getattr(tool, "__name__", None) not in server_tools]
+        self._task = asyncio.create_task(self._run())
+        return self
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            mtime = self._read_mtime()
+            if mtime is None or mtime == self._mtime:
+                continue
+            self._mtime = mtime
+            try:
+                await self.reload()
+            except Exception as e:
+                logger.error(f"Failed to reload {self.path}: {e}")
+
+    async def reload(self) -> ConfigDiff:
+        """Apply the current config file. Returns what changed."""
+        from mcp_config import load_mcp_config
+        from tool_integration import build_order, build_server
+
+        build = self.build or build_server
+        async with self._lock:
+            new_configs = configs_by_name(load_mcp_config(self.path))
+            diff = diff_configs(self.configs, new_configs)
+            # Fan-outs hold their member servers, so they are rebuilt when a member is
+            replaced = set(diff.changed + diff.removed)
+            for name, conf in new_configs.items():
+                if (conf.get("type") == "a2a_fanout" and name in self.configs and name not in diff.changed
+                        and replaced & set(conf.get("members", []))):
+                    diff.changed.append(name)
+                    if name in diff.refiltered:
+                        diff.refiltered.remove(name)
+            if not diff:
+                return diff
+            logger.info(f"Applying {self.path} changes: {diff}")
+
+            # Build and connect new servers before touching the live tool set
+            stale = [self.servers[name] for name in diff.removed + diff.changed]
+            fresh = {}
+            for conf in build_order([new_configs[name] for name in diff.added + diff.changed]):
+                name = conf.get("name", "")
+                # Fan-outs resolve members among the new servers first, then the live ones
+                try:
+                    server = build(conf, {**self.servers, **fresh})
+                except ValueError as e:
+                    logger.error(f"Skipping {name}: {e}")
+                    continue
+                try:
+                    await server.connect()
+                except Exception as e:
+                    logger.error(f"Failed to connect to {name}: {e}")
+                fresh[name] = server
+
+            for name in diff.removed + [name for name in diff.changed if name not in fresh]:
+                self.servers.pop(name, None)
+                self.tools.pop(name, None)
+            self.servers.update(fresh)
+            self.configs = new_configs
+            await asyncio.gather(*(self._prepare(name) for name in list(fresh) + diff.refiltered))
+
+            # One swap, so a turn never sees a half-updated tool set
+            await self.agent.update_tools(
+                self.own_tools + [tool for name in self.servers for tool in self.tools.get(name, [])]
+            )
+
+            await asyncio.gather(*(server.cleanup() for server in stale), return_exceptions=True)
+            return diff
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+async def start_config_watcher(agent, servers: Dict[str, Any], configs: List[Dict[str, Any]],
+                               path: str = CONFIG_PATH, build: Optional[Callable] = None) -> Optional[ConfigWatcher]:
+    """
+    Watch `path` every MCP_CONFIG_WATCH_INTERVAL seconds (default 5; 0 disables).
+    Returns the running watcher, or None when disabled.
+    """
+    interval = float(os.environ.get("MCP_CONFIG_WATCH_INTERVAL", "5"))
+    if interval <= 0:
+        return None
+    return await ConfigWatcher(agent, servers, configs_by_name(configs), path, interval, build).start()
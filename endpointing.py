@@ -0,0 +1,163 @@
+"""
+endpointing.py
+
+Provides the EndpointingController, which tunes the end-of-turn silence window of an AgentSession from the
+pauses and cut-offs observed in that session, within configured bounds.
+"""
+
+import os
+import time
+import logging
+from bisect import bisect_left
+from collections import deque
+from typing import Dict, List, Optional
+
+from utils import percentile
+
+logger = logging.getLogger(__name__)
+
+PAUSE_BUCKETS = [0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0]
+
+
+class EndpointingController:
+    """
+    Adapts the session's endpointing delay per user.
+
+    Pauses inside a user turn (the user stops and resumes before the agent starts responding) are
+    collected; the window tracks their 90th percentile plus a margin, so fast talkers get short waits.
+    When the user resumes speaking within `cutoff_window` seconds after the agent started responding,
+    the turn was ended too early: the window is widened by `cutoff_step`.
+    """
+
+    def __init__(self, *, min_delay: float = 0.3, max_delay: float = 1.5, initial_delay: float = 0.5,
+                 margin: float = 0.1, cutoff_window: float = 1.5, cutoff_step: float = 1.25,
+                 min_samples: int = 5, smoothing: float = 0.3):
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.margin = margin
+        self.cutoff_window = cutoff_window
+        self.cutoff_step = cutoff_step
+        self.min_samples = min_samples
+        self.smoothing = smoothing
+        self.current = self._clamp(initial_delay)
+        self.pauses: deque = deque(maxlen=200)
+        self.turns = 0
+        self.cutoffs = 0
+        self.interruptions = 0
+        self._user_stopped_at: Optional[float] = None
+        self._agent_started_at: Optional[float] = None
+        self._agent_speaking = False
+        self._session = None
+
+    def _clamp(self, value: float) -> float:
+        return max(self.min_delay, min(self.max_delay, value))
+
+    def session_kwargs(self) -> Dict[str, float]:
+        """Returns the AgentSession keyword arguments for the initial window."""
+        return {"min_endpointing_delay": self.current}
+
+    def attach(self, session) -> None:
+        self._session = session
+        session.on("user_state_changed", self._on_user_state_changed)
+        session.on("agent_state_changed", self._on_agent_state_changed)
+
+    def _on_user_state_changed(self, ev) -> None:
+        now = time.monotonic()
+        if ev.new_state == "speaking":
+            self.on_user_started(now)
+        elif ev.old_state == "speaking":
+            self.on_user_stopped(now)
+
+    def _on_agent_state_changed(self, ev) -> None:
+        now = time.monotonic()
+        if ev.new_state in ("thinking", "speaking") and ev.old_state not in ("thinking", "speaking"):
+            self.on_agent_started(now)
+        self._agent_speaking = ev.new_state == "speaking"
+
+    def on_user_stopped(self, now: float) -> None:
+        self._user_stopped_at = now
+
+    def on_agent_started(self, now: float) -> None:
+        self._agent_started_at = now
+        self.turns += 1
+
+    def on_user_started(self, now: float) -> None:
+        if self._agent_speaking:
+            self.interruptions += 1
+        stopped = self._user_stopped_at
+        if stopped is None:
+            return
+        agent_started = self._agent_started_at
+        if agent_started is None or agent_started < stopped:
+            # The user paused and carried on within the same turn
+            self.pauses.append(now - stopped)
+            self._update_from_pauses()
+        elif now - stopped < self.cutoff_window:
+            # The agent took the turn but the user was not done
+            self.cutoffs += 1
+            self._set(self.current * self.cutoff_step, reason="cut-off")
+        self._user_stopped_at = None
+
+    def _update_from_pauses(self) -> None:
+        if len(self.pauses) < self.min_samples:
+            return
+        target = percentile(self.pauses, 90) + self.margin
+        self._set((1 - self.smoothing) * self.current + self.smoothing * target, reason="pauses")
+
+    def _set(self, value: float, reason: str) -> None:
+        value = self._clamp(value)
+        if abs(value - self.current) < 0.01:
+            return
+        logger.debug(f"Endpointing delay {self.current:.2f}s -> {value:.2f}s ({reason})")
+        self.current = value
+        self._apply()
+
+    def _apply(self) -> None:
+        if self._session is None:
+            return
+        options = getattr(self._session, "options", None)
+        try:
+            if options is not None:
+                options.min_endpointing_delay = self.current
+            # The running activity copies the delay at start, update it too when present
+            recognition = getattr(getattr(self._session, "_activity", None), "_audio_recognition", None)
+            if recognition is not None and hasattr(recognition, "_min_endpointing_delay"):
+                recognition._min_endpointing_delay = self.current
+        except Exception as e:
+            logger.warning(f"Could not update endpointing delay: {e}")
+
+    def distribution(self) -> Dict[str, object]:
+        """
+        Export the observed pause distribution and controller state.
+        Returns a dict with cumulative pause buckets, percentiles and counters.
+        """
+        counts: List[int] = [0] * (len(PAUSE_BUCKETS) + 1)
+        for pause in self.pauses:
+            counts[bisect_left(PAUSE_BUCKETS, pause)] += 1
+        cumulative, buckets = 0, {}
+        for bound, count in zip([*map(str, PAUSE_BUCKETS), "+Inf"], counts):
+            cumulative += count
+            buckets[bound] = cumulative
+        return {
+            "endpointing_delay": round(self.current, 3),
+            "pause_buckets": buckets,
+            "pause_p50": percentile(self.pauses, 50),
+            "pause_p90": percentile(self.pauses, 90),
+            "pauses": len(self.pauses),
+            "turns": self.turns,
+            "cutoffs": self.cutoffs,
+            "interruptions": self.interruptions,
+        }
+
+
+def endpointing_from_env() -> Optional[EndpointingController]:
+    """
+    Returns an EndpointingController if AGENT_ADAPTIVE_ENDPOINTING is enabled, else None.
+    """
+    if os.environ.get("AGENT_ADAPTIVE_ENDPOINTING", "0").lower() not in ("1", "true", "yes"):
+        return None
+    return EndpointingController(
+        min_delay=float(os.environ.get("AGENT_ENDPOINTING_MIN_DELAY", "0.3")),
+        max_delay=float(os.environ.get("AGENT_ENDPOINTING_MAX_DELAY", "1.5")),
+        initial_delay=float(os.environ.get("AGENT_ENDPOINTING_INITIAL_DELAY", "0.5")),
+    )
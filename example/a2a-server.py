@@ -11,7 +11,11 @@ AGENT_CARD = {
     "capabilities": {
         "streaming": False,           # This agent doesn't support streaming responses
         "pushNotifications": False    # No push notifications in this simple example
-    }
+    },
+    # Skills are exposed to the voice agent as tools (see tool_integration.py)
+    "skills": [
+        {"id": "echo", "name": "echo", "description": "Echo back the user's message"}
+    ]
     # (In a full Agent Card, there could be more fields like authentication info, etc.)
 }
  
@@ -67,6 +71,14 @@ def handle_task():
         return jsonify({"jsonrpc": "2.0", "id": jsonrpc_id, "result": response_task})
     return jsonify(response_task)
  
+# Clients cancel tasks whose result is no longer needed (e.g. the user interrupted).
+@app.post("/tasks/cancel")
+def cancel_task():
+    """Endpoint for A2A clients to cancel a task. Tasks here complete immediately, so there is nothing to stop."""
+    req = request.get_json() or {}
+    task_id = req.get("params", {}).get("id")
+    return jsonify({"jsonrpc": "2.0", "id": req.get("id"), "result": {"id": task_id, "status": {"state": "canceled"}}})
+ 
 # Run the Flask app (A2A server) if this script is executed directly.
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5001)
@@ -0,0 +1,249 @@
+"""
+frontend/rooms.py
+
+Decides which LiveKit room a /token request joins and which agent worker pool is dispatched to it.
+
+Rooms are allocated per session (a new room for every token), per team (shared up to a participant capacity,
+then overflow rooms), or shared (the legacy single LIVEKIT_ROOM). When agent pools are configured, each new room
+is assigned to the least-loaded pool, which the token requests through explicit agent dispatch; the workers of a
+pool register with that pool's AGENT_NAME. Allocations are reconciled against the rooms that actually exist, so
+finished conversations free their capacity.
+"""
+
+import os
+import re
+import time
+import uuid
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger("frontend.rooms")
+
+
+class CapacityError(RuntimeError):
+    """Raised when every agent pool is at capacity."""
+
+
+@dataclass
+class Allocation:
+    room: str
+    pool: Optional[str]
+    created: float
+    expires: float
+    participants: int = 0
+
+
+class LocalRoomService:
+    """
+    In-process stand-in for the LiveKit room service, for local development and tests: a room exists from its
+    first allocation until it is closed or its allocation expires.
+    """
+
+    def __init__(self):
+        self.rooms: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def joined(self, room: str) -> None:
+        with self._lock:
+            self.rooms[room] = self.rooms.get(room, 0) + 1
+
+    def close_room(self, room: str) -> None:
+        with self._lock:
+            self.rooms.pop(room, None)
+
+    def list_rooms(self) -> Dict[str, int]:
+        """Returns participant counts by room name."""
+        with self._lock:
+            return dict(self.rooms)
+
+
+class LiveKitRoomService:
+    """Lists rooms through the LiveKit server API."""
+
+    def __init__(self, url: str, api_key: str, api_secret: str):
+        self.url = url
+        self.api_key = api_key
+        self.api_secret = api_secret
+
+    def joined(self, room: str) -> None:
+        # LiveKit creates the room when the first participant connects
+        return
+
+    def list_rooms(self) -> Dict[str, int]:
+        """Returns participant counts by room name."""
+        from livekit import api
+
+        async def list_rooms():
+            lkapi = api.LiveKitAPI(self.url, self.api_key, self.api_secret)
+            try:
+                response = await lkapi.room.list_rooms(api.ListRoomsRequest())
+            finally:
+                await lkapi.aclose()
+            return {room.name: room.num_participants for room in response.rooms}
+
+        return asyncio.run(list_rooms())
+
+
+def parse_pools(value: str) -> Dict[str, int]:
+    """Parse AGENT_POOLS ('agent-a:20,agent-b:10') into rooms-per-pool capacities."""
+    pools = {}
+    for item in value.split(","):
+        name, _, capacity = item.strip().partition(":")
+        if name:
+            pools[name] = int(capacity) if capacity else 10
+    return pools
+
+
+def _slug(value: str, limit: int = 32) -> str:
+    return re.sub(r"[^a-z0-9-]+", "-", value.lower()).strip("-")[:limit] or "default"
+
+
+class RoomAllocator:
+    """
+    Allocates rooms and agent pools for token requests.
+
+    mode: 'session' (unique room per token), 'team' (room per team, at most `room_capacity` participants, then
+    overflow rooms) or 'shared' (always `shared_room`). `pools` maps agent names to how many rooms each pool
+    may hold; without pools, rooms rely on LiveKit's automatic dispatch.
+    """
+
+    def __init__(self, mode: str = "session", prefix: str = "trello-voice", shared_room: str = "trello-voice-agent-room",
+                 room_capacity: int = 8, ttl: float = 3600.0, pools: Optional[Dict[str, int]] = None,
+                 service=None, join_grace: float = 120.0):
+        if mode not in ("session", "team", "shared"):
+            raise ValueError(f"Unknown room mode: {mode}")
+        self.mode = mode
+        self.prefix = prefix
+        self.shared_room = shared_room
+        self.room_capacity = room_capacity
+        self.ttl = ttl
+        self.pools = pools or {}
+        self.service = service or LocalRoomService()
+        self.join_grace = join_grace
+        self._allocations: Dict[str, Allocation] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def pool_load(self) -> Dict[str, Tuple[int, int]]:
+        """Returns (rooms, capacity) per pool."""
+        with self._lock:
+            return self._pool_load()
+
+    def _pool_load(self) -> Dict[str, Tuple[int, int]]:
+        rooms = {name: 0 for name in self.pools}
+        for allocation in self._allocations.values():
+            if allocation.pool in rooms:
+                rooms[allocation.pool] += 1
+        return {name: (rooms[name], capacity) for name, capacity in self.pools.items()}
+
+    def _pick_pool(self) -> Optional[str]:
+        if not self.pools:
+            return None
+        candidates = [
+            (rooms / capacity, rooms, name)
+            for name, (rooms, capacity) in self._pool_load().items()
+            if rooms < capacity
+        ]
+        if not candidates:
+            raise CapacityError("All agent pools are at capacity")
+        return min(candidates)[2]
+
+    def _new_room(self, name: str, now: float) -> Allocation:
+        allocation = Allocation(room=name, pool=self._pick_pool(), created=now, expires=now + self.ttl)
+        self._allocations[name] = allocation
+        return allocation
+
+    def allocate(self, team: Optional[str] = None) -> Allocation:
+        """
+        Pick the room (and agent pool) for one new participant.
+        Raises CapacityError when a new room is needed and every pool is full.
+        """
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            if self.mode == "shared":
+                allocation = self._allocations.get(self.shared_room) or self._new_room(self.shared_room, now)
+            elif self.mode == "team":
+                base = f"{self.prefix}-team-{_slug(team or 'default')}"
+                allocation = None
+                index = 1
+                while allocation is None:
+                    name = base if index == 1 else f"{base}-{index}"
+                    existing = self._allocations.get(name)
+                    if existing is None:
+                        allocation = self._new_room(name, now)
+                    elif existing.participants < self.room_capacity:
+                        allocation = existing
+                    index += 1
+            else:
+                allocation = self._new_room(f"{self.prefix}-{uuid.uuid4().hex[:12]}", now)
+            allocation.participants += 1
+            allocation.expires = now + self.ttl
+        self.service.joined(allocation.room)
+        return allocation
+
+    def _expire(self, now: float) -> None:
+        for name in [n for n, a in self._allocations.items() if a.expires <= now]:
+            del self._allocations[name]
+            if isinstance(self.service, LocalRoomService):
+                self.service.close_room(name)
+
+    def reconcile(self) -> None:
+        """
+        Sync allocations with the rooms that exist: take participant counts from the room service and drop
+        rooms that have ended (allowing `join_grace` seconds for the first participant to connect).
+        """
+        try:
+            live = self.service.list_rooms()
+        except Exception as e:
+            logger.warning("Room reconciliation failed: %s", e)
+            return
+        now = time.time()
+        with self._lock:
+            self._expire(now)
+            for name, allocation in list(self._allocations.items()):
+                if name in live:
+                    allocation.participants = live[name]
+                elif now - allocation.created > self.join_grace:
+                    del self._allocations[name]
+
+    def start_reconciler(self, interval: float = 15.0) -> None:
+        def run():
+            while not self._stop.wait(interval):
+                self.reconcile()
+        threading.Thread(target=run, name="room-reconciler", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def rooms(self) -> List[Allocation]:
+        with self._lock:
+            return list(self._allocations.values())
+
+
+def room_allocator_from_env() -> RoomAllocator:
+    """
+    Build the allocator from ROOM_MODE (session, team or shared; default session), ROOM_PREFIX, LIVEKIT_ROOM
+    (the shared room), ROOM_CAPACITY (participants per team room, default 8), ROOM_TTL (seconds, default 3600) and
+    AGENT_POOLS ('agent-a:20,agent-b:10'). Rooms are reconciled against the LiveKit API when credentials are set,
+    or against the local stand-in when ROOM_SERVICE=local.
+    """
+    url = os.environ.get("LIVEKIT_URL")
+    key = os.environ.get("LIVEKIT_API_KEY")
+    secret = os.environ.get("LIVEKIT_API_SECRET")
+    if os.environ.get("ROOM_SERVICE", "livekit") == "livekit" and all([url, key, secret]):
+        service = LiveKitRoomService(url, key, secret)
+    else:
+        service = LocalRoomService()
+    return RoomAllocator(
+        mode=os.environ.get("ROOM_MODE", "session"),
+        prefix=os.environ.get("ROOM_PREFIX", "trello-voice"),
+        shared_room=os.environ.get("LIVEKIT_ROOM", "trello-voice-agent-room"),
+        room_capacity=int(os.environ.get("ROOM_CAPACITY", "8")),
+        ttl=float(os.environ.get("ROOM_TTL", "3600")),
+        pools=parse_pools(os.environ.get("AGENT_POOLS", "")),
+        service=service,
+    )
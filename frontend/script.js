@@ -131,12 +131,15 @@ class TrelloVoiceAssistant {
             this.updateStatus('connecting', 'Getting token...');
             
             // Fetch token from our new /token endpoint
-            const tokenRes = await fetch('/token');
+            // ?team=<name> in the page URL joins the team's shared room instead of a private one
+            const team = new URLSearchParams(window.location.search).get('team');
+            const tokenRes = await fetch(team ? `/token?team=${encodeURIComponent(team)}` : '/token');
             if (!tokenRes.ok) {
                 const error = await tokenRes.text();
                 throw new Error(`Failed to get token: ${error}`);
             }
-            const { token, url: livekitUrl } = await tokenRes.json();
+            const { token, url: livekitUrl, room: roomName } = await tokenRes.json();
+            console.log(`Joining room ${roomName}`);
             
             this.updateStatus('connecting', 'Connecting to LiveKit...');
             
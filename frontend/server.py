@@ -1,105 +1,173 @@
 #!/usr/bin/env python3
 """
-Simple HTTP server to serve the Trello Voice Assistant frontend
-Enhanced with detailed logging for debugging
+HTTP server for the Trello Voice Assistant frontend: static files plus the /token, /api/status, /test and
+/metrics endpoints.
+
+Requests are handled on a thread per connection with HTTP/1.1 keep-alive, a short idle timeout between requests,
+a longer timeout for reading each request and a cap on concurrent connections (excess connections get a 503), so
+one slow client, large download or idle browser tab can't hold up token requests for everyone else.
 """
 
 import os
-import http.server
-import socketserver
-import webbrowser
+import sys
 import json
+import time
+import uuid
+import select
+import signal
+import logging
+import threading
+import http.server
+from functools import partial
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 from urllib.parse import urlparse, parse_qs
-import uuid
-from livekit import api
+
+# Shared modules (metrics) live in the project root
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from metrics import MetricsAggregator, render_prometheus
+from frontend.static_cache import StaticAssetCache
+from frontend.rooms import CapacityError, RoomAllocator, room_allocator_from_env
+
+logger = logging.getLogger("frontend")
+
+FRONTEND_DIR = Path(__file__).resolve().parent
+
+# Receives metrics published by agent processes; started by serve_frontend()
+metrics_aggregator = None
 
 class CustomHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
+    # Keep-alive: every response carries a Content-Length
+    protocol_version = "HTTP/1.1"
+    # Socket timeout for reading and answering a request
+    timeout = 30
+    # How long a connection may wait for its next request while holding a connection slot
+    idle_timeout = 5
+
+    def setup(self):
+        super().setup()
+        self.requests_handled = 0
+
+    def handle_one_request(self):
+        if not self.wait_for_request():
+            self.close_connection = True
+            return
+        super().handle_one_request()
+        self.requests_handled += 1
+
+    def wait_for_request(self):
+        """
+        Wait up to `idle_timeout` seconds for the next request to start arriving. Keep-alive connections stop
+        waiting as soon as the server drains. Returns False when the connection should be closed instead.
+        """
+        deadline = time.monotonic() + self.idle_timeout
+        while True:
+            # A pipelined request may already be buffered; peek without blocking
+            self.connection.settimeout(0)
+            try:
+                if self.rfile.peek(1):
+                    return True
+            finally:
+                self.connection.settimeout(self.timeout)
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or (self.requests_handled and self.server.draining):
+                return False
+            readable, _, _ = select.select([self.connection], [], [], min(remaining, 0.5))
+            if readable:
+                return True
+
     def log_message(self, format, *args):
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        # Color coding for different request types
-        colors = {
-            "GET": "\033[94m",     # Blue
-            "POST": "\033[92m",    # Green
-            "ERROR": "\033[91m",   # Red
-            "RESET": "\033[0m"     # Reset
-        }
-        
-        method = args[0].split()[0] if args else "UNKNOWN"
-        color = colors.get(method, colors.get("GET"))
-        
-        print(f"{color}[{timestamp}] {format % args}{colors['RESET']}")
-    
+        logger.info("%s %s", self.client_address[0], format % args)
+
     def end_headers(self):
         # Enable CORS for local development
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        if self.server.draining:
+            # Shutting down: finish this response, then let the client reconnect elsewhere
+            self.send_header('Connection', 'close')
         super().end_headers()
 
+    def send_json(self, data, status=200, indent=None):
+        body = json.dumps(data, indent=indent).encode()
+        self.send_response(status)
+        self.send_header('Content-type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
     def do_GET(self):
-        # Log detailed request info
-        client_ip = self.client_address[0]
-        user_agent = self.headers.get('User-Agent', 'Unknown')
-        
-        print(f"\033[96m[{datetime.now().strftime('%H:%M:%S')}] 📥 REQUEST: {self.path}")
-        print(f"   Client: {client_ip}")
-        print(f"   User-Agent: {user_agent[:50]}...\033[0m")
-        
+        logger.debug("GET %s from %s (User-Agent: %.50s)", self.path, self.client_address[0],
+                     self.headers.get('User-Agent', 'Unknown'))
+
         # Handle special endpoints
-        if self.path == '/token':
+        path = urlparse(self.path).path
+        if path == '/token':
             self.send_token_response()
             return
-        elif self.path == '/api/status':
+        elif path == '/api/status':
             self.send_status_response()
             return
-        elif self.path == '/test':
+        elif path == '/test':
             self.send_test_response()
             return
-        
-        # Default file serving
-        super().do_GET()
-    
+        elif path == '/metrics':
+            self.send_metrics_response()
+            return
+
+        # Static files from memory, falling back to disk for anything the cache doesn't hold
+        if not self.send_static(path):
+            super().do_GET()
+
+    def do_HEAD(self):
+        if not self.send_static(urlparse(self.path).path, head=True):
+            super().do_HEAD()
+
+    def send_static(self, path, head=False):
+        """Serve a cached static asset with ETag revalidation. Returns False if the path isn't cached."""
+        cache = getattr(self.server, "static_cache", None)
+        asset = cache.get(path) if cache is not None else None
+        if asset is None:
+            return False
+        body, encoding, etag = asset.representation(self.headers.get('Accept-Encoding', ''))
+        not_modified = asset.matches(self.headers.get('If-None-Match', ''))
+        self.send_response(304 if not_modified else 200)
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', asset.cache_control)
+        self.send_header('Vary', 'Accept-Encoding')
+        if not_modified:
+            self.end_headers()
+            return True
+        self.send_header('Content-type', asset.content_type)
+        self.send_header('Last-Modified', asset.last_modified)
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+        return True
+
     def do_POST(self):
         # Handle POST requests (for voice data, etc.)
         content_length = int(self.headers.get('Content-Length', 0))
         content_type = self.headers.get('Content-Type', '')
-        
-        print(f"\033[93m[{datetime.now().strftime('%H:%M:%S')}] 📤 POST: {self.path}")
-        print(f"   Content-Length: {content_length}")
-        print(f"   Content-Type: {content_type}\033[0m")
-        
-        if content_length > 0:
-            post_data = self.rfile.read(content_length)
-            try:
-                if 'json' in content_type:
-                    data = json.loads(post_data.decode('utf-8'))
-                    print(f"\033[93m   Data: {json.dumps(data, indent=2)[:200]}...\033[0m")
-                else:
-                    print(f"\033[93m   Raw Data Length: {len(post_data)} bytes\033[0m")
-            except:
-                print(f"\033[93m   Raw Data Length: {len(post_data)} bytes\033[0m")
-        
-        # Send a simple response
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        
-        response = {
+        # Always drain the body so the connection can be reused
+        post_data = self.rfile.read(content_length) if content_length > 0 else b""
+        logger.debug("POST %s: %d bytes of %s", self.path, len(post_data), content_type or "unknown type")
+
+        self.send_json({
             "status": "received",
             "timestamp": datetime.now().isoformat(),
             "path": self.path
-        }
-        self.wfile.write(json.dumps(response).encode())
+        })
 
     def do_OPTIONS(self):
-        print(f"\033[95m[{datetime.now().strftime('%H:%M:%S')}] ⚙️ OPTIONS: {self.path}\033[0m")
         self.send_response(200)
+        self.send_header('Content-Length', '0')
         self.end_headers()
-    
+
     def send_token_response(self):
         """Generate and send a LiveKit access token."""
         livekit_url = os.environ.get('LIVEKIT_URL')
@@ -107,66 +175,81 @@ class CustomHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
         livekit_api_secret = os.environ.get('LIVEKIT_API_SECRET')
 
         if not all([livekit_url, livekit_api_key, livekit_api_secret]):
+            logger.error("Missing LiveKit environment variables (LIVEKIT_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET)")
             self.send_error(500, "LiveKit server environment variables are not set")
-            print("\033[91mError: Missing LiveKit environment variables (LIVEKIT_URL, LIVEKIT_API_KEY, LIVEKIT_API_SECRET)\033[0m")
             return
 
         # Simple unique identity for the user, can be expanded later
         identity = f"user-{uuid.uuid4()}"
-        
-        # Create a grant for a specific room and identity
-        # The room name should match the one the agent connects to
-        room_name = os.environ.get('LIVEKIT_ROOM', 'trello-voice-agent-room')
-        
+
+        # Pick the room (per session, per team or shared) and the agent pool to dispatch to it
+        team = parse_qs(urlparse(self.path).query).get('team', [None])[0]
+        allocator = getattr(self.server, "room_allocator", None) or RoomAllocator(
+            mode="shared", shared_room=os.environ.get('LIVEKIT_ROOM', 'trello-voice-agent-room'))
+        try:
+            allocation = allocator.allocate(team=team)
+        except CapacityError as e:
+            logger.warning("Token refused: %s", e)
+            body = json.dumps({"error": str(e)}).encode()
+            self.send_response(503)
+            self.send_header('Retry-After', '10')
+            self.send_header('Content-type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
+        # livekit.api pulls in aiohttp and protobuf; keep it off the startup path (see warm_token_imports)
+        from livekit import api
+
         token = (
             api.AccessToken(livekit_api_key, livekit_api_secret)
             .with_identity(identity)
             .with_name("Frontend User")
-            .with_grant(api.VideoGrant(room=room_name))
-            .to_jwt()
+            .with_grant(api.VideoGrant(room_join=True, room=allocation.room))
+            .with_ttl(timedelta(seconds=allocator.ttl))
         )
-        
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.end_headers()
-        
-        response = {
-            "token": token,
+        if allocation.pool:
+            # Explicit dispatch: only workers registered under this agent name are sent the job
+            token = token.with_room_config(api.RoomConfiguration(
+                agents=[api.RoomAgentDispatch(agent_name=allocation.pool)]
+            ))
+
+        logger.info("Token generated for identity %s in room %s (pool %s)", identity, allocation.room, allocation.pool or "auto")
+        self.send_json({
+            "token": token.to_jwt(),
             "url": livekit_url,
-            "identity": identity
-        }
-        
-        print(f"\033[92m[{datetime.now().strftime('%H:%M:%S')}] 🔑 Token generated for identity: {identity}\033[0m")
-        self.wfile.write(json.dumps(response).encode())
+            "identity": identity,
+            "room": allocation.room,
+            "pool": allocation.pool
+        })
 
     def send_test_response(self):
         """Send test response"""
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        
-        test_data = {
+        self.send_json({
             "status": "ok",
             "message": "Test endpoint working",
             "timestamp": datetime.now().isoformat(),
             "server": "Voice MCP Agent Frontend"
-        }
-        
-        print(f"\033[92m[{datetime.now().strftime('%H:%M:%S')}] ✅ TEST ENDPOINT ACCESSED\033[0m")
-        self.wfile.write(json.dumps(test_data, indent=2).encode())
-    
-    def send_status_response(self):
-        """Send status response"""
+        }, indent=2)
+
+    def send_metrics_response(self):
+        """Send agent metrics in Prometheus text format"""
+        snapshot = metrics_aggregator.aggregate() if metrics_aggregator else {}
+        body = render_prometheus(snapshot).encode()
         self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Content-type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
         self.end_headers()
-        
+        self.wfile.write(body)
+
+    def send_status_response(self):
+        """Send status response"""
         # Get current port from environment or default
         current_port = int(os.environ.get('PORT', 8080))
-        
-        status_data = {
+        allocator = getattr(self.server, "room_allocator", None)
+
+        self.send_json({
             "frontend_server": "running",
             "timestamp": datetime.now().isoformat(),
             "port": current_port,
@@ -175,76 +258,169 @@ class CustomHTTPRequestHandler(http.server.SimpleHTTPRequestHandler):
                 "main": "/",
                 "debug": "/debug.html",
                 "test": "/test",
-                "status": "/api/status"
-            }
-        }
-        
-        print(f"\033[92m[{datetime.now().strftime('%H:%M:%S')}] 📊 STATUS ENDPOINT ACCESSED\033[0m")
-        self.wfile.write(json.dumps(status_data, indent=2).encode())
+                "status": "/api/status",
+                "metrics": "/metrics"
+            },
+            "rooms": {
+                "mode": allocator.mode,
+                "active": len(allocator.rooms()),
+                "pools": {name: {"rooms": rooms, "capacity": capacity} for name, (rooms, capacity) in allocator.pool_load().items()}
+            } if allocator else None
+        }, indent=2)
+
+class FrontendHTTPServer(http.server.ThreadingHTTPServer):
+    """
+    Thread-per-connection server that serves at most `max_connections` connections at once.
+    Connections over the limit are answered with 503 immediately instead of queueing behind slow clients.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+    request_queue_size = 128
+
+    BUSY_BODY = b"Server is too busy, please retry.\n"
+
+    def __init__(self, server_address, handler_class, max_connections=64, static_cache=None, room_allocator=None):
+        self.max_connections = max_connections
+        self.static_cache = static_cache
+        self.room_allocator = room_allocator
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self.draining = False
+        self._active = 0
+        self._idle = threading.Condition()
+        super().__init__(server_address, handler_class)
+
+    def process_request(self, request, client_address):
+        if not self._slots.acquire(blocking=False):
+            logger.warning("Rejecting connection from %s: %d connections in progress", client_address[0], self.max_connections)
+            self._reject(request)
+            return
+        with self._idle:
+            self._active += 1
+        try:
+            super().process_request(request, client_address)
+        except Exception:
+            self._release()
+            raise
+
+    def process_request_thread(self, request, client_address):
+        try:
+            super().process_request_thread(request, client_address)
+        finally:
+            self._release()
+
+    def _release(self):
+        self._slots.release()
+        with self._idle:
+            self._active -= 1
+            self._idle.notify_all()
+
+    def drain(self, timeout):
+        """
+        Wait up to `timeout` seconds for open connections to finish, closing keep-alive connections after
+        their current response. Returns whether all finished.
+        """
+        self.draining = True
+        with self._idle:
+            return self._idle.wait_for(lambda: self._active == 0, timeout)
+
+    def _reject(self, request):
+        try:
+            request.settimeout(1.0)
+            request.sendall(
+                b"HTTP/1.1 503 Service Unavailable\r\nContent-Type: text/plain\r\nRetry-After: 1\r\n"
+                b"Connection: close\r\nContent-Length: " + str(len(self.BUSY_BODY)).encode() + b"\r\n\r\n" + self.BUSY_BODY
+            )
+        except OSError:
+            pass
+        finally:
+            self.shutdown_request(request)
+
+def create_server(port, host="", directory=FRONTEND_DIR, max_connections=None, request_timeout=None, dev_mode=None,
+                  idle_timeout=None):
+    """
+    Build the frontend server without starting it.
+    FRONTEND_MAX_CONNECTIONS (default 64), FRONTEND_REQUEST_TIMEOUT (seconds, default 30) and
+    FRONTEND_IDLE_TIMEOUT (seconds between keep-alive requests, default 5) apply when not given.
+    Static files are loaded into memory; in dev mode (FRONTEND_DEV, default on outside Railway) they are
+    reloaded when they change on disk.
+    """
+    if dev_mode is None:
+        dev_mode = os.environ.get('FRONTEND_DEV', '0' if os.environ.get('RAILWAY_ENVIRONMENT') else '1') == '1'
+    if max_connections is None:
+        max_connections = int(os.environ.get('FRONTEND_MAX_CONNECTIONS', 64))
+    if request_timeout is None:
+        request_timeout = float(os.environ.get('FRONTEND_REQUEST_TIMEOUT', 30))
+    if idle_timeout is None:
+        idle_timeout = float(os.environ.get('FRONTEND_IDLE_TIMEOUT', 5))
+    handler_class = type("FrontendRequestHandler", (CustomHTTPRequestHandler,),
+                         {"timeout": request_timeout, "idle_timeout": idle_timeout})
+    handler = partial(handler_class, directory=str(directory))
+    static_cache = StaticAssetCache(directory, dev_mode=dev_mode).load()
+    return FrontendHTTPServer((host, port), handler, max_connections=max_connections, static_cache=static_cache,
+                              room_allocator=room_allocator_from_env())
+
+def warm_token_imports():
+    try:
+        from livekit import api  # noqa: F401
+    except ImportError as e:
+        logger.warning("livekit.api unavailable, /token will fail: %s", e)
 
 def serve_frontend(port=None):
     """Serve the frontend on the specified port"""
-    
+    if not logging.getLogger().handlers:
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
     # Get port from Railway environment variable or use default
     if port is None:
         port = int(os.environ.get('PORT', 8080))
-    
-    # Change to the frontend directory
-    frontend_dir = Path(__file__).parent
-    os.chdir(frontend_dir)
-    
-    # Create the server
-    handler = CustomHTTPRequestHandler
-    
+
+    # Listen for metrics published by agent processes
+    global metrics_aggregator
+    if metrics_aggregator is None:
+        metrics_addr = os.environ.get("AGENT_METRICS_ADDR", "127.0.0.1:9464").split(",")[0].strip()
+        if metrics_addr:
+            try:
+                metrics_aggregator = MetricsAggregator(metrics_addr).start()
+            except OSError as e:
+                logger.error("Metrics listener unavailable on %s: %s", metrics_addr, e)
+
     # Bind to 0.0.0.0 for Railway deployment, localhost for local dev
-    host = "0.0.0.0" if os.environ.get('RAILWAY_ENVIRONMENT') else ""
-    
-    with socketserver.TCPServer((host, port), handler) as httpd:
-        # Determine if running on Railway
-        is_railway = bool(os.environ.get('RAILWAY_ENVIRONMENT'))
+    is_railway = bool(os.environ.get('RAILWAY_ENVIRONMENT'))
+    host = "0.0.0.0" if is_railway else ""
+
+    with create_server(port, host) as httpd:
         base_url = f"http://{host if host else 'localhost'}:{port}"
-        
-        print("\033[95m" + "=" * 70)
-        print("TRELLO VOICE ASSISTANT - FRONTEND SERVER")
-        print("=" * 70 + "\033[0m")
-        print(f"\033[92mServer running at: {base_url}\033[0m")
-        print(f"\033[96mEnvironment: {'Railway' if is_railway else 'Local Development'}\033[0m")
-        print(f"\033[96mPort: {port} {'(Railway assigned)' if is_railway else '(default/local)'}\033[0m")
-        print(f"\033[94mDebug tool: {base_url}/debug.html\033[0m")
-        print(f"\033[93mTest endpoint: {base_url}/test\033[0m")
-        print(f"\033[96mStatus endpoint: {base_url}/api/status\033[0m")
-        print(f"\033[90mServing from: {frontend_dir}\033[0m")
-        
-        print(f"\n\033[97mFeatures:\033[0m")
-        print("  - \033[96mJarvis-style voice interface\033[0m")
-        print("  - \033[96mPush-to-talk interaction\033[0m") 
-        print("  - \033[96mReal-time speech recognition\033[0m")
-        print("  - \033[96mSleek animations & glassmorphism\033[0m")
-        print("  - \033[96mTrello integration ready\033[0m")
-        
-        print(f"\n\033[97mControls:\033[0m")
-        print("  - \033[93mHold microphone button to speak\033[0m")
-        print("  - \033[93mCtrl+Space for keyboard push-to-talk\033[0m")
-        print("  - \033[93mUse quick action buttons for common tasks\033[0m")
-        print("  - \033[91mPress Ctrl+C to stop the server\033[0m")
-        
-        print(f"\n\033[97mDebug Info:\033[0m")
-        print("  - \033[90mCheck terminal for real-time request logs\033[0m")
-        print("  - \033[90mOpen browser dev tools (F12) for client logs\033[0m")
-        print("  - \033[90mUse debug.html for isolated voice testing\033[0m")
-        
-        print("\033[95m" + "=" * 70 + "\033[0m")
-        print("\033[92mServer is ready! Logs will appear below...\033[0m")
-        print("\033[95m" + "=" * 70 + "\033[0m")
-        
-        # Open browser automatically (commented out for debugging)
-        # webbrowser.open(f'http://localhost:{port}')
-        
+        logger.info("Trello Voice Assistant frontend running at %s (%s), serving %s",
+                    base_url, "Railway" if is_railway else "local development", FRONTEND_DIR)
+        logger.info("Endpoints: /debug.html /token /test /api/status /metrics; up to %d concurrent connections",
+                    httpd.max_connections)
+
+        httpd.room_allocator.start_reconciler(float(os.environ.get('ROOM_RECONCILE_INTERVAL', 15)))
+        logger.info("Room mode: %s, agent pools: %s", httpd.room_allocator.mode, httpd.room_allocator.pools or "automatic dispatch")
+
+        # Load the token minting dependencies once the server is already accepting requests
+        threading.Thread(target=warm_token_imports, name="warm-imports", daemon=True).start()
+
+        def stop(signum, frame):
+            # shutdown() waits for serve_forever() to return, so it can't run on this (the serving) thread
+            logger.info("Received %s, no longer accepting connections", signal.Signals(signum).name)
+            threading.Thread(target=httpd.shutdown, name="frontend-shutdown", daemon=True).start()
+
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, stop)
+
         try:
             httpd.serve_forever()
         except KeyboardInterrupt:
-            print(f"\n\n\033[91mServer stopped by user\033[0m")
-            print("\033[92mThank you for using Trello Voice Assistant!\033[0m")
+            logger.info("Server stopped by user")
+        finally:
+            httpd.room_allocator.stop()
+            drain_timeout = float(os.environ.get('FRONTEND_DRAIN_TIMEOUT', 10))
+            if not httpd.drain(drain_timeout):
+                logger.warning("Closing with connections still open after %gs", drain_timeout)
+            if metrics_aggregator is not None:
+                metrics_aggregator.close()
+                metrics_aggregator = None
 
 if __name__ == "__main__":
-    serve_frontend() 
\ No newline at end of file
+    serve_frontend()
@@ -0,0 +1,196 @@
+"""
+frontend/static_cache.py
+
+Loads the frontend's static files into memory at startup, precompresses them (gzip, and brotli when the
+`brotli` package is installed) and gives each a strong ETag. HTML pages are rewritten to reference
+fingerprinted asset names (script.<hash>.js), which can be cached forever; everything else is revalidated.
+In dev mode, a changed file triggers a reload.
+"""
+
+import re
+import gzip
+import hashlib
+import logging
+import mimetypes
+import threading
+from dataclasses import dataclass, field
+from email.utils import formatdate
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger("frontend.static")
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+_FINGERPRINTED = re.compile(r"\.[0-9a-f]{8,}\.[A-Za-z0-9]+$")
+_ASSET_REF = re.compile(r"""((?:src|href)=["'])([^"':?#]+\.(?:js|css))(["'])""")
+_COMPRESSIBLE = ("text/", "application/javascript", "application/json", "image/svg+xml")
+_SKIP_SUFFIXES = {".py", ".pyc"}
+
+
+@dataclass
+class StaticAsset:
+    path: str
+    content_type: str
+    body: bytes
+    etag: str
+    mtime: float
+    cache_control: str = REVALIDATE
+    encodings: Dict[str, bytes] = field(default_factory=dict)
+
+    @property
+    def last_modified(self) -> str:
+        return formatdate(self.mtime, usegmt=True)
+
+    def representation(self, accept_encoding: str) -> Tuple[bytes, Optional[str], str]:
+        """
+        Pick the smallest encoding the client accepts.
+        Returns (body, content encoding or None, ETag of that representation).
+        """
+        accepted = _accepted_encodings(accept_encoding)
+        for encoding in ("br", "gzip"):
+            if encoding in self.encodings and encoding in accepted:
+                return self.encodings[encoding], encoding, f'"{self.etag}-{encoding}"'
+        return self.body, None, f'"{self.etag}"'
+
+    def matches(self, if_none_match: str) -> bool:
+        """Whether an If-None-Match header matches any representation of this asset."""
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in tags:
+            return True
+        return any(tag.strip('"').split("-")[0] == self.etag for tag in tags)
+
+
+def _accepted_encodings(header: str) -> set:
+    accepted = set()
+    for item in header.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = params.strip()
+        if quality.startswith("q=") and quality[2:].strip() in ("0", "0.0", "0.00", "0.000"):
+            continue
+        if name:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+def fingerprinted_name(path: str, digest: str) -> str:
+    stem, dot, suffix = path.rpartition(".")
+    return f"{stem}.{digest[:10]}.{suffix}" if dot else f"{path}.{digest[:10]}"
+
+
+class StaticAssetCache:
+    """
+    In-memory copy of a directory's static files, keyed by URL path ('/index.html').
+    '/' maps to index.html; fingerprinted aliases map to the same asset with an immutable Cache-Control.
+    """
+
+    def __init__(self, root, dev_mode: bool = False, compress_min_bytes: int = 256):
+        self.root = Path(root)
+        self.dev_mode = dev_mode
+        self.compress_min_bytes = compress_min_bytes
+        self._assets: Dict[str, StaticAsset] = {}
+        self._mtimes: Dict[Path, float] = {}
+        self._lock = threading.Lock()
+
+    def load(self) -> "StaticAssetCache":
+        assets: Dict[str, StaticAsset] = {}
+        mtimes: Dict[Path, float] = {}
+        for file in sorted(self.root.rglob("*")):
+            if not file.is_file() or self._skipped(file):
+                continue
+            stat = file.stat()
+            mtimes[file] = stat.st_mtime
+            url_path = "/" + file.relative_to(self.root).as_posix()
+            assets[url_path] = self._build(url_path, file.read_bytes(), stat.st_mtime)
+
+        # Point pages at fingerprinted names so the referenced assets can be cached indefinitely
+        aliases = {}
+        for url_path, asset in assets.items():
+            if _FINGERPRINTED.search(url_path) is None and url_path.endswith((".js", ".css")):
+                alias = fingerprinted_name(url_path, asset.etag)
+                aliases[alias] = StaticAsset(alias, asset.content_type, asset.body, asset.etag, asset.mtime,
+                                             IMMUTABLE, asset.encodings)
+        for url_path, asset in list(assets.items()):
+            if asset.content_type == "text/html":
+                body = self._rewrite_references(url_path, asset.body, assets)
+                if body != asset.body:
+                    assets[url_path] = self._build(url_path, body, asset.mtime)
+        assets.update(aliases)
+        if "/index.html" in assets:
+            assets["/"] = assets["/index.html"]
+
+        with self._lock:
+            self._assets = assets
+            self._mtimes = mtimes
+        logger.info("Loaded %d static assets from %s (brotli %s)", len(mtimes), self.root,
+                    "enabled" if brotli else "unavailable")
+        return self
+
+    def _skipped(self, file: Path) -> bool:
+        """Whether `file` is never served: server code, dotfiles and anything under __pycache__ and the like."""
+        return file.suffix in _SKIP_SUFFIXES or any(
+            part.startswith((".", "__")) for part in file.relative_to(self.root).parts)
+
+    def _build(self, url_path: str, body: bytes, mtime: float) -> StaticAsset:
+        content_type = mimetypes.guess_type(url_path)[0] or "application/octet-stream"
+        digest = hashlib.sha256(body).hexdigest()
+        asset = StaticAsset(
+            path=url_path,
+            content_type=content_type,
+            body=body,
+            etag=digest[:32],
+            mtime=mtime,
+            cache_control=IMMUTABLE if _FINGERPRINTED.search(url_path) else REVALIDATE,
+        )
+        if len(body) >= self.compress_min_bytes and content_type.startswith(_COMPRESSIBLE):
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(compressed) < len(body):
+                asset.encodings["gzip"] = compressed
+            if brotli is not None:
+                compressed = brotli.compress(body, quality=11)
+                if len(compressed) < len(body):
+                    asset.encodings["br"] = compressed
+        return asset
+
+    def _rewrite_references(self, page_path: str, body: bytes, assets: Dict[str, StaticAsset]) -> bytes:
+        base = page_path.rsplit("/", 1)[0]
+
+        def replace(match):
+            ref = match.group(2)
+            target = assets.get(ref if ref.startswith("/") else f"{base}/{ref}")
+            if target is None or _FINGERPRINTED.search(ref):
+                return match.group(0)
+            return f"{match.group(1)}{fingerprinted_name(ref, target.etag)}{match.group(3)}"
+
+        try:
+            text = body.decode("utf-8")
+        except UnicodeDecodeError:
+            return body
+        return _ASSET_REF.sub(replace, text).encode("utf-8")
+
+    def _changed(self) -> bool:
+        for file, mtime in self._mtimes.items():
+            try:
+                if file.stat().st_mtime != mtime:
+                    return True
+            except FileNotFoundError:
+                return True
+        return False
+
+    def get(self, url_path: str) -> Optional[StaticAsset]:
+        """Look up an asset by URL path. In dev mode, reloads first if files changed on disk."""
+        if self.dev_mode:
+            with self._lock:
+                file = self.root / url_path.lstrip("/")
+                missing = (url_path not in self._assets and ".." not in url_path
+                           and file.is_file() and not self._skipped(file))
+                changed = missing or self._changed()
+            if changed:
+                self.load()
+        return self._assets.get(url_path)
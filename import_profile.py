@@ -0,0 +1,78 @@
+"""
+import_profile.py
+
+Measures what each service mode imports at startup: runs a fresh interpreter with `-X importtime`, parses its
+report into a module tree and prints the slowest branches. Used by `railway_start.py --profile-imports`.
+"""
+
+import os
+import re
+import sys
+import subprocess
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s+)(\S+)")
+
+
+@dataclass
+class ImportNode:
+    name: str
+    self_us: int
+    cumulative_us: int
+    children: List["ImportNode"] = field(default_factory=list)
+
+
+def parse_importtime(report: str) -> List[ImportNode]:
+    """
+    Parse `python -X importtime` output into a forest of ImportNodes.
+    The report lists a module after the modules it imported, indented one level deeper.
+    Returns the top-level imports in import order.
+    """
+    pending: Dict[int, List[ImportNode]] = {}
+    for line in report.splitlines():
+        match = _LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        depth = (len(indent) - 1) // 2
+        node = ImportNode(name, int(self_us), int(cumulative_us), pending.pop(depth + 1, []))
+        pending.setdefault(depth, []).append(node)
+    return pending.get(0, [])
+
+
+def render_tree(roots: List[ImportNode], min_ms: float = 5.0, max_depth: int = 6) -> str:
+    """Render the branches taking at least `min_ms` milliseconds, slowest first."""
+    lines = []
+
+    def walk(nodes: List[ImportNode], depth: int) -> None:
+        for node in sorted(nodes, key=lambda n: n.cumulative_us, reverse=True):
+            if node.cumulative_us < min_ms * 1000:
+                break
+            lines.append(f"{node.cumulative_us / 1000:9.1f} ms {node.self_us / 1000:8.1f} ms  {'  ' * depth}{node.name}")
+            if depth + 1 < max_depth:
+                walk(node.children, depth + 1)
+
+    lines.append(f"{'cumul.':>12} {'self':>11}  module")
+    walk(roots, 0)
+    total = sum(node.cumulative_us for node in roots) / 1000
+    lines.append(f"{total:9.1f} ms total")
+    return "\n".join(lines)
+
+
+def profile_imports(modules: List[str]) -> List[ImportNode]:
+    """
+    Import `modules` in a fresh interpreter from the project root.
+    Returns the parsed import tree; raises RuntimeError if the import fails.
+    """
+    code = "; ".join(f"import {module}" for module in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        errors = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"Importing {', '.join(modules)} failed:\n" + "\n".join(errors[-10:]))
+    return parse_importtime(result.stderr)
@@ -0,0 +1,192 @@
+"""
+llm_router.py
+
+Provides the RoutingLLM wrapper, which sends simple turns (short confirmations, single-tool lookups)
+to a local Ollama model and multi-step turns to the cloud LLM, with per-route latency metrics and
+fallback to the cloud model when the local one fails.
+"""
+
+import os
+import re
+import asyncio
+import logging
+import weakref
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, Dict, Optional
+
+from livekit.agents import llm
+from utils import percentile
+
+logger = logging.getLogger(__name__)
+
+ROUTE_LOCAL = "local"
+ROUTE_CLOUD = "cloud"
+
+CONFIRMATIONS = {
+    "yes", "yeah", "yep", "yup", "no", "nope", "ok", "okay", "sure", "thanks", "thank you",
+    "great", "cool", "perfect", "got it", "go ahead", "do it", "sounds good", "that's all",
+    "never mind", "cancel", "stop", "hello", "hi", "hey", "bye", "goodbye",
+}
+
+# Phrases that usually mean the user wants several dependent steps
+PLANNING_PATTERN = re.compile(
+    r"\b(and then|after that|plan|organi[sz]e|reorgani[sz]e|every|each|all (?:the|my)|"
+    r"compare|summari[sz]e|prioriti[sz]e|move .+ and|create .+ and)\b",
+    re.IGNORECASE,
+)
+
+
+def _last_user_text(chat_ctx) -> str:
+    for item in reversed(chat_ctx.items):
+        if getattr(item, "type", None) == "message" and item.role == "user":
+            return item.text_content or ""
+    return ""
+
+
+def _tool_calls_this_turn(chat_ctx) -> int:
+    count = 0
+    for item in reversed(chat_ctx.items):
+        item_type = getattr(item, "type", None)
+        if item_type == "message" and item.role == "user":
+            break
+        if item_type == "function_call":
+            count += 1
+    return count
+
+
+def classify_turn(chat_ctx, local_max_words: int = 12) -> str:
+    """
+    Cheap heuristic classifier for a turn.
+    Returns ROUTE_LOCAL for short confirmations and single-tool lookups, ROUTE_CLOUD otherwise.
+    """
+    text = _last_user_text(chat_ctx).strip()
+    normalized = re.sub(r"[^\w\s']", "", text.lower()).strip()
+    if not normalized:
+        return ROUTE_CLOUD
+    if normalized in CONFIRMATIONS:
+        return ROUTE_LOCAL
+    # More than one tool call already in this turn means the model is chaining steps
+    if _tool_calls_this_turn(chat_ctx) > 1:
+        return ROUTE_CLOUD
+    if PLANNING_PATTERN.search(normalized):
+        return ROUTE_CLOUD
+    if len(normalized.split()) <= local_max_words:
+        return ROUTE_LOCAL
+    return ROUTE_CLOUD
+
+
+@dataclass
+class RouteStats:
+    """Latency and usage counters for one route. `fallbacks` counts turns of the route answered by the cloud model."""
+    requests: int = 0
+    errors: int = 0
+    fallbacks: int = 0
+    ttft: Deque[float] = field(default_factory=lambda: deque(maxlen=500))
+    duration: Deque[float] = field(default_factory=lambda: deque(maxlen=500))
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "fallbacks": self.fallbacks,
+            "ttft_p50": percentile(self.ttft, 50),
+            "ttft_p95": percentile(self.ttft, 95),
+            "duration_p50": percentile(self.duration, 50),
+            "duration_p95": percentile(self.duration, 95),
+        }
+
+
+class RoutingLLM(llm.LLM):
+    """
+    LLM wrapper that picks a local or cloud model for every turn.
+
+    Local turns go through a FallbackAdapter so that an error or timeout on the local model
+    retries the request on the cloud model. Metrics emitted by the wrapped models are recorded
+    per route and re-emitted so the session's metrics pipeline keeps working.
+    """
+
+    def __init__(
+        self,
+        *,
+        local_llm: llm.LLM,
+        cloud_llm: llm.LLM,
+        classifier: Optional[Callable[[llm.ChatContext], str]] = None,
+        local_attempt_timeout: float = 5.0,
+    ):
+        super().__init__()
+        self._local = local_llm
+        self._cloud = cloud_llm
+        self._classifier = classifier or classify_turn
+        self._local_with_fallback = llm.FallbackAdapter(
+            [local_llm, cloud_llm],
+            attempt_timeout=local_attempt_timeout,
+            max_retry_per_llm=0,
+        )
+        self.stats: Dict[str, RouteStats] = {ROUTE_LOCAL: RouteStats(), ROUTE_CLOUD: RouteStats()}
+        # Route of each stream chat() returned, by the stream's metrics task, which emits its metrics. Turns can
+        # overlap (preemptive generation runs a speculative chat alongside the real one), so this is per request.
+        self._routes: "weakref.WeakKeyDictionary[asyncio.Task, str]" = weakref.WeakKeyDictionary()
+        # Request ids the cloud model answered inside the FallbackAdapter, i.e. local turns that fell back
+        self._fell_back: Deque[str] = deque(maxlen=100)
+
+        self._cloud.on("metrics_collected", self._on_metrics)
+        self._local_with_fallback.on("metrics_collected", self._on_metrics)
+        self._local_with_fallback.on("llm_availability_changed", self._on_availability_changed)
+
+    def _on_metrics(self, metrics) -> None:
+        route = self._routes.pop(asyncio.current_task(), None)
+        if route is None:
+            # A FallbackAdapter attempt; its stream reports the turn once the adapter's stream ends
+            self._fell_back.append(metrics.request_id)
+            return
+        stats = self.stats[route]
+        if route == ROUTE_LOCAL and metrics.request_id in self._fell_back:
+            self._fell_back.remove(metrics.request_id)
+            stats.fallbacks += 1
+        if getattr(metrics, "ttft", -1) >= 0:
+            stats.ttft.append(metrics.ttft)
+        if getattr(metrics, "duration", None) is not None:
+            stats.duration.append(metrics.duration)
+        self.emit("metrics_collected", metrics)
+
+    def _on_availability_changed(self, ev) -> None:
+        if ev.llm is self._local and not ev.available:
+            self.stats[ROUTE_LOCAL].errors += 1
+            logger.warning("Local LLM unavailable, falling back to cloud LLM")
+
+    def chat(self, *, chat_ctx: llm.ChatContext, tools=None, **kwargs) -> llm.LLMStream:
+        try:
+            route = self._classifier(chat_ctx)
+        except Exception as e:
+            logger.error(f"Turn classifier failed, using cloud LLM: {e}")
+            route = ROUTE_CLOUD
+        self.stats[route].requests += 1
+        logger.debug(f"Routing turn to {route} LLM")
+        target = self._local_with_fallback if route == ROUTE_LOCAL else self._cloud
+        stream = target.chat(chat_ctx=chat_ctx, tools=tools, **kwargs)
+        self._routes[stream._metrics_task] = route
+        return stream
+
+    def summary(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Returns per-route request counts and latency percentiles."""
+        return {route: stats.summary() for route, stats in self.stats.items()}
+
+    async def aclose(self) -> None:
+        await self._local_with_fallback.aclose()
+        await self._cloud.aclose()
+        await self._local.aclose()
+
+
+def router_from_env(cloud_llm: llm.LLM, local_llm: llm.LLM) -> RoutingLLM:
+    """
+    Build a RoutingLLM using AGENT_ROUTER_* environment variables.
+    Returns the configured router.
+    """
+    local_max_words = int(os.environ.get("AGENT_ROUTER_LOCAL_MAX_WORDS", "12"))
+    return RoutingLLM(
+        local_llm=local_llm,
+        cloud_llm=cloud_llm,
+        classifier=lambda chat_ctx: classify_turn(chat_ctx, local_max_words=local_max_words),
+        local_attempt_timeout=float(os.environ.get("AGENT_ROUTER_LOCAL_TIMEOUT", "5")),
+    )
@@ -0,0 +1,120 @@
+"""
+load.py
+
+Computes the load a voice agent worker reports to LiveKit, so new jobs are dispatched to idle workers.
+
+Sessions run in job processes, which publish their metrics to an aggregator in the worker process (next to the
+frontend's); the load model combines the worker's active jobs with the in-flight tool calls and event-loop lag
+those processes report, and with CPU usage. Each signal is scaled to 0..1 against its limit and the busiest one
+is the worker's load.
+"""
+
+import os
+import socket
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from metrics import MetricsAggregator, LOOP_LAG_RECENT, TOOLS_IN_FLIGHT
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LoadSample:
+    jobs: int
+    cpu: float
+    loop_lag: float
+    tool_calls: float
+
+
+def _gauge_values(snapshot: Dict[str, dict], name: str) -> List[float]:
+    return [value for _, value in snapshot.get(name, {}).get("samples", [])]
+
+
+def cpu_usage() -> float:
+    """System CPU usage since the previous call (0..1)."""
+    if psutil is not None:
+        return psutil.cpu_percent(interval=None) / 100
+    return min(1.0, os.getloadavg()[0] / (os.cpu_count() or 1))
+
+
+class WorkerLoadModel:
+    """
+    Load function for WorkerOptions.load_fnc: the maximum of active jobs / `max_jobs`, CPU usage, the worst job
+    process's event-loop lag / `max_loop_lag` and in-flight tool calls / `max_tool_calls`, capped at 1.
+    Job metrics are received on `aggregator_addr`; without one, only jobs and CPU count.
+    """
+
+    def __init__(self, max_jobs: int = 8, max_loop_lag: float = 0.2, max_tool_calls: int = 16,
+                 aggregator_addr: Optional[str] = None, cpu: Callable[[], float] = cpu_usage):
+        self.max_jobs = max_jobs
+        self.max_loop_lag = max_loop_lag
+        self.max_tool_calls = max_tool_calls
+        self.aggregator_addr = aggregator_addr
+        self.cpu = cpu
+        self.last: Optional[LoadSample] = None
+        # Started on first use, in the worker process (WorkerOptions may be pickled before then)
+        self._aggregator: Optional[MetricsAggregator] = None
+
+    @property
+    def aggregator(self) -> Optional[MetricsAggregator]:
+        if self._aggregator is None and self.aggregator_addr:
+            try:
+                self._aggregator = MetricsAggregator(self.aggregator_addr).start()
+            except OSError as e:
+                logger.warning(f"Job metrics unavailable for load reporting on {self.aggregator_addr}: {e}")
+                self.aggregator_addr = None
+        return self._aggregator
+
+    def sample(self, active_jobs: int) -> LoadSample:
+        aggregator = self.aggregator
+        snapshots = aggregator.snapshots() if aggregator is not None else []
+        lags = [lag for s in snapshots for lag in _gauge_values(s, LOOP_LAG_RECENT.name)]
+        tool_calls = sum(calls for s in snapshots for calls in _gauge_values(s, TOOLS_IN_FLIGHT.name))
+        return LoadSample(jobs=active_jobs, cpu=self.cpu(), loop_lag=max(lags, default=0.0), tool_calls=tool_calls)
+
+    def score(self, sample: LoadSample) -> float:
+        return min(1.0, max(
+            sample.jobs / self.max_jobs,
+            sample.cpu,
+            sample.loop_lag / self.max_loop_lag,
+            sample.tool_calls / self.max_tool_calls,
+        ))
+
+    def __call__(self, worker) -> float:
+        self.last = self.sample(len(worker.active_jobs))
+        load = self.score(self.last)
+        logger.debug("Worker load %.2f from %s", load, self.last)
+        return load
+
+    def close(self) -> None:
+        if self._aggregator is not None:
+            self._aggregator.close()
+            self._aggregator = None
+
+
+def _free_udp_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def load_model_from_env() -> WorkerLoadModel:
+    """
+    Build the worker's load model from AGENT_MAX_JOBS (default 8), AGENT_MAX_LOOP_LAG_MS (default 200) and
+    AGENT_MAX_TOOL_CALLS (default 16). Picks a free local port for job metrics and exports it as
+    AGENT_LOAD_ADDR, so the job processes this worker spawns publish to it.
+    """
+    os.environ["AGENT_LOAD_ADDR"] = f"127.0.0.1:{_free_udp_port()}"
+    return WorkerLoadModel(
+        max_jobs=int(os.environ.get("AGENT_MAX_JOBS", "8")),
+        max_loop_lag=float(os.environ.get("AGENT_MAX_LOOP_LAG_MS", "200")) / 1000,
+        max_tool_calls=int(os.environ.get("AGENT_MAX_TOOL_CALLS", "16")),
+        aggregator_addr=os.environ["AGENT_LOAD_ADDR"],
+    )
@@ -0,0 +1,199 @@
+"""
+log_config.py
+
+Keeps logging off the event loop's hot path: records are handed to a background thread through a queue without
+being formatted, per-logger sampling drops chatty debug/info records before they are queued, and the
+background handlers redact credentials (Authorization headers, bearer tokens, HMAC `auth` fields) and cap
+message size when the record is finally formatted.
+"""
+
+import os
+import re
+import copy
+import json
+import queue
+import atexit
+import logging
+import logging.handlers
+from typing import Any, Dict, Optional
+
+REDACTED = "[REDACTED]"
+
+_REDACTIONS = [
+    # Authorization: Bearer xyz / 'Authorization': 'xyz' / Authorization=xyz
+    (re.compile(r"""(Authorization['"]?\s*[:=]\s*['"]?)(?:Bearer\s+)?[^\s'",}]+""", re.IGNORECASE), r"\1" + REDACTED),
+    (re.compile(r"(Bearer\s+)[A-Za-z0-9._~+/=-]+"), r"\1" + REDACTED),
+    # HMAC signatures added by mcp_client.auth
+    (re.compile(r"""(['"]auth['"]\s*:\s*['"])[^'"]*"""), r"\1" + REDACTED),
+]
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def redact(text: str) -> str:
+    for pattern, replacement in _REDACTIONS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def truncate(text: str, limit: int) -> str:
+    if limit and len(text) > limit:
+        return f"{text[:limit]}... [{len(text) - limit} more chars]"
+    return text
+
+
+class LazyJson:
+    """
+    Log argument that serializes `obj` to JSON only when the record is formatted, capped at `limit` characters.
+    Use as logger.debug("Sending %s", LazyJson(payload)).
+    """
+
+    __slots__ = ("obj", "limit")
+
+    def __init__(self, obj: Any, limit: int = 1000):
+        self.obj = obj
+        self.limit = limit
+
+    def __str__(self) -> str:
+        try:
+            text = json.dumps(self.obj, default=str)
+        except (TypeError, ValueError):
+            text = repr(self.obj)
+        return truncate(text, self.limit)
+
+
+class Truncated:
+    """Log argument that renders str(obj) capped at `limit` characters, only when formatted."""
+
+    __slots__ = ("obj", "limit")
+
+    def __init__(self, obj: Any, limit: int = 500):
+        self.obj = obj
+        self.limit = limit
+
+    def __str__(self) -> str:
+        return truncate(str(self.obj), self.limit)
+
+
+class RedactingFilter(logging.Filter):
+    """
+    Formats the message, strips credentials and caps its length.
+    Attached to the background handlers so the work happens off the event loop.
+    """
+
+    def __init__(self, max_chars: int = 2000):
+        super().__init__()
+        self.max_chars = max_chars
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        try:
+            message = record.getMessage()
+        except Exception:
+            return True
+        record.msg = truncate(redact(message), self.max_chars)
+        record.args = None
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a fraction of the records below WARNING per logger, e.g. {"mcp_client.sse_client": 0.1} keeps one in ten.
+    Rates apply to the named logger and its children. Sampling is deterministic, so exactly that fraction is kept.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self._credit: Dict[str, float] = {}
+
+    def _rate(self, name: str) -> Optional[float]:
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate(record.name)
+        if rate is None or rate >= 1:
+            return True
+        credit = self._credit.get(record.name, 0.0) + rate
+        if credit >= 1:
+            self._credit[record.name] = credit - 1
+            return True
+        self._credit[record.name] = credit
+        return False
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that enqueues records as they are. The stock prepare() formats the message in the
+    calling thread, which is the formatting work we want off the event loop.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return copy.copy(record)
+
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """Parse 'logger=rate,logger=rate' (LOG_SAMPLE_RATES)."""
+    rates = {}
+    for item in value.split(","):
+        name, _, rate = item.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = float(rate)
+    return rates
+
+
+def configure_logging() -> None:
+    """
+    Route the root logger's handlers through a background queue listener. Idempotent.
+
+    LOG_SAMPLE_RATES sets per-logger sampling ('mcp_client.sse_client=0.1,mcp-agent-tools=0.5'), LOG_MAX_CHARS
+    caps formatted messages (default 2000) and LOG_QUEUE=0 keeps the handlers synchronous (redaction still applies).
+    """
+    global _listener
+    root = logging.getLogger()
+    if _listener is not None or any(isinstance(h, DeferredQueueHandler) for h in root.handlers):
+        return
+    redacting = RedactingFilter(int(os.environ.get("LOG_MAX_CHARS", "2000")))
+    sampling = SamplingFilter(parse_sample_rates(os.environ.get("LOG_SAMPLE_RATES", "")))
+    handlers = list(root.handlers) or [logging.StreamHandler()]
+    for handler in handlers:
+        if not any(isinstance(f, RedactingFilter) for f in handler.filters):
+            handler.addFilter(redacting)
+    if os.environ.get("LOG_QUEUE", "1") == "0":
+        for handler in handlers:
+            handler.addFilter(sampling)
+            if handler not in root.handlers:
+                root.addHandler(handler)
+        return
+
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(sampling)
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """
+    Flush queued records, stop the background thread and hand the root logger its handlers back, so records
+    logged afterwards are written instead of queued for a listener that is gone.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            if isinstance(handler, DeferredQueueHandler):
+                root.removeHandler(handler)
+        for handler in _listener.handlers:
+            root.addHandler(handler)
+        _listener = None
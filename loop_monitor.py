@@ -0,0 +1,125 @@
+"""
+loop_monitor.py
+
+Watches the agent's asyncio event loop: a ticker task measures how late the loop runs it (event-loop lag) and
+a watchdog thread captures the loop thread's stack whenever a callback holds the loop longer than a threshold,
+so blocking calls in async code paths show up in the logs and in the metrics.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+import weakref
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Optional
+
+from metrics import LOOP_BLOCKS, LOOP_LAG, LOOP_LAG_RECENT
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BlockedCall:
+    started: float
+    duration: float
+    stack: str
+
+
+class LoopMonitor:
+    """
+    Measures event-loop lag every `interval` seconds and reports callbacks that block the loop for more
+    than `threshold` seconds, with the stack the loop thread was executing when the watchdog noticed.
+    """
+
+    def __init__(self, interval: float = 0.05, threshold: float = 0.1, max_stack_depth: int = 30):
+        self.interval = interval
+        self.threshold = threshold
+        self.max_stack_depth = max_stack_depth
+        self.blocks: Deque[BlockedCall] = deque(maxlen=50)
+        self._last_tick = time.monotonic()
+        self._loop_thread: Optional[int] = None
+        self._ticker: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+        self._reported_tick: Optional[float] = None
+        self.recent_lag = 0.0
+
+    def start(self) -> "LoopMonitor":
+        """Start monitoring the running event loop. Must be called from a coroutine on that loop."""
+        if self._ticker is not None:
+            return self
+        self._loop_thread = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stop.clear()
+        self._ticker = asyncio.get_running_loop().create_task(self._tick())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        return self
+
+    async def _tick(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            LOOP_LAG.observe(lag)
+            # Smoothed over roughly the last five ticks, for load reporting
+            self.recent_lag += 0.2 * (lag - self.recent_lag)
+            LOOP_LAG_RECENT.set(self.recent_lag)
+            if lag > self.threshold:
+                logger.warning(f"Event loop blocked for {lag * 1000:.0f} ms")
+            self._last_tick = now
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.threshold / 2):
+            last_tick = self._last_tick
+            stalled = time.monotonic() - last_tick - self.interval
+            if stalled > self.threshold and self._reported_tick != last_tick:
+                # Report each stall once, with the stack as seen while it is still blocking
+                self._reported_tick = last_tick
+                self._report(stalled)
+
+    def _report(self, stalled: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return
+        stack = "".join(traceback.format_stack(frame, limit=self.max_stack_depth))
+        self.blocks.append(BlockedCall(started=time.time() - stalled, duration=stalled, stack=stack))
+        LOOP_BLOCKS.inc()
+        logger.warning(f"Event loop blocked for over {stalled * 1000:.0f} ms, loop thread stack:\n{stack}")
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._ticker is not None:
+            self._ticker.cancel()
+            try:
+                await self._ticker
+            except asyncio.CancelledError:
+                pass
+            self._ticker = None
+        self._watchdog = None
+
+
+_monitors: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, LoopMonitor]" = weakref.WeakKeyDictionary()
+
+
+def start_loop_monitor() -> Optional[LoopMonitor]:
+    """
+    Start the monitor of the running loop when AGENT_LOOP_MONITOR=1. Jobs run as threads each have their own
+    loop, and each loop gets its own monitor. AGENT_LOOP_BLOCK_THRESHOLD_MS (default 100) sets how long a
+    callback may hold the loop before its stack is captured.
+    Returns the monitor, or None when disabled.
+    """
+    if os.environ.get("AGENT_LOOP_MONITOR") != "1":
+        return None
+    loop = asyncio.get_running_loop()
+    monitor = _monitors.get(loop)
+    if monitor is None:
+        threshold = float(os.environ.get("AGENT_LOOP_BLOCK_THRESHOLD_MS", "100")) / 1000
+        monitor = _monitors[loop] = LoopMonitor(threshold=threshold)
+    return monitor.start()
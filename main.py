@@ -6,110 +6,177 @@ Main entrypoint for the agent. Handles server setup, configuration loading, and
 
 import os
 import logging
+import functools
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-from livekit.agents import JobContext, WorkerOptions, cli
+from livekit.agents import JobContext, JobExecutorType, JobProcess, WorkerOptions, cli
 from livekit.agents.voice import AgentSession
-from mcp_client import MCPClient, MCPServerSse
-from mcp_client.agent_tools import MCPToolsIntegration
-import fnmatch
+# agent_core imports the LiveKit plugins, which must be registered on the main thread at import time
 from agent_core import FunctionAgent
-from mcp_config import load_mcp_config, expand_env_vars
-from a2a import A2AServerConfig
-from tool_integration import filtered_prepare_dynamic_tools
-from utils import sanitize_tool_name
+from endpointing import endpointing_from_env
+from tracing import tracer
+from log_config import configure_logging, shutdown_logging
+from loop_monitor import start_loop_monitor
+from load import load_model_from_env
+from answer_cache import answer_cache_totals
+from metrics import registry, observe_span, start_publisher, ACTIVE_SESSIONS, ANSWER_CACHE
 import asyncio
 
+tracer.add_listener(observe_span)
+
+# Seconds each MCP/A2A server gets to close its connection when a job shuts down
+SERVER_CLEANUP_TIMEOUT = 10
+
+def collect_answer_cache_metrics():
+    for result, count in answer_cache_totals().items():
+        ANSWER_CACHE.set(count, result=result)
+
+registry.add_collector(collect_answer_cache_metrics)
+
+def record_pipeline_metrics(ev):
+    """
+    Turn LiveKit pipeline metrics into tracing spans for the stages our own code doesn't wrap (STT, end of turn, TTS).
+    """
+    m = ev.metrics
+    kind = type(m).__name__
+    if kind == "EOUMetrics":
+        tracer.record("stt.end_of_utterance", m.end_of_utterance_delay)
+        tracer.record("stt.transcription", m.transcription_delay)
+    elif kind == "STTMetrics" and not getattr(m, "streamed", False):
+        tracer.record("stt", m.duration)
+    elif kind == "TTSMetrics" and getattr(m, "ttfb", -1) >= 0:
+        tracer.record("tts.first_byte", m.ttfb, characters=getattr(m, "characters_count", 0))
+
+def prewarm(proc: JobProcess):
+    """
+    Runs in each idle job process before it is assigned a job, so the worker itself starts without
+    loading the MCP/A2A client stack, and jobs don't pay for it (or for loading the VAD model) on their first turn.
+    """
+    from livekit.plugins import silero
+    import mcp_client.agent_tools, mcp_config, tool_integration, config_watcher, recovery, tenancy  # noqa: F401
+    proc.userdata["vad"] = silero.VAD.load()
+
 async def entrypoint(ctx: JobContext):
     """
     Main entrypoint for the LiveKit agent application.
     Loads configuration, sets up MCP and A2A servers, prepares tools, and starts the agent session.
     """
+    # Imported here rather than at module load so the worker process starts quickly (see prewarm)
+    from mcp_client.agent_tools import MCPToolsIntegration
+    from mcp_client.keepalive import LivenessManager
+    from mcp_config import load_mcp_config
+    from tool_integration import build_order, build_server, filtered_prepare_dynamic_tools
+    from config_watcher import start_config_watcher
+    from recovery import RecoveryCoordinator
+    from tenancy import resolve_tenant, tenant_pool_from_env
+
+    configure_logging()
+    publisher = start_publisher()
+    loop_monitor = start_loop_monitor()
+    # Jobs run as threads share the process's log listener and tracer, which are flushed at process exit instead
+    shared_process = job_executor_type() == JobExecutorType.THREAD
+
+    # With a tenant pool, MCP sessions and credentials are scoped to the tenant named in the job's metadata
+    pool = tenant_pool_from_env()
+    tenant = await resolve_tenant(ctx) if pool is not None else None
+    if tenant is not None:
+        logging.info(f"Serving tenant {tenant}")
+    build = functools.partial(build_server, tenant=tenant, pool=pool)
+
     # Load MCP server configs
     mcp_configs = load_mcp_config()
-    mcp_servers = []
+    # Live servers by name; the config watcher updates this in place
+    servers = {}
     allowed_tools_map = {}
-    
-    for conf in mcp_configs:
-        server_type = conf.get("type", "mcp")
-        headers = {}
-        for k, v in conf.get("headers", {}).items():
-            headers[k] = expand_env_vars(v)
+    for conf in build_order(mcp_configs):
         server_name = conf.get("name", "")
-        server_url = conf["url"]
-
-        if server_type == "mcp":
-            # Existing MCP logic (with/without auth)
-            if "auth" in conf:
-                auth_type = conf["auth"].get("type", "")
-                env_var_name = conf["auth"].get("env_var", "")
-                secret_key = os.environ.get(env_var_name, "")
-                if secret_key:
-                    logging.info(f"Using {env_var_name} for authentication with {server_name}")
-                    client = MCPClient(
-                        url=server_url,
-                        secret_key=secret_key,
-                        headers=headers,
-                        name=server_name
-                    )
-                    server = client.server
-                else:
-                    logging.warning(f"{env_var_name} not set, authentication will not be used for {server_name}")
-                    server = MCPServerSse(
-                        params={"url": server_url, "headers": headers},
-                        cache_tools_list=True,
-                        name=server_name
-                    )
-            else:
-                server = MCPServerSse(
-                    params={"url": server_url, "headers": headers},
-                    cache_tools_list=True,
-                    name=server_name
-                )
-        elif server_type == "a2a":
-            # Only set Authorization header if auth is enabled in config
-            env_var_name = conf.get("auth", {}).get("env_var")
-            if env_var_name:
-                jwt_token = os.environ.get(env_var_name)
-                if jwt_token:
-                    headers["Authorization"] = f"Bearer {jwt_token}"
-                    print(f"A2A server '{server_name}' Authorization header: {headers['Authorization']}")
-                else:
-                    print(f"Warning: JWT env var '{env_var_name}' is configured for '{server_name}' but not set in environment.")
-            else:
-                # Ensure no Authorization header is present if auth is not enabled
-                headers.pop("Authorization", None)
-            server = A2AServerConfig(
-                base_url=server_url,
-                headers=headers,
-                name=server_name
-            )
-        else:
-            raise ValueError(f"Unknown server type: {server_type}")
-
-        mcp_servers.append(server)
+        servers[server_name] = build(conf, servers)
         if "allowed_tools" in conf:
             allowed_tools_map[server_name] = set(conf["allowed_tools"])
+    mcp_servers = list(servers.values())
 
     # Patch MCPToolsIntegration to filter tools per server
     MCPToolsIntegration.prepare_dynamic_tools = lambda mcp_servers, convert_schemas_to_strict=True, auto_connect=True: filtered_prepare_dynamic_tools(mcp_servers, allowed_tools_map, convert_schemas_to_strict, auto_connect)
 
     agent = await MCPToolsIntegration.create_agent_with_tools(
         agent_class=FunctionAgent,
-        mcp_servers=mcp_servers
+        mcp_servers=mcp_servers,
+        agent_kwargs={"tenant": tenant, **({"vad": ctx.proc.userdata["vad"]} if "vad" in ctx.proc.userdata else {})}
     )
 
-    await ctx.connect()
-    session = AgentSession()
+    config_watcher = await start_config_watcher(agent, servers, mcp_configs, build=build)
+    keepalive_interval = float(os.environ.get("MCP_KEEPALIVE_INTERVAL", "30"))
+    keepalive = LivenessManager(servers, interval=keepalive_interval).start() if keepalive_interval > 0 else None
+
+    # Resolving the tenant may already have connected to find the participant
+    if not ctx.room.isconnected():
+        await ctx.connect()
+    endpointing = endpointing_from_env()
+    session = AgentSession(**endpointing.session_kwargs()) if endpointing else AgentSession()
+    session.on("metrics_collected", record_pipeline_metrics)
+    ACTIVE_SESSIONS.inc()
+
+    async def end_session_metrics():
+        ACTIVE_SESSIONS.dec()
+        if publisher is not None:
+            publisher.publish()
+    ctx.add_shutdown_callback(end_session_metrics)
+
+    if loop_monitor is not None:
+        async def log_loop_blocks():
+            if loop_monitor.blocks:
+                logging.info(f"Event loop was blocked {len(loop_monitor.blocks)} times past {loop_monitor.threshold * 1000:.0f} ms")
+            if shared_process:
+                # This job's loop ends with it
+                await loop_monitor.stop()
+        ctx.add_shutdown_callback(log_loop_blocks)
+
+    async def flush_traces():
+        logging.info(f"Per-stage latency summary: {tracer.summary()}")
+        if not shared_process:
+            await asyncio.to_thread(tracer.shutdown)
+    ctx.add_shutdown_callback(flush_traces)
+
+    if endpointing:
+        endpointing.attach(session)
+
+        async def log_endpointing():
+            logging.info(f"Endpointing distribution: {endpointing.distribution()}")
+        ctx.add_shutdown_callback(log_endpointing)
+
+    async def close_servers():
+        if config_watcher is not None:
+            await config_watcher.stop()
+        if keepalive is not None:
+            await keepalive.stop()
+        # Close MCP sessions and pooled A2A connections so the servers see a clean disconnect
+        mcp_servers = list(servers.values())
+        results = await asyncio.gather(
+            *(asyncio.wait_for(server.cleanup(), SERVER_CLEANUP_TIMEOUT) for server in mcp_servers),
+            return_exceptions=True,
+        )
+        for server, result in zip(mcp_servers, results):
+            if isinstance(result, Exception):
+                logging.warning(f"Failed to clean up server {getattr(server, 'name', '')}: {result!r}")
+        # Pooled sessions outlive the job only when other jobs share this process
+        if pool is not None and not shared_process:
+            await pool.close()
+    ctx.add_shutdown_callback(close_servers)
+
+    if not shared_process:
+        async def flush_logs():
+            await asyncio.to_thread(shutdown_logging)
+        ctx.add_shutdown_callback(flush_logs)
     print("👋 Agent is ready! Say 'hello' to begin.")
     # Optionally, greet via voice if possible
     if hasattr(agent, 'speak') and callable(getattr(agent, 'speak', None)):
         await agent.speak("Hello! I am your promotion assistant. How can I help you today?")
 
     # Robust session loop with reconnection
+    recovery = RecoveryCoordinator(servers)
     max_retries = 10
     retry_delay = 3
     for attempt in range(1, max_retries + 1):
@@ -118,12 +185,8 @@ async def entrypoint(ctx: JobContext):
             break  # Exit if session ends cleanly
         except Exception as exc:
             logging.error(f"Agent session error (attempt {attempt}/{max_retries}): {exc}")
-            # Reconnect all MCP servers
-            for server in mcp_servers:
-                try:
-                    await server.connect()
-                except Exception as conn_exc:
-                    logging.error(f"Failed to reconnect MCP server {getattr(server, 'name', '')}: {conn_exc}")
+            # Reconnect only the servers that stopped answering
+            await recovery.recover()
             if attempt < max_retries:
                 logging.info(f"Retrying agent session in {retry_delay} seconds...")
                 await asyncio.sleep(retry_delay)
@@ -131,5 +194,40 @@ async def entrypoint(ctx: JobContext):
                 logging.error("Max session retries reached. Exiting.")
                 raise
 
+def drain_timeout() -> int:
+    return int(os.environ.get("AGENT_DRAIN_TIMEOUT", "300"))
+
+def job_executor_type() -> JobExecutorType:
+    """AGENT_JOB_EXECUTOR=thread runs jobs as threads of one process, so they share the tenant pool."""
+    if os.environ.get("AGENT_JOB_EXECUTOR") == "thread":
+        return JobExecutorType.THREAD
+    return JobExecutorType.PROCESS
+
+def worker_options() -> WorkerOptions:
+    """
+    WorkerOptions shared by `python main.py` and railway_start.py.
+    AGENT_NAME registers the worker for explicit dispatch as one of the frontend's AGENT_POOLS.
+    AGENT_HEALTH_PORT (default 8081) is the worker's health endpoint; supervised workers each get their own.
+    The worker reports its load from load.py, and stops taking jobs above AGENT_LOAD_THRESHOLD (default 0.75).
+    On SIGTERM the worker drains: it stops accepting jobs and gives running sessions AGENT_DRAIN_TIMEOUT seconds
+    (default 300) to finish before they are shut down.
+    Jobs run in their own processes unless AGENT_JOB_EXECUTOR=thread. AGENT_IDLE_PROCESSES overrides how many
+    job processes are kept prewarmed (LiveKit's default is one per CPU; the supervisor splits the CPUs between
+    its workers).
+    """
+    idle_processes = os.environ.get("AGENT_IDLE_PROCESSES")
+    extra = {"num_idle_processes": int(idle_processes)} if idle_processes else {}
+    return WorkerOptions(
+        entrypoint_fnc=entrypoint,
+        prewarm_fnc=prewarm,
+        agent_name=os.environ.get("AGENT_NAME", ""),
+        port=int(os.environ.get("AGENT_HEALTH_PORT", "8081")),
+        drain_timeout=drain_timeout(),
+        load_fnc=load_model_from_env(),
+        load_threshold=float(os.environ.get("AGENT_LOAD_THRESHOLD", "0.75")),
+        job_executor_type=job_executor_type(),
+        **extra,
+    )
+
 if __name__ == "__main__":
-    cli.run_app(WorkerOptions(entrypoint_fnc=entrypoint)) 
\ No newline at end of file
+    cli.run_app(worker_options()) 
\ No newline at end of file
@@ -1,12 +1,19 @@
-from mcp_client.server import MCPServerSse, MCPServer
-from mcp_client.auth import HMACAuth, create_auth_middleware
+# Submodules are loaded on first attribute access so that importing a light helper
+# (e.g. mcp_client.schema) doesn't pull in mcp, httpx and anyio
+_LAZY_ATTRS = {
+    "MCPServerSse": "mcp_client.server",
+    "MCPServer": "mcp_client.server",
+    "HMACAuth": "mcp_client.auth",
+    "create_auth_middleware": "mcp_client.auth",
+    "LivenessManager": "mcp_client.keepalive",
+}
 
 # Define MCPClient class here since client.py doesn't exist
 class MCPClient:
     def __init__(self, url, secret_key, headers=None, name=None):
         """
         Create an authenticated MCP client.
-        
+
         Args:
             url: The URL of the MCP server
             secret_key: The secret key for authentication
@@ -14,14 +21,15 @@ class MCPClient:
             name: Optional name for the client
         """
         from mcp_client.auth import create_auth_middleware
-        
+        from mcp_client.server import MCPServerSse
+
         self.url = url
         self.name = name
         self.headers = headers or {}
-        
+
         # Create authentication middleware
         auth_middleware = create_auth_middleware(secret_key)
-        
+
         # Create server with authentication middleware
         self.server = MCPServerSse(
             params={"url": url, "headers": self.headers},
@@ -30,4 +38,12 @@ class MCPClient:
             middleware=[auth_middleware]
         )
 
-__all__ = ["MCPClient", "MCPServerSse", "MCPServer", "HMACAuth", "create_auth_middleware"]
\ No newline at end of file
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        import importlib
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+__all__ = ["MCPClient", "MCPServerSse", "MCPServer", "HMACAuth", "create_auth_middleware", "LivenessManager"]
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import json
 import inspect
@@ -7,8 +8,12 @@ from uuid import uuid4
 
 # Import from the MCP module
 from .util import MCPUtil, FunctionTool
+from .schema import json_schema_to_annotation
 from .server import MCPServer, MCPServerSse
-from livekit.agents import ChatContext, AgentSession, JobContext
+from tracing import tracer
+from metrics import TOOLS_CANCELLED, TOOLS_IN_FLIGHT
+from log_config import LazyJson, Truncated
+from livekit.agents import ChatContext, AgentSession, JobContext, RunContext
 
 logger = logging.getLogger("mcp-agent-tools")
 
@@ -88,15 +93,12 @@ class MCPToolsIntegration:
         annotations = {}
         schema_props = tool.params_json_schema.get("properties", {})
         schema_required = set(tool.params_json_schema.get("required", []))
-        type_map = {
-            "string": str, "integer": int, "number": float,
-            "boolean": bool, "array": list, "object": dict,
-        }
 
-        # Build parameters from the schema properties
+        # Build parameters from the schema properties, keeping nested object/array/enum types
         for p_name, p_details in schema_props.items():
-            json_type = p_details.get("type", "string")
-            py_type = type_map.get(json_type, typing.Any)
+            if "type" not in p_details and not any(k in p_details for k in ("enum", "anyOf", "oneOf", "properties")):
+                p_details = {**p_details, "type": "string"}
+            py_type = json_schema_to_annotation(p_details, f"{tool.name}_{p_name}")
             annotations[p_name] = py_type
 
             # Use inspect.Parameter.empty for required params, None otherwise
@@ -109,13 +111,41 @@ class MCPToolsIntegration:
             ))
 
         # Define the actual function that will be called by the agent
-        async def tool_impl(**kwargs):
+        async def tool_impl(run_context: Optional[RunContext] = None, **kwargs):
             input_json = json.dumps(kwargs)
-            logger.info(f"Invoking tool '{tool.name}' with args: {kwargs}")
-            result_str = await tool.on_invoke_tool(None, input_json)
-            logger.info(f"Tool '{tool.name}' result: {result_str}")
+            logger.debug("Invoking tool '%s' with args: %s", tool.name, LazyJson(kwargs))
+            TOOLS_IN_FLIGHT.inc()
+            try:
+                with tracer.span("tool", tool=tool.name):
+                    call = asyncio.ensure_future(tool.on_invoke_tool(None, input_json))
+                    try:
+                        if run_context is None:
+                            # Called directly (benchmarks, tests): there is no speech to interrupt
+                            await asyncio.wait([call])
+                        else:
+                            # Stop waiting as soon as the user interrupts the speech this tool call belongs to
+                            await run_context.speech_handle.wait_if_not_interrupted([call])
+                        if not call.done():
+                            call.cancel()
+                            await asyncio.gather(call, return_exceptions=True)
+                            TOOLS_CANCELLED.inc(tool=tool.name)
+                            logger.info("Cancelled tool '%s': the user interrupted", tool.name)
+                            return f"Tool call '{tool.name}' was cancelled because the user interrupted."
+                        result_str = call.result()
+                    finally:
+                        if not call.done():
+                            # Cancelled from outside (the session closed): cancel the transport request too
+                            call.cancel()
+            finally:
+                TOOLS_IN_FLIGHT.dec()
+            logger.debug("Tool '%s' result: %s", tool.name, Truncated(result_str))
             return result_str
 
+        # The run context is injected by LiveKit and is not part of the tool's schema
+        params.insert(0, inspect.Parameter("run_context", kind=inspect.Parameter.KEYWORD_ONLY, annotation=RunContext,
+                                           default=None))
+        annotations["run_context"] = RunContext
+
         # Set function metadata
         tool_impl.__signature__ = inspect.Signature(parameters=params)
         tool_impl.__name__ = tool.name
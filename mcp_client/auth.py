@@ -49,7 +49,7 @@ class HMACAuth:
         body_bytes = json.dumps(params_copy, sort_keys=True, separators=(',', ':')).encode('utf-8')
         
         # Debug output for troubleshooting
-        logger.debug(f"Signing payload: {body_bytes}")
+        logger.debug("Signing payload of %d bytes", len(body_bytes))
         
         # Create HMAC signature using base64 encoding
         hmac_digest = hmac.new(
@@ -62,7 +62,7 @@ class HMACAuth:
         signature = base64.b64encode(hmac_digest).decode('utf-8')
         
         # Debug output for troubleshooting
-        logger.debug(f"Generated signature: {signature}")
+        logger.debug("Generated request signature")
         
         # Add signature to original params
         result = params.copy()
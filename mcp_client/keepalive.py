@@ -0,0 +1,73 @@
+# Keeps idle MCP sessions alive and replaces dead ones before a user's tool call finds out: idle sessions are
+# pinged (the reply arrives over the SSE stream, so a silently dropped stream fails the ping) and servers that
+# don't answer are reconnected in the background. Tool calls issued meanwhile join that reconnect.
+
+import time
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from metrics import MCP_BACKGROUND_RECONNECTS, MCP_CONNECTION_AGE, MCP_PINGS, MCP_SESSIONS_CONNECTED
+
+logger = logging.getLogger(__name__)
+
+
+class LivenessManager:
+    """
+    Pings idle sessions of the servers in `servers` (live servers by name, read on every round) and reconnects the
+    ones that fail. Servers without `ping`/`reconnect` (A2A servers) are skipped.
+    """
+
+    def __init__(self, servers: Dict[str, Any], interval: float = 30.0, ping_timeout: float = 5.0):
+        self.servers = servers
+        self.interval = interval
+        self.ping_timeout = ping_timeout
+        self._reconnecting: Dict[str, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> "LivenessManager":
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return self
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"MCP keepalive round failed: {e!r}")
+
+    async def check(self) -> None:
+        """Run one round: ping idle sessions and start reconnects for the ones that failed."""
+        now = time.monotonic()
+        servers = [(name, server) for name, server in self.servers.items()
+                   if hasattr(server, "ping") and hasattr(server, "reconnect") and name not in self._reconnecting]
+        idle = [(name, server) for name, server in servers if now - server.last_used >= self.interval]
+        results = await asyncio.gather(*(server.ping(self.ping_timeout) for _, server in idle))
+        for (name, server), alive in zip(idle, results):
+            MCP_PINGS.inc(server=name, status="ok" if alive else "error")
+            if not alive:
+                if server.connected_at is not None:
+                    MCP_CONNECTION_AGE.observe(now - server.connected_at, server=name)
+                self._reconnecting[name] = asyncio.create_task(self._reconnect(name, server))
+        for name, server in servers:
+            MCP_SESSIONS_CONNECTED.set(1 if server.session is not None else 0, server=name)
+
+    async def _reconnect(self, name: str, server) -> None:
+        MCP_BACKGROUND_RECONNECTS.inc(server=name)
+        logger.warning(f"MCP server {name} missed a keepalive ping, reconnecting in the background")
+        try:
+            await server.reconnect()
+        except Exception as e:
+            logger.error(f"Background reconnect to {name} failed: {e!r}")
+        finally:
+            self._reconnecting.pop(name, None)
+
+    async def stop(self) -> None:
+        tasks = [t for t in [self._task, *self._reconnecting.values()] if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._reconnecting.clear()
@@ -0,0 +1,218 @@
+"""
+mcp_client/schema.py
+
+Converts MCP tool input schemas into strict JSON schemas and into Python type annotations
+that preserve nested objects, arrays, enums and optional values.
+"""
+
+import copy
+import hashlib
+import json
+import re
+import typing
+from typing import Annotated, Any, Dict, List, Literal, Optional, Union
+
+from pydantic import WithJsonSchema
+# pydantic only accepts typing_extensions' TypedDict before Python 3.12
+from typing_extensions import NotRequired, TypedDict
+
+_PRIMITIVE_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": float,
+    "boolean": bool,
+    "null": type(None),
+}
+
+# Memoized conversions, keyed by schema hash
+_strict_schema_cache: Dict[str, Dict[str, Any]] = {}
+_annotation_cache: Dict[str, Any] = {}
+
+
+def schema_hash(schema: Dict[str, Any]) -> str:
+    """
+    Compute a stable hash of a JSON schema.
+    Returns the hex digest of the canonical (sorted, compact) JSON encoding.
+    """
+    canonical = json.dumps(schema, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def to_strict_json_schema(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a JSON schema to the strict format expected by OpenAI structured outputs.
+
+    Every object gets `additionalProperties: false` and lists all of its properties as
+    required; properties that were optional become nullable instead. Nested objects,
+    array items, enums and anyOf/oneOf branches are converted recursively.
+    Results are memoized by schema hash and must be treated as read-only.
+    """
+    key = schema_hash(schema)
+    cached = _strict_schema_cache.get(key)
+    if cached is None:
+        cached = _strictify(copy.deepcopy(schema))
+        _strict_schema_cache[key] = cached
+    return cached
+
+
+def _strictify(schema: Dict[str, Any]) -> Dict[str, Any]:
+    if not isinstance(schema, dict):
+        return schema
+
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            schema[key] = [_strictify(s) for s in schema[key]]
+    for key in ("$defs", "definitions"):
+        if key in schema:
+            schema[key] = {name: _strictify(s) for name, s in schema[key].items()}
+
+    if _schema_type(schema) == "array" and isinstance(schema.get("items"), dict):
+        schema["items"] = _strictify(schema["items"])
+
+    if _schema_type(schema) == "object" or "properties" in schema:
+        properties = schema.get("properties", {})
+        required = set(schema.get("required", []))
+        strict_props = {}
+        for name, prop in properties.items():
+            prop = _strictify(prop)
+            if name not in required:
+                prop = _make_nullable(prop)
+            strict_props[name] = prop
+        schema["type"] = "object"
+        schema["properties"] = strict_props
+        schema["required"] = list(strict_props)
+        schema["additionalProperties"] = False
+    return schema
+
+
+def _make_nullable(schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a copy of the schema that also accepts null."""
+    schema = dict(schema)
+    schema.pop("default", None)
+    json_type = schema.get("type")
+    if isinstance(json_type, str) and json_type != "null":
+        schema["type"] = [json_type, "null"]
+    elif isinstance(json_type, list):
+        if "null" not in json_type:
+            schema["type"] = json_type + ["null"]
+    elif "anyOf" in schema:
+        if not any(s.get("type") == "null" for s in schema["anyOf"]):
+            schema["anyOf"] = schema["anyOf"] + [{"type": "null"}]
+    else:
+        schema = {"anyOf": [schema, {"type": "null"}]}
+    if "enum" in schema and None not in schema["enum"]:
+        schema["enum"] = list(schema["enum"]) + [None]
+    return schema
+
+
+def _schema_type(schema: Dict[str, Any]) -> Optional[str]:
+    """Return the non-null JSON type of a schema, if it declares one."""
+    json_type = schema.get("type")
+    if isinstance(json_type, list):
+        non_null = [t for t in json_type if t != "null"]
+        return non_null[0] if len(non_null) == 1 else None
+    return json_type
+
+
+def _is_nullable(schema: Dict[str, Any]) -> bool:
+    json_type = schema.get("type")
+    if json_type == "null" or (isinstance(json_type, list) and "null" in json_type):
+        return True
+    return any(isinstance(s, dict) and s.get("type") == "null" for s in schema.get("anyOf", []))
+
+
+def _type_name(name: str) -> str:
+    """Build a valid class name for a generated TypedDict."""
+    parts = re.split(r"[^a-zA-Z0-9]+", name)
+    return "".join(p[:1].upper() + p[1:] for p in parts if p) or "Params"
+
+
+def json_schema_to_annotation(schema: Dict[str, Any], name: str = "Params") -> Any:
+    """
+    Map a JSON schema to a Python type annotation.
+
+    Objects with properties become TypedDicts (optional keys are NotRequired) carrying their own schema, arrays become
+    List[...] of their item type, enums become Literal[...] and nullable schemas become
+    Optional[...]. Unknown or untyped schemas map to typing.Any.
+    Results are memoized by schema hash and name.
+    """
+    key = f"{name}:{schema_hash(schema)}"
+    if key not in _annotation_cache:
+        _annotation_cache[key] = _to_annotation(schema, name)
+    return _annotation_cache[key]
+
+
+def _to_annotation(schema: Dict[str, Any], name: str) -> Any:
+    if not isinstance(schema, dict):
+        return typing.Any
+
+    if "enum" in schema:
+        values = tuple(v for v in schema["enum"] if v is not None)
+        if not values:
+            return type(None)
+        annotation = Literal[values]
+        return Optional[annotation] if None in schema["enum"] or _is_nullable(schema) else annotation
+
+    for key in ("anyOf", "oneOf"):
+        if key in schema:
+            branches = [
+                _to_annotation(s, f"{name}_{i}") for i, s in enumerate(schema[key])
+                if not (isinstance(s, dict) and s.get("type") == "null")
+            ]
+            if not branches:
+                return type(None)
+            annotation = branches[0] if len(branches) == 1 else Union[tuple(branches)]
+            return Optional[annotation] if _is_nullable(schema) else annotation
+
+    json_type = schema.get("type")
+    if isinstance(json_type, list):
+        non_null = [t for t in json_type if t != "null"]
+        branches = [_to_annotation({**schema, "type": t}, name) for t in non_null]
+        if not branches:
+            return type(None)
+        annotation = branches[0] if len(branches) == 1 else Union[tuple(branches)]
+        return Optional[annotation] if "null" in json_type else annotation
+
+    if json_type == "array":
+        items = schema.get("items")
+        if isinstance(items, dict) and items:
+            return List[_to_annotation(items, f"{name}_item")]
+        return List[typing.Any]
+
+    if json_type == "object" or "properties" in schema:
+        properties = schema.get("properties")
+        if not properties:
+            return Dict[str, typing.Any]
+        required = set(schema.get("required", []))
+        fields = {}
+        for prop_name, prop in properties.items():
+            annotation = _to_annotation(prop, f"{name}_{prop_name}")
+            fields[prop_name] = annotation if prop_name in required else NotRequired[annotation]
+        # Describe the object inline: LiveKit's strict schema builder cannot follow a bare $ref in a nullable union
+        return Annotated[TypedDict(_type_name(name), fields), WithJsonSchema(schema)]
+
+    return _PRIMITIVE_TYPES.get(json_type, typing.Any)
+
+
+def drop_null_optionals(value: Any, schema: Dict[str, Any]) -> Any:
+    """
+    Remove null values that strict mode forced the LLM to send for optional properties.
+
+    `schema` is the original (non-strict) schema: a null is only dropped when the property
+    was not required there, so the MCP server sees the same arguments it would have received
+    without strict conversion.
+    """
+    if not isinstance(schema, dict):
+        return value
+    if isinstance(value, dict) and "properties" in schema:
+        properties = schema.get("properties", {})
+        required = set(schema.get("required", []))
+        result = {}
+        for k, v in value.items():
+            if v is None and k not in required:
+                continue
+            result[k] = drop_null_optionals(v, properties.get(k, {}))
+        return result
+    if isinstance(value, list) and isinstance(schema.get("items"), dict):
+        return [drop_null_optionals(v, schema["items"]) for v in value]
+    return value
@@ -1,12 +1,17 @@
+import time
 import asyncio
 from contextlib import AbstractAsyncContextManager, AsyncExitStack
 from typing import Any, Dict, List, Optional, Tuple, Callable
 import logging
 
 from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
-from mcp.types import CallToolResult, JSONRPCMessage, Tool as MCPTool
+from mcp.types import (
+    CallToolResult, CancelledNotification, CancelledNotificationParams, ClientNotification, JSONRPCMessage,
+    Tool as MCPTool,
+)
 from mcp_client.sse_client import sse_client
 from mcp.client.session import ClientSession
+from tracing import tracer
 
 # Type for middleware function
 ToolMiddleware = Callable[[str, Optional[Dict[str, Any]]], Dict[str, Any]]
@@ -53,8 +58,16 @@ class _MCPServerWithClientSession(MCPServer):
             retry_delay: Delay (in seconds) between retries.
         """
         self.session: Optional[ClientSession] = None
-        self.exit_stack: AsyncExitStack = AsyncExitStack()
+        # The task that opened the transport and session and closes them (see _own_session)
+        self._owner: Optional[asyncio.Task] = None
+        self._closing: Optional[asyncio.Event] = None
         self._cleanup_lock: asyncio.Lock = asyncio.Lock()
+        self._reconnect_lock: asyncio.Lock = asyncio.Lock()
+        # Incremented on every successful connect
+        self._generation = 0
+        # time.monotonic() of the current connection and of the last successful tool call
+        self.connected_at: Optional[float] = None
+        self.last_used = 0.0
         self.cache_tools_list = cache_tools_list
         self.middleware = middleware or []
         self.max_retries = max_retries
@@ -89,14 +102,17 @@ class _MCPServerWithClientSession(MCPServer):
 
     async def connect(self):
         """Connect to the server with automatic reconnection on failure."""
+        if self._owner is not None:
+            # Close the previous transport rather than leaving it open next to the new one
+            await self.cleanup()
         last_exc = None
         for attempt in range(1, self.max_retries + 1):
             try:
-                transport = await self.exit_stack.enter_async_context(self.create_streams())
-                read, write = transport
-                session = await self.exit_stack.enter_async_context(ClientSession(read, write))
-                await session.initialize()
+                with tracer.span("mcp.connect", server=self.name, attempt=attempt):
+                    session = await self._start_session()
                 self.session = session
+                self._generation += 1
+                self.connected_at = time.monotonic()
                 self.logger.info(f"Connected to MCP server: {self.name}")
                 return
             except Exception as e:
@@ -110,6 +126,45 @@ class _MCPServerWithClientSession(MCPServer):
         self.logger.error(f"Failed to connect to MCP server after {self.max_retries} attempts.")
         raise last_exc
 
+    async def _start_session(self) -> ClientSession:
+        ready = asyncio.get_running_loop().create_future()
+        self._closing = asyncio.Event()
+        self._owner = asyncio.create_task(self._own_session(ready, self._closing), name=f"mcp-session-{self.name}")
+        try:
+            return await ready
+        except BaseException:
+            # Failed, or the caller gave up waiting: don't leave the connection attempt running
+            self._owner.cancel()
+            raise
+
+    async def _own_session(self, ready: asyncio.Future, closing: asyncio.Event) -> None:
+        """
+        Open the transport and session, keep them open until cleanup() sets `closing`, then close them. anyio
+        requires the task that enters the transport's cancel scope to exit it, so this one task does both, whichever
+        tasks call connect(), reconnect() and cleanup().
+        """
+        try:
+            async with AsyncExitStack() as stack:
+                read, write = await stack.enter_async_context(self.create_streams())
+                session = await stack.enter_async_context(ClientSession(read, write))
+                await session.initialize()
+                ready.set_result(session)
+                await closing.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            elif closing.is_set():
+                self.logger.error(f"Error cleaning up server: {e}")
+            else:
+                self.logger.warning(f"Connection to MCP server {self.name} lost: {e!r}")
+        finally:
+            if not ready.done():
+                ready.cancel()
+            if self._owner is asyncio.current_task():
+                # The connection ended on its own; the next call reconnects
+                self.session = None
+                self.connected_at = None
+
     async def list_tools(self) -> List[MCPTool]:
         """List the tools available on the server."""
         if not self.session:
@@ -146,8 +201,12 @@ class _MCPServerWithClientSession(MCPServer):
         for attempt in range(1, self.max_retries + 1):
             try:
                 if not self.session:
-                    await self.connect()
-                return await self.session.call_tool(tool_name, processed_args)
+                    # Joins a background reconnect if one is in progress
+                    await self.reconnect()
+                with tracer.span("mcp.call_tool", server=self.name, tool=tool_name, attempt=attempt):
+                    result = await self._call_cancellable(tool_name, processed_args)
+                self.last_used = time.monotonic()
+                return result
             except Exception as e:
                 last_exc = e
                 self.logger.error(f"Error calling tool {tool_name} (attempt {attempt}/{self.max_retries}): {e}")
@@ -160,15 +219,60 @@ class _MCPServerWithClientSession(MCPServer):
                     self.logger.error(f"Max retries reached for tool {tool_name}.")
                     raise last_exc
 
+    async def _call_cancellable(self, tool_name: str, arguments: Dict[str, Any]) -> CallToolResult:
+        """
+        Call a tool; if the caller is cancelled (the user interrupted), tell the server with notifications/cancelled
+        so it can stop working on a result nobody will hear. Cancellation is not retried.
+        """
+        session = self.session
+        # ClientSession assigns the next id synchronously when the request is sent
+        request_id = session._request_id
+        try:
+            return await session.call_tool(tool_name, arguments)
+        except asyncio.CancelledError:
+            try:
+                await asyncio.wait_for(session.send_notification(ClientNotification(CancelledNotification(
+                    method="notifications/cancelled",
+                    params=CancelledNotificationParams(requestId=request_id, reason="Interrupted by the user"),
+                ))), 1.0)
+            except Exception as e:
+                self.logger.debug(f"Could not send cancellation for {tool_name} to {self.name}: {e!r}")
+            raise
+
+    async def ping(self, timeout: float = 2.0) -> bool:
+        """Whether the session answers an MCP ping within `timeout` seconds."""
+        if not self.session:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout)
+            return True
+        except Exception as e:
+            self.logger.warning(f"Ping to MCP server {self.name} failed: {e!r}")
+            return False
+
+    async def reconnect(self):
+        """Replace the session with a new connection. Concurrent callers share one reconnect."""
+        generation = self._generation
+        async with self._reconnect_lock:
+            if generation != self._generation and self.session is not None:
+                # Another caller reconnected while this one waited for the lock
+                return
+            await self.cleanup()
+            await self.connect()
+
     async def cleanup(self):
-        """Cleanup the server."""
+        """Cleanup the server: ask the session's owner task to close it and wait until it has."""
         async with self._cleanup_lock:
+            owner, self._owner = self._owner, None
             try:
-                await self.exit_stack.aclose()
+                if owner is not None:
+                    self._closing.set()
+                    # Cancelling this (e.g. a cleanup timeout) cancels the owner too
+                    await asyncio.gather(owner, return_exceptions=True)
+                    self.logger.info(f"Cleaned up MCP server: {self.name}")
+            finally:
                 self.session = None
-                self.logger.info(f"Cleaned up MCP server: {self.name}")
-            except Exception as e:
-                self.logger.error(f"Error cleaning up server: {e}")
+                self.connected_at = None
 
 # Define parameter types for clarity
 MCPServerSseParams = Dict[str, Any]
@@ -2,16 +2,15 @@ import logging
 from contextlib import asynccontextmanager
 from typing import Any
 from urllib.parse import urljoin, urlparse
-import json
 
 import anyio
 import httpx
-client = httpx.Client(timeout=60)  # 60 seconds
 from anyio.abc import TaskStatus
 from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
 from httpx_sse import aconnect_sse
 
 import mcp.types as types
+from log_config import LazyJson, Truncated
 
 logger = logging.getLogger(__name__)
 
@@ -58,7 +57,7 @@ async def sse_client(
                     ):
                         try:
                             async for sse in event_source.aiter_sse():
-                                logger.debug(f"Received SSE event: {sse.event}")
+                                logger.debug("Received SSE event: %s", sse.event)
                                 match sse.event:
                                     case "endpoint":
                                         endpoint_url = urljoin(url, sse.data)
@@ -88,7 +87,7 @@ async def sse_client(
                                                 sse.data
                                             )
                                             logger.debug(
-                                                f"Received server message: {message}"
+                                                "Received server message: %s", Truncated(message)
                                             )
                                         except Exception as exc:
                                             logger.error(
@@ -112,13 +111,12 @@ async def sse_client(
                         try:
                             async with write_stream_reader:
                                 async for message in write_stream_reader:
-                                    logger.debug(f"Sending client message: {message}")
                                     message_dict = message.model_dump(
                                         by_alias=True,
                                         mode="json",
                                         exclude_none=True,
                                     )
-                                    logger.info(f"POST to {endpoint_url} with JSON: {json.dumps(message_dict)}")
+                                    logger.debug("POST to %s with JSON: %s", endpoint_url, LazyJson(message_dict))
                                     response = await client.post(
                                         endpoint_url,
                                         json=message_dict,
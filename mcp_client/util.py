@@ -4,6 +4,8 @@ from typing import Any, Dict, List
 # Import from mcp libraries
 from mcp.types import Tool as MCPTool, CallToolResult
 
+from .schema import drop_null_optionals, to_strict_json_schema
+
 # A minimal FunctionTool class used by the agent.
 class FunctionTool:
     def __init__(self, name: str, description: str, params_json_schema: Dict[str, Any], on_invoke_tool, strict_json_schema: bool = False):
@@ -28,8 +30,8 @@ class MCPUtil:
 
     @classmethod
     def to_function_tool(cls, tool, server, convert_schemas_to_strict: bool) -> FunctionTool:
-        # In a more complete implementation, you might convert the JSON schema into a strict version.
         schema = tool.inputSchema
+        params_json_schema = to_strict_json_schema(schema) if convert_schemas_to_strict else schema
 
         # Use a default argument to capture the current tool correctly in the closure
         async def invoke_tool(context: Any, input_json: str, current_tool_name=tool.name) -> str:
@@ -38,6 +40,9 @@ class MCPUtil:
             except Exception as e:
                 # Return error message as string
                 return f"Error parsing input JSON for tool '{current_tool_name}': {e}"
+            if convert_schemas_to_strict:
+                # Strict mode makes optional properties nullable; don't forward those nulls
+                arguments = drop_null_optionals(arguments, schema)
             try:
                 result = await server.call_tool(current_tool_name, arguments)
                 # Ensure the final return value is a string
@@ -73,7 +78,7 @@ class MCPUtil:
         return FunctionTool(
             name=tool.name,
             description=tool.description,
-            params_json_schema=schema,
+            params_json_schema=params_json_schema,
             on_invoke_tool=invoke_tool,
             strict_json_schema=convert_schemas_to_strict,
         )
\ No newline at end of file
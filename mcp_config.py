@@ -19,9 +19,11 @@ def load_mcp_config(config_path="mcp_servers.yaml"):
     with open(config_path, "r") as f:
         return yaml.safe_load(f)["servers"]
 
-def expand_env_vars(value):
+def expand_env_vars(value, lookup=None):
     """
-    Replace ${VARNAME} in the input string with the value from the environment.
+    Replace ${VARNAME} in the input string with the value from the environment, or from `lookup(VARNAME)` when
+    given (see tenancy.tenant_env).
     Returns the expanded string.
     """
-    return re.sub(r"\$\{(\w+)\}", lambda m: os.environ.get(m.group(1), ""), value) 
\ No newline at end of file
+    lookup = lookup or (lambda name: os.environ.get(name, ""))
+    return re.sub(r"\$\{(\w+)\}", lambda m: lookup(m.group(1)), value) 
\ No newline at end of file
@@ -0,0 +1,393 @@
+"""
+metrics.py
+
+Provides a small in-process metrics registry (counters, gauges, histograms), a publisher that sends snapshots
+from agent processes over local UDP, and an aggregator that merges them for the frontend's Prometheus
+`/metrics` endpoint.
+"""
+
+import os
+import json
+import zlib
+import time
+import socket
+import logging
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MAX_DATAGRAM = 65000
+
+
+def _label_key(labelnames: Sequence[str], labels: Dict[str, str]) -> Tuple[str, ...]:
+    unknown = set(labels) - set(labelnames)
+    if unknown:
+        raise ValueError(f"Unknown labels: {sorted(unknown)}")
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _samples(self) -> List[list]:
+        with self._lock:
+            return [[dict(zip(self.labelnames, key)), value] for key, value in self._values.items()]
+
+    def snapshot(self) -> dict:
+        return {"type": self.type, "help": self.help, "samples": self._samples()}
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set(self, value: float, **labels) -> None:
+        """Mirror a monotonic count kept elsewhere (e.g. cache hit counters)."""
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+
+class Gauge(Counter):
+    """
+    A value that goes up and down. merge_snapshots sums a gauge across processes, or takes the largest value
+    with merge="max" for gauges whose sum means nothing (e.g. a per-process lag).
+    """
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), merge: str = "sum"):
+        super().__init__(name, help, labelnames)
+        self.merge = merge
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def snapshot(self) -> dict:
+        snapshot = super().snapshot()
+        if self.merge != "sum":
+            snapshot["merge"] = self.merge
+        return snapshot
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+                self._values[key] = state
+            state["counts"][bisect_left(self.buckets, value)] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    def _samples(self) -> List[list]:
+        with self._lock:
+            return [
+                [dict(zip(self.labelnames, key)), {"counts": list(s["counts"]), "sum": s["sum"], "count": s["count"]}]
+                for key, s in self._values.items()
+            ]
+
+    def snapshot(self) -> dict:
+        return {**super().snapshot(), "buckets": list(self.buckets)}
+
+
+class MetricsRegistry:
+    """Holds metrics by name. Collectors run before each snapshot to refresh derived values."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Sequence[str] = (), merge: str = "sum") -> Gauge:
+        return self._register(Gauge(name, help, labelnames, merge))
+
+    def histogram(self, name: str, help: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors.append(collector)
+
+    def snapshot(self) -> Dict[str, dict]:
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.error(f"Metrics collector failed: {e}")
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+
+def merge_snapshots(snapshots: List[Dict[str, dict]]) -> Dict[str, dict]:
+    """
+    Sum snapshots from several processes sample by sample (histograms bucket by bucket; gauges registered with
+    merge="max" take the largest value).
+    Returns the merged snapshot.
+    """
+    merged: Dict[str, dict] = {}
+    for snapshot in snapshots:
+        for name, metric in snapshot.items():
+            target = merged.setdefault(name, {**metric, "samples": []})
+            index = {json.dumps(sample[0], sort_keys=True): sample for sample in target["samples"]}
+            for labels, value in metric["samples"]:
+                key = json.dumps(labels, sort_keys=True)
+                existing = index.get(key)
+                if existing is None:
+                    sample = [labels, json.loads(json.dumps(value))]
+                    target["samples"].append(sample)
+                    index[key] = sample
+                elif metric["type"] == "histogram":
+                    existing[1]["counts"] = [a + b for a, b in zip(existing[1]["counts"], value["counts"])]
+                    existing[1]["sum"] += value["sum"]
+                    existing[1]["count"] += value["count"]
+                elif metric.get("merge") == "max":
+                    existing[1] = max(existing[1], value)
+                else:
+                    existing[1] += value
+    return merged
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [(k, v) for k, v in labels.items() if v != ""]
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def render_prometheus(snapshot: Dict[str, dict]) -> str:
+    """
+    Render a snapshot in the Prometheus text exposition format.
+    Returns the text body.
+    """
+    lines = []
+    for name, metric in sorted(snapshot.items()):
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        for labels, value in metric["samples"]:
+            if metric["type"] == "histogram":
+                cumulative = 0
+                for bound, count in zip([*map(str, metric["buckets"]), "+Inf"], value["counts"]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', bound))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(value['sum'])}")
+                lines.append(f"{name}_count{_format_labels(labels)} {value['count']}")
+            else:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _parse_addr(addr: str) -> Tuple[str, int]:
+    host, _, port = addr.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+class MetricsPublisher:
+    """Periodically sends registry snapshots from this process over UDP."""
+
+    def __init__(self, registry: "MetricsRegistry", addresses: List[str], interval: float = 5.0,
+                 worker_id: Optional[str] = None):
+        self.registry = registry
+        self.addresses = [_parse_addr(a) for a in addresses]
+        self.interval = interval
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="metrics-publisher", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.publish()
+
+    def publish(self) -> None:
+        payload = zlib.compress(json.dumps({
+            "worker": self.worker_id,
+            "interval": self.interval,
+            "metrics": self.registry.snapshot(),
+        }).encode("utf-8"))
+        if len(payload) > MAX_DATAGRAM:
+            logger.warning(f"Metrics snapshot too large to publish ({len(payload)} bytes)")
+            return
+        for address in self.addresses:
+            try:
+                self._sock.sendto(payload, address)
+            except OSError as e:
+                logger.debug(f"Failed to publish metrics to {address}: {e}")
+
+    def stop(self) -> None:
+        """Send a final snapshot and stop publishing."""
+        self._stop.set()
+        self.publish()
+
+
+class MetricsAggregator:
+    """Receives snapshots from agent processes and merges the ones that are still fresh."""
+
+    def __init__(self, addr: str, stale_after: float = 3.0):
+        self.addr = _parse_addr(addr)
+        self.stale_after = stale_after
+        self._latest: Dict[str, Tuple[float, float, Dict[str, dict]]] = {}
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+
+    def start(self) -> "MetricsAggregator":
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.bind(self.addr)
+        self.addr = self._sock.getsockname()
+        threading.Thread(target=self._run, name="metrics-aggregator", daemon=True).start()
+        return self
+
+    def _run(self) -> None:
+        while True:
+            try:
+                data, _ = self._sock.recvfrom(MAX_DATAGRAM + 1024)
+                message = json.loads(zlib.decompress(data))
+            except OSError:
+                return
+            except Exception as e:
+                logger.warning(f"Dropping malformed metrics datagram: {e}")
+                continue
+            with self._lock:
+                self._latest[message["worker"]] = (time.monotonic(), message.get("interval", 5.0), message["metrics"])
+
+    def workers(self) -> List[str]:
+        now = time.monotonic()
+        with self._lock:
+            return [w for w, (seen, interval, _) in self._latest.items() if now - seen <= interval * self.stale_after]
+
+    def snapshots(self) -> List[Dict[str, dict]]:
+        """Returns the latest snapshot of each live agent process, dropping stale ones."""
+        now = time.monotonic()
+        with self._lock:
+            for worker in [w for w, (seen, interval, _) in self._latest.items() if now - seen > interval * self.stale_after]:
+                del self._latest[worker]
+            return [metrics for _, _, metrics in self._latest.values()]
+
+    def aggregate(self) -> Dict[str, dict]:
+        """Returns the merged snapshot of all live agent processes."""
+        snapshots = self.snapshots()
+        merged = merge_snapshots(snapshots)
+        merged["agent_workers_reporting"] = {
+            "type": "gauge",
+            "help": "Agent processes that published metrics recently",
+            "samples": [[{}, len(snapshots)]],
+        }
+        return merged
+
+    def close(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+
+
+registry = MetricsRegistry()
+
+ACTIVE_SESSIONS = registry.gauge("agent_active_sessions", "Voice sessions currently running")
+TOOLS_IN_FLIGHT = registry.gauge("agent_tool_calls_in_flight", "Tool calls currently running")
+TOOLS_CANCELLED = registry.counter("agent_tool_calls_cancelled_total",
+                                   "Tool calls abandoned because the user interrupted, by tool", ["tool"])
+A2A_FANOUT_REPLIES = registry.counter("a2a_fanout_replies_total", "A2A fan-out member replies by status",
+                                      ["fanout", "status"])
+TOOL_CALLS = registry.counter("agent_tool_calls_total", "MCP tool calls by server and status", ["server", "status"])
+ANSWER_CACHE = registry.counter("agent_answer_cache_total", "Answer cache lookups by result", ["result"])
+MCP_CONNECTS = registry.counter("mcp_connects_total", "MCP connection attempts by server and status", ["server", "status"])
+MCP_RECONNECTS = registry.counter("mcp_reconnects_total", "MCP connections re-established after the first", ["server"])
+MCP_PINGS = registry.counter("mcp_pings_total", "Keepalive pings to idle MCP sessions by server and status", ["server", "status"])
+MCP_BACKGROUND_RECONNECTS = registry.counter("mcp_background_reconnects_total",
+                                             "Reconnects started by the keepalive after a failed ping", ["server"])
+MCP_CONNECTION_AGE = registry.histogram("mcp_connection_age_seconds", "Age of MCP sessions found dead by the keepalive",
+                                        ["server"], buckets=(60, 300, 900, 1800, 3600, 14400, 86400))
+MCP_SESSIONS_CONNECTED = registry.gauge("mcp_sessions_connected", "MCP sessions currently connected", ["server"])
+MCP_POOL_STREAMS = registry.gauge("mcp_pool_streams", "MCP sessions held by the tenant connection pool")
+MCP_POOL_EVICTIONS = registry.counter("mcp_pool_evictions_total", "Pooled MCP sessions closed to make room or when idle",
+                                      ["reason"])
+MCP_POOL_REJECTED = registry.counter("mcp_pool_rejected_total", "MCP sessions refused by the tenant connection pool",
+                                     ["reason"])
+STAGE_LATENCY = registry.histogram("agent_stage_latency_seconds", "Latency per turn stage", ["stage"])
+LOOP_LAG = registry.histogram("agent_event_loop_lag_seconds", "How late the event loop ran a periodic probe",
+                              buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5))
+LOOP_LAG_RECENT = registry.gauge("agent_event_loop_lag_recent_seconds",
+                                 "Exponentially weighted recent event-loop lag, the worst process's when merged",
+                                 merge="max")
+LOOP_BLOCKS = registry.counter("agent_event_loop_blocks_total", "Callbacks that held the event loop past the threshold")
+
+_connected_servers = set()
+
+
+def observe_span(span) -> None:
+    """Tracer listener that turns finished spans into metrics."""
+    STAGE_LATENCY.observe(span.duration, stage=span.name)
+    server = span.attributes.get("server", "")
+    if span.name == "mcp.call_tool":
+        TOOL_CALLS.inc(server=server, status=span.status)
+    elif span.name == "mcp.connect":
+        MCP_CONNECTS.inc(server=server, status=span.status)
+        if span.status == "ok":
+            if server in _connected_servers:
+                MCP_RECONNECTS.inc(server=server)
+            _connected_servers.add(server)
+
+
+_publisher: Optional[MetricsPublisher] = None
+
+
+def start_publisher() -> Optional[MetricsPublisher]:
+    """
+    Start publishing this process's metrics to AGENT_METRICS_ADDR (comma-separated host:port list,
+    default 127.0.0.1:9464) every AGENT_METRICS_INTERVAL seconds, and to the worker's load aggregator at
+    AGENT_LOAD_ADDR when set. Set both to empty strings to disable. Returns the process-wide publisher.
+    """
+    global _publisher
+    addresses = [a for a in os.environ.get("AGENT_METRICS_ADDR", "127.0.0.1:9464").split(",") if a.strip()]
+    if os.environ.get("AGENT_LOAD_ADDR"):
+        addresses.append(os.environ["AGENT_LOAD_ADDR"])
+    if not addresses:
+        return None
+    if _publisher is None:
+        _publisher = MetricsPublisher(registry, addresses, interval=float(os.environ.get("AGENT_METRICS_INTERVAL", "5")))
+        _publisher.start()
+    return _publisher
@@ -0,0 +1,212 @@
+"""
+preemptive.py
+
+Provides the PreemptiveGenerator, which starts LLM generation on stable interim STT transcripts and hands
+the speculative output to llm_node when the final transcript matches, saving an STT finalization interval.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import AsyncIterator, Callable, List, Optional
+
+from utils import normalize_utterance
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+def similarity(a: str, b: str) -> float:
+    """
+    Similarity ratio between two utterances after normalization.
+    Returns a float between 0 and 1.
+    """
+    a, b = normalize_utterance(a), normalize_utterance(b)
+    if a == b:
+        return 1.0
+    return SequenceMatcher(None, a, b).ratio()
+
+
+@dataclass
+class PreemptiveStats:
+    started: int = 0
+    hits: int = 0
+    misses: int = 0
+    time_saved: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        finished = self.hits + self.misses
+        return self.hits / finished if finished else 0.0
+
+    def summary(self) -> dict:
+        return {
+            "started": self.started,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 3),
+            "time_saved_total": round(self.time_saved, 3),
+            "time_saved_avg": round(self.time_saved / self.hits, 3) if self.hits else 0.0,
+        }
+
+
+class _Speculation:
+    """A speculative generation running in the background and buffering its chunks."""
+
+    def __init__(self, text: str, base_ids: List[str], source: AsyncIterator):
+        self.text = text
+        self.base_ids = base_ids
+        self.started_at = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self.final_text: Optional[str] = None
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run(source))
+
+    async def _run(self, source: AsyncIterator) -> None:
+        try:
+            async for chunk in source:
+                self._queue.put_nowait(chunk)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._queue.put_nowait(e)
+        finally:
+            self.finished_at = time.monotonic()
+            self._queue.put_nowait(_DONE)
+
+    async def stream(self):
+        while True:
+            item = await self._queue.get()
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def cancel(self) -> None:
+        self._task.cancel()
+
+
+class PreemptiveGenerator:
+    """
+    Speculatively runs the LLM on interim transcripts.
+
+    An interim transcript that stays unchanged for `stable_delay` seconds starts a generation against the
+    agent's current chat context plus that text. When the final transcript arrives it is compared with the
+    speculated text: below `similarity_threshold` the speculation is cancelled, otherwise llm_node can take
+    over the already-running stream with `take()`.
+    """
+
+    def __init__(self, generate: Callable, chat_ctx_provider: Callable, *,
+                 similarity_threshold: float = 0.9, stable_delay: float = 0.3):
+        self._generate = generate
+        self._chat_ctx_provider = chat_ctx_provider
+        self.similarity_threshold = similarity_threshold
+        self.stable_delay = stable_delay
+        self.stats = PreemptiveStats()
+        self._speculation: Optional[_Speculation] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._session = None
+
+    def attach(self, session) -> None:
+        self._session = session
+        session.on("user_input_transcribed", self._on_transcribed)
+
+    def detach(self) -> None:
+        if self._session is not None:
+            self._session.off("user_input_transcribed", self._on_transcribed)
+            self._session = None
+        self._cancel_timer()
+        self._discard()
+
+    def _on_transcribed(self, ev) -> None:
+        text = (ev.transcript or "").strip()
+        if not text:
+            return
+        if ev.is_final:
+            self._on_final(text)
+        else:
+            self._on_interim(text)
+
+    def _on_interim(self, text: str) -> None:
+        spec = self._speculation
+        if spec is not None and similarity(spec.text, text) >= self.similarity_threshold:
+            return
+        self._discard()
+        self._cancel_timer()
+        self._timer = asyncio.get_running_loop().call_later(self.stable_delay, self._start, text)
+
+    def _on_final(self, text: str) -> None:
+        self._cancel_timer()
+        spec = self._speculation
+        if spec is None:
+            return
+        if similarity(spec.text, text) >= self.similarity_threshold:
+            spec.final_text = text
+        else:
+            logger.debug(f"Final transcript diverged from speculation, cancelling: {spec.text!r} -> {text!r}")
+            self._discard()
+
+    def _start(self, text: str) -> None:
+        self._timer = None
+        chat_ctx = self._chat_ctx_provider().copy()
+        base_ids = [item.id for item in chat_ctx.items]
+        chat_ctx.add_message(role="user", content=text)
+        self._speculation = _Speculation(text, base_ids, self._generate(chat_ctx))
+        self.stats.started += 1
+        logger.debug(f"Started preemptive generation for: {text!r}")
+
+    def _cancel_timer(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _discard(self) -> None:
+        if self._speculation is not None:
+            self._speculation.cancel()
+            self._speculation = None
+            self.stats.misses += 1
+
+    def take(self, chat_ctx) -> Optional[AsyncIterator]:
+        """
+        Claim the speculative stream for this llm_node call.
+        Returns the stream if it was generated for the same history and a matching user message, else None.
+        """
+        spec = self._speculation
+        if spec is None:
+            return None
+        items = list(chat_ctx.items)
+        matches = (
+            spec.final_text is not None
+            and items
+            and getattr(items[-1], "type", None) == "message"
+            and items[-1].role == "user"
+            and [item.id for item in items[:-1]] == spec.base_ids
+            and similarity(spec.text, items[-1].text_content or "") >= self.similarity_threshold
+        )
+        if not matches:
+            self._discard()
+            return None
+        self._speculation = None
+        self.stats.hits += 1
+        end = spec.finished_at if spec.finished_at is not None else time.monotonic()
+        self.stats.time_saved += end - spec.started_at
+        return spec.stream()
+
+
+def preemptive_from_env(generate: Callable, chat_ctx_provider: Callable) -> Optional[PreemptiveGenerator]:
+    """
+    Returns a PreemptiveGenerator if AGENT_PREEMPTIVE_GENERATION is enabled, else None.
+    """
+    if os.environ.get("AGENT_PREEMPTIVE_GENERATION", "0").lower() not in ("1", "true", "yes"):
+        return None
+    return PreemptiveGenerator(
+        generate,
+        chat_ctx_provider,
+        similarity_threshold=float(os.environ.get("AGENT_PREEMPTIVE_SIMILARITY", "0.9")),
+        stable_delay=float(os.environ.get("AGENT_PREEMPTIVE_STABLE_MS", "300")) / 1000,
+    )
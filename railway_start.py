@@ -7,7 +7,6 @@ Automatically detects which service to run based on environment
 import os
 import sys
 from pathlib import Path
-from multiprocessing import Process
 
 # Ensure the project root is on the Python path
 sys.path.insert(0, str(Path(__file__).parent))
@@ -15,11 +14,15 @@ sys.path.insert(0, str(Path(__file__).parent))
 def run_voice_agent():
     """Target function for the agent process. Imports are local to the process."""
     print("Initializing Voice Agent process...")
-    from main import entrypoint as voice_entrypoint
-    from livekit.agents import cli, WorkerOptions
+    from main import worker_options
+    from livekit.agents import cli
+
+    # Supervised workers inherit this script's argv; run the worker in production mode
+    if len(sys.argv) < 2 or sys.argv[1].startswith('-'):
+        sys.argv = [sys.argv[0], 'start']
     
     # This is a blocking call that runs the agent's event loop
-    cli.run_app(WorkerOptions(entrypoint_fnc=voice_entrypoint))
+    cli.run_app(worker_options())
 
 def run_frontend_server(port: int):
     """Target function for the frontend process. Imports are local to the process."""
@@ -29,6 +32,29 @@ def run_frontend_server(port: int):
     # This is a blocking call that runs the server's event loop
     serve_frontend(port=port)
 
+# Modules each service mode imports at startup, for --profile-imports
+SERVICE_MODULES = {
+    'frontend': ['frontend.server'],
+    'voice_agent': ['main'],
+    'unified': ['frontend.server', 'main'],
+}
+
+def report_import_times(service_type: str):
+    """Print the import-time tree of the given service mode."""
+    from import_profile import profile_imports, render_tree
+    min_ms = float(os.environ.get('PROFILE_IMPORTS_MIN_MS', '5'))
+    for module in SERVICE_MODULES.get(service_type, SERVICE_MODULES['unified']):
+        print(f"📦 Import times for {module} (branches over {min_ms:g} ms):")
+        print(render_tree(profile_imports([module]), min_ms=min_ms))
+
+def run_unified(port: int):
+    """Run the frontend and AGENT_WORKERS voice agent workers under the supervisor."""
+    from supervisor import supervisor_from_env, unified_specs
+
+    specs = unified_specs(run_frontend_server, run_voice_agent, port)
+    print(f"👷 Supervising the frontend and {len(specs) - 1} voice agent worker(s)")
+    supervisor_from_env(specs).run()
+
 def main():
     """
     Parses environment variables and starts the required services in separate processes.
@@ -36,6 +62,10 @@ def main():
     # Get Railway service type from environment, defaulting to 'unified'
     service_type = os.environ.get('RAILWAY_SERVICE_TYPE', 'unified')
     port = int(os.environ.get('PORT', 8080))
+
+    if '--profile-imports' in sys.argv[1:]:
+        report_import_times(service_type)
+        return
     
     print("="*50)
     print("🚀 Starting Trello Voice Assistant")
@@ -47,18 +77,7 @@ def main():
     if service_type == 'unified':
         print("🚀 Starting in Unified Mode: Frontend and Voice Agent")
         
-        # We use multiprocessing to run both servers in parallel
-        # since they both have blocking event loops.
-        frontend_process = Process(target=run_frontend_server, args=(port,))
-        agent_process = Process(target=run_voice_agent)
-
-        # Start both processes
-        frontend_process.start()
-        agent_process.start()
-
-        # Wait for both processes to complete (they won't, in normal operation)
-        frontend_process.join()
-        agent_process.join()
+        run_unified(port)
 
     elif service_type == 'frontend':
         # Start only the frontend server
@@ -70,13 +89,7 @@ def main():
         
     else:
         print(f"⚠️ Unknown service type '{service_type}'. Defaulting to Unified Mode.")
-        # Default to unified mode
-        frontend_process = Process(target=run_frontend_server, args=(port,))
-        agent_process = Process(target=run_voice_agent)
-        frontend_process.start()
-        agent_process.start()
-        frontend_process.join()
-        agent_process.join()
+        run_unified(port)
 
 if __name__ == "__main__":
     # This check is crucial for multiprocessing to work correctly,
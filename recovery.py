@@ -0,0 +1,60 @@
+"""
+recovery.py
+
+Recovers MCP connections after an agent session fails. Every server is probed in parallel and only the ones that
+don't answer are reconnected, also in parallel and with a time limit, so healthy sessions are kept and recovery
+takes as long as the slowest failed server rather than the sum of all of them. Reconnects run in gather's child
+tasks; each MCP session lives in a task of its own (see _MCPServerWithClientSession._own_session), so it can still
+be closed cleanly from any task later.
+"""
+
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RecoveryReport:
+    healthy: List[str] = field(default_factory=list)
+    recovered: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    duration: float = 0.0
+
+
+class RecoveryCoordinator:
+    """
+    Probes and reconnects the servers in `servers` (live servers by name, read at each recovery).
+    Servers without a `ping` method (A2A servers, which hold no connection) are always healthy.
+    """
+
+    def __init__(self, servers: Dict[str, Any], probe_timeout: float = 2.0, reconnect_timeout: float = 15.0):
+        self.servers = servers
+        self.probe_timeout = probe_timeout
+        self.reconnect_timeout = reconnect_timeout
+
+    async def _recover_one(self, name: str, server) -> str:
+        ping = getattr(server, "ping", None)
+        if ping is None or await ping(self.probe_timeout):
+            return "healthy"
+        try:
+            await asyncio.wait_for(server.reconnect(), self.reconnect_timeout)
+            return "recovered"
+        except Exception as e:
+            logger.error(f"Failed to reconnect {name}: {e!r}")
+            return "failed"
+
+    async def recover(self) -> RecoveryReport:
+        started = time.perf_counter()
+        servers = list(self.servers.items())
+        outcomes = await asyncio.gather(*(self._recover_one(name, server) for name, server in servers))
+        report = RecoveryReport()
+        for (name, _), outcome in zip(servers, outcomes):
+            getattr(report, outcome).append(name)
+        report.duration = time.perf_counter() - started
+        logger.info(f"Recovery took {report.duration:.2f}s: healthy {report.healthy}, "
+                    f"recovered {report.recovered}, failed {report.failed}")
+        return report
@@ -0,0 +1,226 @@
+"""
+supervisor.py
+
+Runs the frontend and N voice agent workers as child processes: checks that each is alive and answering its
+health endpoint, restarts failed children with exponential backoff, and forwards SIGTERM/SIGINT so children
+can shut down (and drain) before being killed.
+"""
+
+import os
+import time
+import signal
+import logging
+import threading
+import urllib.error
+import urllib.request
+import multiprocessing
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("supervisor")
+
+
+@dataclass
+class ChildSpec:
+    name: str
+    target: Callable
+    args: Tuple = ()
+    env: Dict[str, str] = field(default_factory=dict)
+    # Polled for liveness/readiness; None means only the process being alive is checked
+    health_url: Optional[str] = None
+
+
+@dataclass
+class ManagedProcess:
+    spec: ChildSpec
+    process: Optional[multiprocessing.Process] = None
+    started_at: float = 0.0
+    restarts: int = 0
+    failures: int = 0
+    ready: bool = False
+    next_start: float = 0.0
+
+
+def _run_child(target: Callable, env: Dict[str, str], args: Tuple) -> None:
+    os.environ.update(env)
+    # Children handle SIGINT through SIGTERM forwarding, not the terminal's process group
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    target(*args)
+
+
+def probe(url: str, timeout: float) -> bool:
+    """
+    Whether `url` answers. A 503 counts as alive: the frontend sends it when all its connection slots are busy,
+    and restarting an overloaded server would turn overload into an outage.
+    """
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return 200 <= response.status < 300
+    except urllib.error.HTTPError as e:
+        return e.code == 503
+    except Exception:
+        return False
+
+
+class Supervisor:
+    """
+    Keeps a set of child processes running.
+
+    A child is ready once its health URL first answers; after `startup_grace` seconds, `max_failures`
+    consecutive failed checks (or the process exiting) restart it. Restarts back off exponentially from
+    `backoff_base` up to `backoff_max` seconds; the backoff resets once a child has run for `stable_after`.
+    On SIGTERM/SIGINT every child gets SIGTERM and `shutdown_timeout` seconds to exit before SIGKILL. An unhealthy
+    child being restarted only gets `restart_timeout` seconds, since checks of the other children wait meanwhile.
+    """
+
+    def __init__(self, specs: List[ChildSpec], check_interval: float = 5.0, health_timeout: float = 2.0,
+                 startup_grace: float = 60.0, max_failures: int = 3, backoff_base: float = 1.0,
+                 backoff_max: float = 60.0, stable_after: float = 120.0, shutdown_timeout: float = 30.0,
+                 restart_timeout: float = 5.0):
+        self.children = [ManagedProcess(spec) for spec in specs]
+        self.check_interval = check_interval
+        self.health_timeout = health_timeout
+        self.startup_grace = startup_grace
+        self.max_failures = max_failures
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stable_after = stable_after
+        self.shutdown_timeout = shutdown_timeout
+        self.restart_timeout = restart_timeout
+        self._stopping = threading.Event()
+
+    def _start(self, child: ManagedProcess) -> None:
+        spec = child.spec
+        child.process = multiprocessing.Process(
+            target=_run_child, args=(spec.target, spec.env, spec.args), name=spec.name
+        )
+        child.process.start()
+        child.started_at = time.monotonic()
+        child.failures = 0
+        child.ready = False
+        logger.info("Started %s (pid %s)", spec.name, child.process.pid)
+
+    def _schedule_restart(self, child: ManagedProcess, reason: str) -> None:
+        now = time.monotonic()
+        if now - child.started_at >= self.stable_after:
+            child.restarts = 0
+        delay = min(self.backoff_max, self.backoff_base * (2 ** child.restarts))
+        child.restarts += 1
+        child.next_start = now + delay
+        child.ready = False
+        logger.warning("%s %s; restarting in %.1fs (restart #%d)", child.spec.name, reason, delay, child.restarts)
+
+    def check(self, child: ManagedProcess) -> None:
+        """Run one liveness/readiness check, restarting the child if needed."""
+        now = time.monotonic()
+        if child.process is None:
+            if now >= child.next_start:
+                self._start(child)
+            return
+        if not child.process.is_alive():
+            exitcode = child.process.exitcode
+            child.process = None
+            self._schedule_restart(child, f"exited with code {exitcode}")
+            return
+        if child.spec.health_url is None:
+            child.ready = True
+            return
+        if probe(child.spec.health_url, self.health_timeout):
+            if not child.ready:
+                logger.info("%s is ready", child.spec.name)
+            child.ready = True
+            child.failures = 0
+            return
+        if now - child.started_at < self.startup_grace and not child.ready:
+            return
+        child.failures += 1
+        if child.failures >= self.max_failures:
+            logger.warning("%s failed %d health checks", child.spec.name, child.failures)
+            self._terminate([child], self.restart_timeout)
+            child.process = None
+            self._schedule_restart(child, "is unhealthy")
+
+    def status(self) -> List[Dict[str, object]]:
+        return [
+            {
+                "name": c.spec.name,
+                "pid": c.process.pid if c.process else None,
+                "ready": c.ready,
+                "restarts": c.restarts,
+            }
+            for c in self.children
+        ]
+
+    def _terminate(self, children: List[ManagedProcess], timeout: Optional[float] = None) -> None:
+        running = [c.process for c in children if c.process is not None and c.process.is_alive()]
+        for process in running:
+            process.terminate()
+        deadline = time.monotonic() + (self.shutdown_timeout if timeout is None else timeout)
+        for process in running:
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning("%s did not exit in time; killing it", process.name)
+                process.kill()
+                process.join()
+
+    def stop(self, signum: Optional[int] = None, frame=None) -> None:
+        if signum is not None:
+            logger.info("Received %s, stopping children", signal.Signals(signum).name)
+        self._stopping.set()
+
+    def run(self) -> None:
+        """Start every child and supervise until a stop signal. Blocks."""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+        for child in self.children:
+            self._start(child)
+        while not self._stopping.wait(self.check_interval):
+            for child in self.children:
+                self.check(child)
+        self._terminate(self.children)
+        logger.info("All children stopped")
+
+
+def agent_worker_count() -> int:
+    """AGENT_WORKERS, defaulting to the number of CPUs."""
+    return max(1, int(os.environ.get("AGENT_WORKERS", "0")) or os.cpu_count() or 1)
+
+
+def unified_specs(run_frontend: Callable, run_agent: Callable, port: int) -> List[ChildSpec]:
+    """
+    The frontend on `port` plus agent_worker_count() voice agent workers. Each worker gets its own health
+    port (AGENT_HEALTH_PORT, counting up from 8081) so they can share the container, and a share of the CPUs
+    as its number of prewarmed job processes (AGENT_IDLE_PROCESSES, unless set), so the workers together keep
+    about one per CPU rather than one per CPU each.
+    """
+    base_port = int(os.environ.get("AGENT_HEALTH_PORT", "8081"))
+    workers = agent_worker_count()
+    idle_processes = os.environ.get("AGENT_IDLE_PROCESSES") or str(max(1, (os.cpu_count() or 1) // workers))
+    specs = [ChildSpec("frontend", run_frontend, (port,), health_url=f"http://127.0.0.1:{port}/test")]
+    for index in range(workers):
+        health_port = base_port + index
+        specs.append(ChildSpec(
+            f"agent-{index}",
+            run_agent,
+            env={"AGENT_HEALTH_PORT": str(health_port), "AGENT_WORKER_INDEX": str(index),
+                 "AGENT_IDLE_PROCESSES": idle_processes},
+            health_url=f"http://127.0.0.1:{health_port}/",
+        ))
+    return specs
+
+
+def supervisor_from_env(specs: List[ChildSpec]) -> Supervisor:
+    """
+    SUPERVISOR_CHECK_INTERVAL and SUPERVISOR_STARTUP_GRACE override the defaults. SUPERVISOR_SHUTDOWN_TIMEOUT
+    defaults to the workers' AGENT_DRAIN_TIMEOUT (300) plus 30 seconds, so draining workers are not killed early.
+    SUPERVISOR_RESTART_TIMEOUT (default 5) is how long a hung child gets before it is killed for a restart.
+    """
+    drain_timeout = float(os.environ.get("AGENT_DRAIN_TIMEOUT", "300"))
+    return Supervisor(
+        specs,
+        check_interval=float(os.environ.get("SUPERVISOR_CHECK_INTERVAL", "5")),
+        startup_grace=float(os.environ.get("SUPERVISOR_STARTUP_GRACE", "60")),
+        shutdown_timeout=float(os.environ.get("SUPERVISOR_SHUTDOWN_TIMEOUT", drain_timeout + 30)),
+        restart_timeout=float(os.environ.get("SUPERVISOR_RESTART_TIMEOUT", "5")),
+    )
@@ -0,0 +1,417 @@
+"""
+tenancy.py
+
+Serves many teams from one worker, each with its own credentials. A job's tenant comes from its dispatch or room
+metadata, or from the metadata of the first participant (all set by whoever mints the tokens), and `${VAR}`
+references in mcp_servers.yaml resolve to that tenant's `VAR__<TENANT>` environment variable.
+
+With MCP_TENANT_POOL=1, MCP sessions are kept in a process-wide TenantConnectionPool keyed by tenant and server:
+jobs of the same tenant share sessions, the total number of open SSE streams and the streams per tenant are
+capped, and idle sessions are closed least recently used first to make room, or after MCP_POOL_IDLE_TTL seconds.
+Pooled sessions run on the pool's own event loop thread, so jobs on other loops (AGENT_JOB_EXECUTOR=thread) can
+share them.
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from metrics import MCP_POOL_EVICTIONS, MCP_POOL_REJECTED, MCP_POOL_STREAMS
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TENANT = "default"
+# Metadata keys naming the tenant, in order of preference
+TENANT_KEYS = ("tenant", "team")
+
+
+class QuotaExceeded(RuntimeError):
+    """The pool has no room for another session of this tenant."""
+
+
+def normalize_tenant(tenant: str) -> str:
+    return re.sub(r"[^a-z0-9_-]", "_", tenant.strip().lower())[:64]
+
+
+def tenant_from_metadata(*metadata) -> Optional[str]:
+    """
+    The tenant named in the first metadata that has one. Each metadata is a JSON object string (LiveKit metadata)
+    or a dict (participant attributes); anything else is skipped.
+    """
+    for raw in metadata:
+        data = raw
+        if isinstance(raw, str):
+            try:
+                data = json.loads(raw) if raw else None
+            except ValueError:
+                continue
+        if not isinstance(data, dict):
+            continue
+        for key in TENANT_KEYS:
+            value = data.get(key)
+            if isinstance(value, str) and value.strip():
+                return normalize_tenant(value)
+    return None
+
+
+async def resolve_tenant(ctx) -> str:
+    """
+    The tenant of a job: from its dispatch or room metadata, else from the first participant, which connects to
+    the room. DEFAULT_TENANT when none is named.
+    """
+    tenant = tenant_from_metadata(ctx.job.metadata, ctx.job.room.metadata)
+    if tenant is None:
+        await ctx.connect()
+        participant = await ctx.wait_for_participant()
+        tenant = tenant_from_metadata(participant.metadata, dict(participant.attributes))
+    return tenant or DEFAULT_TENANT
+
+
+def tenant_env_name(name: str, tenant: str) -> str:
+    return f"{name}__{re.sub(r'[^A-Z0-9]', '_', tenant.upper())}"
+
+
+def tenant_env(tenant: Optional[str]) -> Callable[[str], str]:
+    """
+    Environment lookup for one tenant: `VAR` reads `VAR__<TENANT>`. The default tenant (and no tenant) reads the
+    plain `VAR`; other tenants only fall back to it with TENANT_SHARED_SECRETS=1, so a team without its own
+    credentials never borrows another's.
+    """
+    def lookup(name: str) -> str:
+        if tenant is None or tenant == DEFAULT_TENANT:
+            return os.environ.get(name, "")
+        scoped = os.environ.get(tenant_env_name(name, tenant))
+        if scoped is not None:
+            return scoped
+        if os.environ.get("TENANT_SHARED_SECRETS") == "1":
+            return os.environ.get(name, "")
+        return ""
+    return lookup
+
+
+def _build_unpooled(conf: Dict[str, Any], tenant: str):
+    from tool_integration import build_server
+
+    return build_server(conf, tenant=tenant)
+
+
+class _Entry:
+    """
+    One pooled server and the jobs using it. A single owner task on the pool's loop connects the server, starts
+    its calls and closes it, so the session is opened and closed by the same task whichever job asked.
+    """
+
+    def __init__(self, server, settings: Dict[str, Any]):
+        self.server = server
+        self.settings = settings
+        self.users = 0
+        self.last_used = time.monotonic()
+        # Replaced by a new config while in use: closed when the last user releases it
+        self.retired = False
+        self._requests: "asyncio.Queue[Optional[Tuple[Callable[[], Awaitable], bool, asyncio.Future]]]" = asyncio.Queue()
+        self._closed = False
+        self._owner = asyncio.ensure_future(self._own())
+
+    async def _submit(self, operation: Callable[[], Awaitable], inline: bool = False):
+        if self._closed:
+            raise RuntimeError(f"Pooled MCP session {getattr(self.server, 'name', '')} is closed")
+        result = asyncio.get_running_loop().create_future()
+        self._requests.put_nowait((operation, inline, result))
+        return await result
+
+    async def ensure_connected(self) -> None:
+        # Run by the owner one at a time, so jobs connecting at the same time share one attempt
+        await self._submit(self._connect, inline=True)
+
+    async def _connect(self) -> None:
+        if self.server.session is None:
+            await self.server.connect()
+
+    async def reconnect(self) -> None:
+        await self._submit(self.server.reconnect, inline=True)
+
+    async def call(self, operation: Callable[[], Awaitable]):
+        """Run `operation` on the server from a task of the owner's. Cancelling the caller cancels it."""
+        return await self._submit(operation)
+
+    async def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._requests.put_nowait(None)
+        await asyncio.shield(self._owner)
+
+    async def _own(self) -> None:
+        calls = set()
+        try:
+            while True:
+                request = await self._requests.get()
+                if request is None:
+                    return
+                operation, inline, result = request
+                if result.done():
+                    # The caller gave up while the request was queued
+                    continue
+                if inline:
+                    await _settle(result, operation)
+                else:
+                    call = asyncio.ensure_future(_settle(result, operation))
+                    result.add_done_callback(lambda f, call=call: call.cancel() if f.cancelled() else None)
+                    calls.add(call)
+                    call.add_done_callback(calls.discard)
+        finally:
+            for call in calls:
+                call.cancel()
+            await asyncio.gather(*calls, return_exceptions=True)
+            try:
+                await self.server.cleanup()
+            except Exception as e:
+                logger.warning(f"Failed to close pooled MCP session {getattr(self.server, 'name', '')}: {e!r}")
+
+
+async def _settle(result: asyncio.Future, operation: Callable[[], Awaitable]) -> None:
+    try:
+        value = await operation()
+    except asyncio.CancelledError:
+        result.cancel()
+        raise
+    except Exception as e:
+        if not result.done():
+            result.set_exception(e)
+    else:
+        if not result.done():
+            result.set_result(value)
+
+
+class TenantConnectionPool:
+    """
+    MCP sessions keyed by (tenant, server name), at most `max_streams` in total and `max_per_tenant` per tenant.
+    When full, the least recently used idle session (of the tenant, or of anyone for the total) is closed; when
+    every candidate is in use, QuotaExceeded is raised. Sessions idle for `idle_ttl` seconds are closed (0 keeps
+    them). `factory(conf, tenant)` builds an unconnected server.
+    """
+
+    def __init__(self, max_streams: int = 64, max_per_tenant: int = 8, idle_ttl: float = 300.0,
+                 factory: Optional[Callable[[Dict[str, Any], str], Any]] = None):
+        self.max_streams = max_streams
+        self.max_per_tenant = max_per_tenant
+        self.idle_ttl = idle_ttl
+        self.factory = factory or _build_unpooled
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._sweeper = None
+        self._closing = set()
+        self._start_lock = threading.Lock()
+
+    def server(self, tenant: Optional[str], conf: Dict[str, Any]) -> "PooledServer":
+        """An unconnected server for `tenant` that takes its session from the pool on connect."""
+        return PooledServer(self, tenant or DEFAULT_TENANT, conf)
+
+    def sessions(self, tenant: Optional[str] = None) -> List[Tuple[str, str]]:
+        """(tenant, server name) of the pooled sessions, least recently used first."""
+        return [key for key in list(self._entries) if tenant is None or key[0] == tenant]
+
+    def _loop_ready(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=loop.run_forever, name="mcp-tenant-pool", daemon=True)
+                self._thread.start()
+                self._loop = loop
+                if self.idle_ttl > 0:
+                    self._sweeper = asyncio.run_coroutine_threadsafe(self._sweep_forever(), loop)
+            return self._loop
+
+    async def _run(self, coro):
+        """Run `coro` on the pool's loop. Cancelling the caller cancels it there too."""
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._loop_ready()))
+
+    # Everything below runs on the pool's loop
+
+    def _updated(self) -> None:
+        MCP_POOL_STREAMS.set(len(self._entries))
+
+    def _close_later(self, entry: _Entry) -> None:
+        task = asyncio.ensure_future(entry.close())
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+    def _pop_idle(self, keys: List[Tuple[str, str]], reason: str) -> _Entry:
+        for key in keys:
+            if self._entries[key].users == 0:
+                MCP_POOL_EVICTIONS.inc(reason="lru")
+                logger.info(f"Closing idle MCP session {key} to make room")
+                return self._entries.pop(key)
+        MCP_POOL_REJECTED.inc(reason=reason)
+        if reason == "tenant_quota":
+            raise QuotaExceeded(f"Tenant {keys[0][0]} already uses {self.max_per_tenant} MCP sessions")
+        raise QuotaExceeded(f"All {self.max_streams} pooled MCP sessions are in use")
+
+    async def _acquire(self, tenant: str, conf: Dict[str, Any]) -> _Entry:
+        key = (tenant, conf.get("name", ""))
+        entry = self._entries.get(key)
+        if entry is not None and entry.settings != conf:
+            # The server's config changed: new users get a new session, current ones keep the old until released
+            del self._entries[key]
+            if entry.users:
+                entry.retired = True
+            else:
+                self._close_later(entry)
+            entry = None
+        if entry is None:
+            victims = []
+            try:
+                tenant_keys = self.sessions(tenant)
+                if len(tenant_keys) >= self.max_per_tenant:
+                    victims.append(self._pop_idle(tenant_keys, "tenant_quota"))
+                if len(self._entries) >= self.max_streams:
+                    victims.append(self._pop_idle(self.sessions(), "max_streams"))
+            finally:
+                for victim in victims:
+                    self._close_later(victim)
+            entry = self._entries[key] = _Entry(self.factory(conf, tenant), dict(conf))
+        entry.users += 1
+        entry.last_used = time.monotonic()
+        self._entries.move_to_end(key)
+        self._updated()
+        return entry
+
+    async def _release(self, entry: _Entry) -> None:
+        entry.users -= 1
+        entry.last_used = time.monotonic()
+        if entry.retired and entry.users == 0:
+            self._close_later(entry)
+
+    async def _evict_idle(self) -> None:
+        now = time.monotonic()
+        for key in self.sessions():
+            entry = self._entries[key]
+            if entry.users == 0 and now - entry.last_used >= self.idle_ttl:
+                MCP_POOL_EVICTIONS.inc(reason="idle")
+                logger.info(f"Closing MCP session {key}, idle for {now - entry.last_used:.0f}s")
+                self._close_later(self._entries.pop(key))
+        self._updated()
+
+    async def _sweep_forever(self) -> None:
+        while True:
+            await asyncio.sleep(max(self.idle_ttl / 2, 0.01))
+            await self._evict_idle()
+
+    async def _close_all(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        entries = list(self._entries.values())
+        self._entries.clear()
+        self._updated()
+        await asyncio.gather(*(entry.close() for entry in entries), *self._closing, return_exceptions=True)
+
+    # Callable from any loop
+
+    async def evict_idle(self) -> None:
+        """Close the sessions idle for `idle_ttl` seconds now rather than at the next sweep."""
+        await self._run(self._evict_idle())
+
+    async def close(self) -> None:
+        """Close every pooled session and stop the pool's loop. The pool restarts on next use."""
+        if self._loop is None:
+            return
+        await self._run(self._close_all())
+        with self._start_lock:
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+        loop.call_soon_threadsafe(loop.stop)
+        await asyncio.to_thread(thread.join, 5)
+        loop.close()
+
+
+class PooledServer:
+    """
+    A job's handle on a pooled MCP server, used like the server itself. connect() takes the session from the pool
+    (raising QuotaExceeded when there is no room) and cleanup() returns it.
+    """
+
+    def __init__(self, pool: TenantConnectionPool, tenant: str, conf: Dict[str, Any]):
+        self.pool = pool
+        self.tenant = tenant
+        self.conf = conf
+        self._entry: Optional[_Entry] = None
+
+    @property
+    def name(self) -> str:
+        return self.conf.get("name", "")
+
+    @property
+    def session(self):
+        return self._entry.server.session if self._entry is not None else None
+
+    @property
+    def connected_at(self) -> Optional[float]:
+        return self._entry.server.connected_at if self._entry is not None else None
+
+    @property
+    def last_used(self) -> float:
+        return self._entry.server.last_used if self._entry is not None else 0.0
+
+    async def connect(self):
+        if self._entry is None:
+            self._entry = await self.pool._run(self.pool._acquire(self.tenant, self.conf))
+        await self.pool._run(self._entry.ensure_connected())
+
+    async def _connected_entry(self) -> _Entry:
+        if self._entry is None:
+            await self.connect()
+        return self._entry
+
+    async def list_tools(self):
+        entry = await self._connected_entry()
+        return await self.pool._run(entry.call(entry.server.list_tools))
+
+    async def call_tool(self, tool_name: str, arguments: Optional[Dict[str, Any]] = None):
+        entry = await self._connected_entry()
+        return await self.pool._run(entry.call(lambda: entry.server.call_tool(tool_name, arguments)))
+
+    async def ping(self, timeout: float = 2.0) -> bool:
+        entry = self._entry
+        if entry is None:
+            return False
+        return await self.pool._run(entry.call(lambda: entry.server.ping(timeout)))
+
+    async def reconnect(self):
+        if self._entry is None:
+            await self.connect()
+            return
+        await self.pool._run(self._entry.reconnect())
+
+    async def cleanup(self):
+        entry, self._entry = self._entry, None
+        if entry is not None:
+            await self.pool._run(self.pool._release(entry))
+
+
+_pool: Optional[TenantConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def tenant_pool_from_env() -> Optional[TenantConnectionPool]:
+    """
+    The process-wide pool when MCP_TENANT_POOL=1, else None. Limits come from MCP_POOL_MAX_STREAMS (default 64),
+    MCP_POOL_MAX_PER_TENANT (default 8) and MCP_POOL_IDLE_TTL seconds (default 300).
+    """
+    global _pool
+    if os.environ.get("MCP_TENANT_POOL") != "1":
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = TenantConnectionPool(
+                max_streams=int(os.environ.get("MCP_POOL_MAX_STREAMS", "64")),
+                max_per_tenant=int(os.environ.get("MCP_POOL_MAX_PER_TENANT", "8")),
+                idle_ttl=float(os.environ.get("MCP_POOL_IDLE_TTL", "300")),
+            )
+        return _pool
@@ -0,0 +1,50 @@
+import asyncio
+import json
+import threading
+import time
+import http.server
+
+import pytest
+
+pytest.importorskip("httpx")
+pytest.importorskip("requests")
+
+from a2a import A2AServerConfig
+
+class SlowA2AHandler(http.server.BaseHTTPRequestHandler):
+    cancelled = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.path == "/tasks/cancel":
+            self.cancelled.append(body["params"]["id"])
+        else:
+            time.sleep(1)
+        reply = json.dumps({"jsonrpc": "2.0", "id": body["id"], "result": {}}).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, format, *args):
+        pass
+
+def test_cancelled_task_is_cancelled_on_the_server():
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), SlowA2AHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    server = A2AServerConfig(f"http://127.0.0.1:{httpd.server_address[1]}", {}, "slow")
+
+    async def scenario():
+        task = asyncio.create_task(server.send_task("hello"))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await server.cleanup()
+
+    try:
+        asyncio.run(scenario())
+        assert len(SlowA2AHandler.cancelled) == 1
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
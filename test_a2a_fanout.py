@@ -0,0 +1,38 @@
+import asyncio
+import time
+
+from a2a_fanout import A2AFanout, merge_replies
+
+class FakeAgent:
+    def __init__(self, name, delay=0.0, error=None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.cancelled = False
+
+    async def send_task(self, text):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise RuntimeError(self.error)
+        return f"{self.name}: {text}"
+
+def test_fanout_merges_concurrent_replies_with_partial_results():
+    agents = [FakeAgent("k8s", 0.1), FakeAgent("gateway", 0.1), FakeAgent("slow", 5), FakeAgent("broken", error="HTTP 500")]
+    fanout = A2AFanout("platform", agents, deadline=0.3)
+    started = time.perf_counter()
+    reply = asyncio.run(fanout.send_task("status?"))
+    assert time.perf_counter() - started < 0.5
+    assert reply == (
+        "[k8s]\nk8s: status?\n\n"
+        "[gateway]\ngateway: status?\n\n"
+        "[slow] No reply within 0.3 seconds.\n\n"
+        "[broken] Failed: HTTP 500"
+    )
+    assert agents[2].cancelled
+
+def test_merge_replies_keeps_member_order():
+    assert merge_replies([("b", "ok", "2"), ("a", "ok", "1")], 5) == "[b]\n2\n\n[a]\n1"
@@ -0,0 +1,83 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("livekit.agents")
+
+from benchmarks.fake_mcp_server import FakeServerOptions, running_fake_mcp_server
+from metrics import TOOLS_CANCELLED
+from mcp_client.agent_tools import MCPToolsIntegration
+from mcp_client.server import MCPServerSse
+from mcp_client.util import FunctionTool
+
+class FakeSpeechHandle:
+    def __init__(self):
+        self.interrupted = asyncio.Event()
+
+    async def wait_if_not_interrupted(self, aws):
+        interrupt = asyncio.ensure_future(self.interrupted.wait())
+        await asyncio.wait([*aws, interrupt], return_when=asyncio.FIRST_COMPLETED)
+        interrupt.cancel()
+
+def cancelled_count(tool):
+    return sum(value for labels, value in TOOLS_CANCELLED.snapshot()["samples"] if labels["tool"] == tool)
+
+def slow_tool(name, cancelled):
+    async def invoke(context, input_json):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(input_json)
+            raise
+        return "done"
+    schema = {"type": "object", "properties": {"query": {"type": "string"}}, "required": ["query"]}
+    return MCPToolsIntegration._create_decorated_tool(FunctionTool(name, "A slow tool", schema, invoke))
+
+def test_interrupting_the_speech_cancels_the_tool_call():
+    cancelled = []
+    tool = slow_tool("slow_interrupted", cancelled)
+
+    async def scenario():
+        handle = FakeSpeechHandle()
+        call = asyncio.create_task(tool(run_context=SimpleNamespace(speech_handle=handle), query="cards"))
+        await asyncio.sleep(0.05)
+        handle.interrupted.set()
+        return await asyncio.wait_for(call, 1)
+
+    result = asyncio.run(scenario())
+    assert "cancelled because the user interrupted" in result
+    assert cancelled == ['{"query": "cards"}']
+    assert cancelled_count("slow_interrupted") == 1
+
+def test_tools_can_be_called_without_a_run_context():
+    async def invoke(context, input_json):
+        return input_json
+    schema = {"type": "object", "properties": {"query": {"type": "string"}}, "required": ["query"]}
+    tool = MCPToolsIntegration._create_decorated_tool(FunctionTool("echo", "Echo", schema, invoke))
+    assert asyncio.run(tool(query="cards")) == '{"query": "cards"}'
+
+def test_cancelled_call_notifies_the_mcp_server():
+    async def scenario():
+        async with running_fake_mcp_server(FakeServerOptions(tool_count=1, latency_ms=5000)) as url:
+            server = MCPServerSse({"url": url}, name="trello")
+            await server.connect()
+            session = server.session
+            sent = []
+            send_notification = session.send_notification
+            async def record(notification):
+                sent.append(notification.root)
+                await send_notification(notification)
+            session.send_notification = record
+            request_id = session._request_id
+            call = asyncio.create_task(server.call_tool("tool_000", {"query": "cards"}))
+            await asyncio.sleep(0.2)
+            call.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await call
+            await server.cleanup()
+            return sent, request_id
+
+    sent, request_id = asyncio.run(scenario())
+    assert [n.method for n in sent] == ["notifications/cancelled"]
+    assert sent[0].params.requestId == request_id
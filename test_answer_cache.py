@@ -0,0 +1,81 @@
+from types import SimpleNamespace
+
+from answer_cache import AnswerCache, answer_cache_from_env
+
+def message(role, text):
+    return SimpleNamespace(type="message", role=role, text_content=text)
+
+def call(call_id, name, arguments="{}"):
+    return SimpleNamespace(type="function_call", call_id=call_id, name=name, arguments=arguments)
+
+def output(call_id, name, text, is_error=False):
+    return SimpleNamespace(type="function_call_output", call_id=call_id, name=name, output=text, is_error=is_error)
+
+def ctx(*items):
+    return SimpleNamespace(items=list(items))
+
+def answer(cache, question, call_id, tool, result, text="You have three cards."):
+    """Simulate the second llm_node round of a turn that called one tool."""
+    turn = cache.begin_turn(ctx(message("user", question), call(call_id, tool), output(call_id, tool, result)))
+    turn.observe_chunk(text)
+    turn.finish()
+
+def test_replays_answer_for_same_question():
+    cache = AnswerCache()
+    answer(cache, "What cards are on my board?", "c1", "get_cards", "[1, 2, 3]")
+    turn = cache.begin_turn(ctx(message("user", "what cards are on my board")))
+    assert turn.cached_text == "You have three cards."
+    assert cache.hits == 1
+
+def test_changed_tool_result_invalidates_answer():
+    cache = AnswerCache()
+    answer(cache, "What cards are on my board?", "c1", "get_cards", "[1, 2, 3]")
+    # The same tool is refreshed in another turn and returns different data
+    answer(cache, "How many cards do I have?", "c2", "get_cards", "[1, 2]", text="Two.")
+    turn = cache.begin_turn(ctx(message("user", "What cards are on my board?")))
+    assert turn.cached_text is None
+
+def test_unchanged_refresh_keeps_answer():
+    cache = AnswerCache()
+    answer(cache, "What cards are on my board?", "c1", "get_cards", "[1, 2, 3]")
+    answer(cache, "How many cards do I have?", "c2", "get_cards", "[1, 2, 3]", text="Three.")
+    turn = cache.begin_turn(ctx(message("user", "What cards are on my board?")))
+    assert turn.cached_text == "You have three cards."
+
+def test_mutating_tool_invalidates_everything_and_is_not_cached():
+    cache = AnswerCache()
+    answer(cache, "What cards are on my board?", "c1", "get_cards", "[1, 2, 3]")
+    answer(cache, "Add a card called groceries", "c2", "add_card", "ok", text="Done.")
+    assert cache.begin_turn(ctx(message("user", "What cards are on my board?"))).cached_text is None
+    assert cache.begin_turn(ctx(message("user", "Add a card called groceries"))).cached_text is None
+
+def test_answers_without_tool_results_are_not_cached():
+    cache = AnswerCache()
+    turn = cache.begin_turn(ctx(message("user", "Hello")))
+    turn.observe_chunk("Hi there!")
+    turn.finish()
+    assert cache.begin_turn(ctx(message("user", "Hello"))).cached_text is None
+
+def test_previous_assistant_message_is_part_of_the_key():
+    cache = AnswerCache()
+    answer(cache, "What about the other one?", "c1", "get_board", "{}")
+    follow_up = ctx(message("assistant", "Your Work board has two lists."), message("user", "What about the other one?"))
+    assert cache.begin_turn(follow_up).cached_text is None
+
+def test_caches_are_per_session_by_default(monkeypatch):
+    monkeypatch.setenv("AGENT_ANSWER_CACHE", "1")
+    monkeypatch.delenv("AGENT_ANSWER_CACHE_SCOPE", raising=False)
+    first, second = answer_cache_from_env(), answer_cache_from_env()
+    answer(first, "What cards are on my board?", "c1", "get_cards", "[1, 2, 3]")
+    assert second.begin_turn(ctx(message("user", "What cards are on my board?"))).cached_text is None
+    monkeypatch.setenv("AGENT_ANSWER_CACHE_SCOPE", "shared")
+    assert answer_cache_from_env() is answer_cache_from_env()
+
+def test_shared_caches_are_per_tenant(monkeypatch):
+    monkeypatch.setenv("AGENT_ANSWER_CACHE", "1")
+    monkeypatch.setenv("AGENT_ANSWER_CACHE_SCOPE", "shared")
+    acme = answer_cache_from_env("acme")
+    answer(acme, "What cards are on my board?", "c1", "get_cards", "[1, 2, 3]")
+    assert answer_cache_from_env("acme") is acme
+    other = answer_cache_from_env("other")
+    assert other.begin_turn(ctx(message("user", "What cards are on my board?"))).cached_text is None
@@ -0,0 +1,101 @@
+import asyncio
+
+import yaml
+
+from config_watcher import ConfigWatcher, configs_by_name, diff_configs
+
+def test_diff_separates_connection_changes_from_tool_filters():
+    old = configs_by_name([
+        {"name": "trello", "url": "http://a/sse", "allowed_tools": ["list_*"]},
+        {"name": "github", "url": "http://b/sse"},
+        {"name": "notes", "url": "http://c/sse"},
+    ])
+    new = configs_by_name([
+        {"name": "trello", "url": "http://a/sse", "allowed_tools": ["list_*", "create_card"]},
+        {"name": "github", "url": "http://b2/sse"},
+        {"name": "search", "type": "a2a", "url": "http://d"},
+    ])
+    diff = diff_configs(old, new)
+    assert diff.added == ["search"]
+    assert diff.removed == ["notes"]
+    assert diff.changed == ["github"]
+    assert diff.refiltered == ["trello"]
+
+def test_identical_configs_have_no_diff():
+    configs = configs_by_name([{"name": "trello", "url": "http://a/sse", "headers": {"X": "1"}}])
+    assert not diff_configs(configs, dict(configs))
+
+class FakeServer:
+    def __init__(self, conf):
+        self.name = conf["name"]
+        self.conf = conf
+        self.connected = False
+        self.cleaned_up = False
+
+    async def connect(self):
+        self.connected = True
+
+    async def cleanup(self):
+        self.cleaned_up = True
+
+class FakeAgent:
+    def __init__(self, tools):
+        self.tools = tools
+        self.updates = 0
+
+    async def update_tools(self, tools):
+        self.updates += 1
+        self.tools = tools
+
+def tool(name):
+    def fn():
+        pass
+    fn.__name__ = name
+    return fn
+
+async def fake_prepare(server, allowed=None, convert_schemas_to_strict=True):
+    return [tool(f"{server.name}_{name}") for name in (allowed or ["all"])]
+
+def write_config(path, servers):
+    path.write_text(yaml.safe_dump({"servers": servers}))
+
+def test_reload_swaps_tools_once_and_cleans_up_replaced_servers(tmp_path, monkeypatch):
+    monkeypatch.setattr("tool_integration.prepare_server_tools", fake_prepare)
+    path = tmp_path / "mcp_servers.yaml"
+    old = [
+        {"name": "board", "url": "http://board/sse"},
+        {"name": "cards", "url": "http://cards/sse", "allowed_tools": ["get"]},
+        {"name": "notes", "url": "http://notes/sse"},
+        {"name": "search", "type": "a2a", "url": "http://search"},
+        {"name": "group", "type": "a2a_fanout", "members": ["search"]},
+    ]
+    write_config(path, old)
+    servers = {conf["name"]: FakeServer(conf) for conf in old}
+    original = dict(servers)
+    own = tool("hang_up")
+    agent = FakeAgent([own])
+
+    async def scenario():
+        watcher = await ConfigWatcher(agent, servers, configs_by_name(old), str(path), interval=60,
+                                      build=lambda conf, live: FakeServer(conf)).start()
+        agent.updates = 0
+        write_config(path, [
+            {"name": "board", "url": "http://board/sse"},
+            {"name": "cards", "url": "http://cards/sse", "allowed_tools": ["get", "list"]},
+            {"name": "search", "type": "a2a", "url": "http://search-v2"},
+            {"name": "group", "type": "a2a_fanout", "members": ["search"]},
+            {"name": "lists", "url": "http://lists/sse"},
+        ])
+        diff = await watcher.reload()
+        await watcher.stop()
+        return diff
+
+    diff = asyncio.run(scenario())
+    assert (diff.added, diff.removed, diff.changed, diff.refiltered) == (["lists"], ["notes"], ["search", "group"], ["cards"])
+    # One swap, keeping the agent's own tools and the connections that didn't change
+    assert agent.updates == 1
+    assert [t.__name__ for t in agent.tools] == ["hang_up", "board_all", "cards_get", "cards_list", "search_all",
+                                                 "group_all", "lists_all"]
+    assert servers["board"] is original["board"] and servers["cards"] is original["cards"]
+    assert servers["lists"].connected and servers["search"].connected and servers["group"].connected
+    assert [name for name, server in original.items() if server.cleaned_up] == ["notes", "search", "group"]
@@ -0,0 +1,33 @@
+from endpointing import EndpointingController
+
+def test_short_pauses_shrink_the_window():
+    controller = EndpointingController(min_delay=0.2, max_delay=1.5, initial_delay=1.0, min_samples=3)
+    now = 0.0
+    for _ in range(20):
+        controller.on_user_stopped(now)
+        controller.on_user_started(now + 0.15)
+        now += 2
+    assert controller.current < 0.5
+    assert controller.current >= 0.2
+
+def test_cut_offs_widen_the_window_within_bounds():
+    controller = EndpointingController(min_delay=0.3, max_delay=1.0, initial_delay=0.5)
+    now = 0.0
+    for _ in range(10):
+        controller.on_user_stopped(now)
+        controller.on_agent_started(now + 0.6)
+        controller.on_user_started(now + 0.9)
+        now += 5
+    assert controller.cutoffs == 10
+    assert controller.current == 1.0
+
+def test_distribution_export():
+    controller = EndpointingController()
+    for pause in (0.05, 0.25, 0.4, 2.5):
+        controller.on_user_stopped(0.0)
+        controller.on_user_started(pause)
+    dist = controller.distribution()
+    assert dist["pauses"] == 4
+    assert dist["pause_buckets"]["0.1"] == 1
+    assert dist["pause_buckets"]["0.5"] == 3
+    assert dist["pause_buckets"]["+Inf"] == 4
@@ -0,0 +1,98 @@
+import http.client
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from frontend.server import create_server
+
+@pytest.fixture
+def server(tmp_path):
+    (tmp_path / "index.html").write_text("<html>hi</html>")
+    httpd = create_server(0, "127.0.0.1", directory=tmp_path, max_connections=2, request_timeout=2)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+def test_keep_alive_serves_endpoints_and_static_files(server):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+    conn.request("GET", "/test")
+    response = conn.getresponse()
+    assert response.status == 200
+    assert json.loads(response.read())["status"] == "ok"
+    # Same connection is reused for the next request
+    conn.request("GET", "/index.html")
+    response = conn.getresponse()
+    assert response.status == 200
+    assert response.read() == b"<html>hi</html>"
+    conn.close()
+
+def test_connections_over_limit_get_503(server):
+    port = server.server_address[1]
+    idle = [socket.create_connection(("127.0.0.1", port)) for _ in range(2)]
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        conn.request("GET", "/test")
+        assert conn.getresponse().status == 503
+        conn.close()
+    finally:
+        for sock in idle:
+            sock.close()
+
+def test_static_files_revalidate_with_etag(server):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+    conn.request("GET", "/index.html")
+    response = conn.getresponse()
+    response.read()
+    etag = response.getheader("ETag")
+    assert etag and response.getheader("Cache-Control") == "no-cache"
+    conn.request("GET", "/index.html", headers={"If-None-Match": etag})
+    response = conn.getresponse()
+    assert response.status == 304
+    assert response.read() == b""
+    conn.close()
+
+def test_drain_closes_keep_alive_and_waits_for_connections(server):
+    sock = socket.create_connection(("127.0.0.1", server.server_address[1]), timeout=5)
+    sock.sendall(b"GET /test HTTP/1.1\r\nHost: localhost\r\n")
+    time.sleep(0.05)
+    assert not server.drain(0.1)
+    # The request in progress is answered, with a header telling the client to close the connection
+    sock.sendall(b"\r\n")
+    reply = b""
+    while b"ok" not in reply:
+        reply += sock.recv(4096)
+    assert b"Connection: close" in reply
+    assert server.drain(2)
+    sock.close()
+
+def test_idle_keep_alive_connections_free_their_slot(tmp_path):
+    httpd = create_server(0, "127.0.0.1", directory=tmp_path, max_connections=1, request_timeout=5, idle_timeout=0.2)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    try:
+        port = httpd.server_address[1]
+        idle = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        idle.request("GET", "/test")
+        idle.getresponse().read()
+        # The keep-alive connection is closed once idle, so the only slot is free again
+        time.sleep(0.5)
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+        conn.request("GET", "/test")
+        assert conn.getresponse().status == 200
+        conn.close()
+        idle.close()
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+
+def test_drain_closes_idle_keep_alive_connections(server):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+    conn.request("GET", "/test")
+    conn.getresponse().read()
+    # The client keeps the connection open; the server closes it instead of waiting out the drain
+    assert server.drain(2)
+    conn.close()
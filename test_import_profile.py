@@ -0,0 +1,24 @@
+from import_profile import parse_importtime, render_tree
+
+REPORT = """import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     json.scanner
+import time:       400 |        500 |   json.decoder
+import time:       300 |        800 | json
+import time:      2000 |       2000 |   yaml.reader
+import time:      1000 |       3000 | yaml
+"""
+
+def test_parse_importtime_builds_tree():
+    roots = parse_importtime(REPORT)
+    assert [r.name for r in roots] == ["json", "yaml"]
+    json_node = roots[0]
+    assert json_node.cumulative_us == 800
+    assert [c.name for c in json_node.children] == ["json.decoder"]
+    assert [c.name for c in json_node.children[0].children] == ["json.scanner"]
+
+def test_render_tree_orders_and_prunes():
+    text = render_tree(parse_importtime(REPORT), min_ms=0.6)
+    lines = text.splitlines()
+    assert "yaml" in lines[1]
+    assert "json.decoder" not in text
+    assert lines[-1].strip() == "3.8 ms total"
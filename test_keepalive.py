@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+from mcp_client.keepalive import LivenessManager
+from metrics import MCP_BACKGROUND_RECONNECTS
+
+class FakeSession:
+    pass
+
+class FakeServer:
+    def __init__(self, alive=True, last_used=0.0):
+        self.alive = alive
+        self.last_used = last_used
+        self.session = FakeSession()
+        self.connected_at = time.monotonic() - 120
+        self.pings = 0
+        self.reconnects = 0
+
+    async def ping(self, timeout):
+        self.pings += 1
+        return self.alive
+
+    async def reconnect(self):
+        self.reconnects += 1
+        await asyncio.sleep(0.05)
+        self.alive = True
+        self.connected_at = time.monotonic()
+
+def reconnect_count(name):
+    samples = MCP_BACKGROUND_RECONNECTS.snapshot()["samples"]
+    return sum(value for labels, value in samples if labels["server"] == name)
+
+def test_pings_idle_sessions_and_reconnects_dead_ones_in_background():
+    async def scenario():
+        servers = {
+            "busy": FakeServer(last_used=time.monotonic()),
+            "idle": FakeServer(),
+            "dead": FakeServer(alive=False),
+            "a2a": object(),
+        }
+        manager = LivenessManager(servers, interval=10)
+        before = reconnect_count("dead")
+        await manager.check()
+        # The reconnect runs in the background; a second round doesn't start another one
+        assert "dead" in manager._reconnecting
+        await manager.check()
+        await asyncio.sleep(0.1)
+        await manager.stop()
+        return servers, reconnect_count("dead") - before
+
+    servers, reconnects = asyncio.run(scenario())
+    assert servers["busy"].pings == 0
+    assert servers["idle"].pings == 2
+    assert servers["dead"].pings == 1
+    assert servers["dead"].reconnects == 1 and servers["dead"].alive
+    assert reconnects == 1
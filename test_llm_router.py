@@ -0,0 +1,95 @@
+import asyncio
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("livekit.agents")
+
+from livekit.agents import DEFAULT_API_CONNECT_OPTIONS, APIConnectionError, llm
+
+from llm_router import ROUTE_CLOUD, ROUTE_LOCAL, RoutingLLM, classify_turn
+
+def message(role, text):
+    return SimpleNamespace(type="message", role=role, text_content=text)
+
+def chat_ctx(*items):
+    return SimpleNamespace(items=list(items))
+
+class FakeStream(llm.LLMStream):
+    async def _run(self):
+        fake = self._llm
+        await asyncio.sleep(fake.delay)
+        if fake.failing:
+            raise APIConnectionError(f"{fake.name} is down", retryable=False)
+        self._event_ch.send_nowait(llm.ChatChunk(id=uuid.uuid4().hex, delta=llm.ChoiceDelta(content=fake.name)))
+
+class FakeLLM(llm.LLM):
+    def __init__(self, name, delay=0.0):
+        super().__init__()
+        self.name = name
+        self.delay = delay
+        self.failing = False
+        self.calls = 0
+
+    def chat(self, *, chat_ctx, tools=None, conn_options=DEFAULT_API_CONNECT_OPTIONS, **kwargs):
+        self.calls += 1
+        return FakeStream(self, chat_ctx=chat_ctx, tools=tools or [], conn_options=conn_options)
+
+async def answer(router, text):
+    async with router.chat(chat_ctx=chat_ctx(message("user", text))) as stream:
+        return "".join([chunk.delta.content async for chunk in stream if chunk.delta])
+
+def test_classify_turn():
+    assert classify_turn(chat_ctx(message("user", "Okay!"))) == ROUTE_LOCAL
+    assert classify_turn(chat_ctx(message("user", "What's on my Today board?"))) == ROUTE_LOCAL
+    assert classify_turn(chat_ctx(message("user", "Move the bug card to done and then summarize the board"))) == ROUTE_CLOUD
+    assert classify_turn(chat_ctx(message("user", " "))) == ROUTE_CLOUD
+    assert classify_turn(chat_ctx(message("user", "one two three four five")), local_max_words=4) == ROUTE_CLOUD
+    # A turn already chaining tool calls stays on the cloud model
+    chained = chat_ctx(message("user", "Check the board"), SimpleNamespace(type="function_call"),
+                       SimpleNamespace(type="function_call"))
+    assert classify_turn(chained) == ROUTE_CLOUD
+
+def test_routes_turns_and_counts_fallbacks_per_turn():
+    local, cloud = FakeLLM("local"), FakeLLM("cloud")
+    router = RoutingLLM(local_llm=local, cloud_llm=cloud)
+    emitted = []
+    router.on("metrics_collected", emitted.append)
+
+    async def scenario():
+        assert await answer(router, "yes") == "local"
+        local.failing = True
+        # The local model fails this turn and the cloud model answers it
+        assert await answer(router, "thanks") == "cloud"
+        assert await answer(router, "Compare all the boards and prioritize") == "cloud"
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert cloud.calls == 2
+    summary = router.summary()
+    assert summary[ROUTE_LOCAL]["requests"] == 2 and summary[ROUTE_LOCAL]["fallbacks"] == 1
+    assert summary[ROUTE_CLOUD]["requests"] == 1 and summary[ROUTE_CLOUD]["fallbacks"] == 0
+    # A local turn answered by the fallback is timed as a local turn, and each turn is reported once
+    assert len(router.stats[ROUTE_LOCAL].ttft) == 2 and len(router.stats[ROUTE_CLOUD].ttft) == 1
+    assert len(emitted) == 3
+
+def test_overlapping_turns_are_attributed_to_their_own_route():
+    local, cloud = FakeLLM("local", delay=0.05), FakeLLM("cloud", delay=0.01)
+    local.failing = True
+    router = RoutingLLM(local_llm=local, cloud_llm=cloud)
+
+    async def scenario():
+        # A speculative generation and the real turn run at the same time
+        return await asyncio.gather(answer(router, "okay"), answer(router, "Summarize every board and then plan"))
+
+    assert asyncio.run(scenario()) == ["cloud", "cloud"]
+    summary = router.summary()
+    assert summary[ROUTE_LOCAL]["fallbacks"] == 1 and summary[ROUTE_CLOUD]["fallbacks"] == 0
+    assert len(router.stats[ROUTE_LOCAL].duration) == 1 and len(router.stats[ROUTE_CLOUD].duration) == 1
+
+def test_classifier_errors_use_the_cloud_model():
+    def broken(chat_ctx):
+        raise ValueError("boom")
+    router = RoutingLLM(local_llm=FakeLLM("local"), cloud_llm=FakeLLM("cloud"), classifier=broken)
+    assert asyncio.run(answer(router, "yes")) == "cloud"
@@ -0,0 +1,31 @@
+import time
+from types import SimpleNamespace
+
+from load import LoadSample, WorkerLoadModel
+from metrics import MetricsPublisher, MetricsRegistry
+
+def test_score_is_busiest_signal_capped_at_one():
+    model = WorkerLoadModel(max_jobs=4, max_loop_lag=0.2, max_tool_calls=10)
+    assert model.score(LoadSample(jobs=1, cpu=0.1, loop_lag=0.0, tool_calls=0)) == 0.25
+    assert model.score(LoadSample(jobs=1, cpu=0.1, loop_lag=0.1, tool_calls=0)) == 0.5
+    assert model.score(LoadSample(jobs=1, cpu=0.9, loop_lag=0.0, tool_calls=2)) == 0.9
+    assert model.score(LoadSample(jobs=8, cpu=0.0, loop_lag=0.0, tool_calls=0)) == 1.0
+
+def test_load_includes_metrics_published_by_job_processes():
+    model = WorkerLoadModel(max_jobs=10, max_tool_calls=4, aggregator_addr="127.0.0.1:0", cpu=lambda: 0.0)
+    try:
+        host, port = model.aggregator.addr
+        for job, (calls, lag) in enumerate([(1, 0.01), (2, 0.05)]):
+            registry = MetricsRegistry()
+            registry.gauge("agent_tool_calls_in_flight", "").set(calls)
+            registry.gauge("agent_event_loop_lag_recent_seconds", "").set(lag)
+            MetricsPublisher(registry, [f"{host}:{port}"], worker_id=f"job-{job}").publish()
+        deadline = time.monotonic() + 2
+        while len(model.aggregator.workers()) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        load = model(SimpleNamespace(active_jobs=[object()] * 2))
+        assert model.last == LoadSample(jobs=2, cpu=0.0, loop_lag=0.05, tool_calls=3)
+        assert load == 0.75
+    finally:
+        model.close()
@@ -0,0 +1,66 @@
+import logging
+import queue
+
+from log_config import (DeferredQueueHandler, LazyJson, RedactingFilter, SamplingFilter, configure_logging,
+                        parse_sample_rates, redact, shutdown_logging)
+
+def make_record(msg, *args, name="mcp_client.sse_client", level=logging.INFO):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+def test_redact_credentials():
+    text = redact("headers={'Authorization': 'Bearer abc.def'} token Bearer xyz {\"auth\": \"c2ln\"}")
+    assert "abc.def" not in text
+    assert "xyz" not in text
+    assert "c2ln" not in text
+    assert text.count("[REDACTED]") == 3
+
+def test_redacting_filter_formats_and_caps():
+    record = make_record("POST %s", LazyJson({"params": {"auth": "secret"}, "body": "x" * 100}))
+    RedactingFilter(max_chars=40).filter(record)
+    assert record.args is None
+    assert "secret" not in record.msg
+    assert "more chars" in record.msg
+
+def test_lazy_json_not_serialized_until_formatted():
+    class Exploding:
+        def __str__(self):
+            raise AssertionError("serialized")
+    logger = logging.getLogger("test_log_config.lazy")
+    logger.setLevel(logging.INFO)
+    logger.debug("payload %s", LazyJson({"x": Exploding()}))
+
+def test_deferred_queue_handler_keeps_args():
+    q = queue.SimpleQueue()
+    handler = DeferredQueueHandler(q)
+    payload = LazyJson({"a": 1})
+    handler.handle(make_record("payload %s", payload))
+    queued = q.get_nowait()
+    assert queued.args == (payload,)
+    assert queued.msg == "payload %s"
+
+def test_sampling_filter_keeps_fraction_below_warning():
+    sampler = SamplingFilter(parse_sample_rates("mcp_client=0.25"))
+    kept = sum(sampler.filter(make_record("m")) for _ in range(100))
+    assert kept == 25
+    assert sampler.filter(make_record("m", level=logging.ERROR))
+    assert all(sampler.filter(make_record("m", name="a2a")) for _ in range(10))
+
+def test_records_after_shutdown_are_written_not_queued(monkeypatch):
+    root = logging.getLogger()
+    written = []
+    handler = logging.Handler()
+    handler.emit = lambda record: written.append(record.getMessage())
+    monkeypatch.setattr(root, "handlers", [handler])
+    monkeypatch.setattr(root, "level", logging.INFO)
+    monkeypatch.delenv("LOG_QUEUE", raising=False)
+    configure_logging()
+    logging.info("first job")
+    shutdown_logging()
+    assert root.handlers == [handler]
+    # As when a later job runs in the same process
+    logging.info("after shutdown")
+    configure_logging()
+    logging.info("second job")
+    shutdown_logging()
+    assert written == ["first job", "after shutdown", "second job"]
+    assert sum(isinstance(f, RedactingFilter) for f in handler.filters) == 1
@@ -0,0 +1,52 @@
+import asyncio
+import threading
+import time
+
+from loop_monitor import LoopMonitor, start_loop_monitor
+from metrics import LOOP_BLOCKS
+
+def blocking_helper():
+    time.sleep(0.3)
+
+def test_loop_monitor_captures_blocking_stack():
+    async def scenario():
+        monitor = LoopMonitor(interval=0.01, threshold=0.05).start()
+        await asyncio.sleep(0.05)
+        blocking_helper()
+        await asyncio.sleep(0.05)
+        await monitor.stop()
+        return monitor
+
+    before = LOOP_BLOCKS.snapshot()["samples"]
+    monitor = asyncio.run(scenario())
+    assert len(monitor.blocks) == 1
+    assert "blocking_helper" in monitor.blocks[0].stack
+    after = LOOP_BLOCKS.snapshot()["samples"]
+    assert after[0][1] == (before[0][1] if before else 0) + 1
+
+def test_loop_monitor_quiet_without_blocking():
+    async def scenario():
+        monitor = LoopMonitor(interval=0.01, threshold=0.1).start()
+        await asyncio.sleep(0.2)
+        await monitor.stop()
+        return monitor
+
+    assert not asyncio.run(scenario()).blocks
+
+def test_each_loop_gets_its_own_monitor(monkeypatch):
+    monkeypatch.setenv("AGENT_LOOP_MONITOR", "1")
+    async def job():
+        monitor = start_loop_monitor()
+        assert start_loop_monitor() is monitor
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+        return monitor, monitor._loop_thread
+    # Jobs run as threads each run their own loop
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(asyncio.run(job()))) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    (first, first_thread), (second, second_thread) = results
+    assert first is not second and first_thread != second_thread
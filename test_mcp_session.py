@@ -0,0 +1,51 @@
+import asyncio
+import logging
+
+from benchmarks.fake_mcp_server import FakeServerOptions, running_fake_mcp_server
+from mcp_client.keepalive import LivenessManager
+from mcp_client.server import MCPServerSse
+from recovery import RecoveryCoordinator
+
+def cleanup_errors(caplog):
+    return [r.getMessage() for r in caplog.records if r.name == "mcp_client.server" and r.levelno >= logging.ERROR]
+
+def test_sessions_close_cleanly_from_other_tasks(caplog):
+    async def scenario():
+        async with running_fake_mcp_server(FakeServerOptions(tool_count=2)) as url:
+            servers = [MCPServerSse({"url": url}, name=f"trello-{i}") for i in range(2)]
+            for server in servers:
+                await server.connect()
+            result = await servers[0].call_tool("tool_000", {"query": "cards"})
+            # As at job shutdown: every cleanup runs in a task other than the one that connected
+            await asyncio.gather(*(asyncio.wait_for(server.cleanup(), 5) for server in servers))
+            return result, [server.session for server in servers]
+    with caplog.at_level(logging.ERROR):
+        result, sessions = asyncio.run(scenario())
+    assert result.content and sessions == [None, None]
+    assert cleanup_errors(caplog) == []
+
+def test_sessions_reconnected_by_recovery_and_keepalive_close_cleanly(caplog):
+    async def scenario():
+        async with running_fake_mcp_server(FakeServerOptions(tool_count=2)) as url:
+            servers = {name: MCPServerSse({"url": url}, name=name) for name in ["recovered", "kept-alive"]}
+            for server in servers.values():
+                await server.connect()
+                # Fail the next ping so both paths reconnect
+                server.ping = lambda timeout, _server=server: _fail_once(_server)
+            report = await RecoveryCoordinator({"recovered": servers["recovered"]}).recover()
+            keepalive = LivenessManager({"kept-alive": servers["kept-alive"]}, interval=0.01)
+            await keepalive.check()
+            await asyncio.gather(*keepalive._reconnecting.values())
+            results = [await server.call_tool("tool_000", {"query": "cards"}) for server in servers.values()]
+            for server in servers.values():
+                await server.cleanup()
+            return report, results
+    with caplog.at_level(logging.ERROR):
+        report, results = asyncio.run(scenario())
+    assert report.recovered == ["recovered"]
+    assert all(result.content for result in results)
+    assert cleanup_errors(caplog) == []
+
+async def _fail_once(server):
+    del server.ping
+    return False
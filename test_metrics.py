@@ -0,0 +1,44 @@
+import time
+
+from metrics import MetricsAggregator, MetricsPublisher, MetricsRegistry, merge_snapshots, render_prometheus
+
+def make_registry(sessions, latency):
+    registry = MetricsRegistry()
+    registry.gauge("agent_active_sessions", "Voice sessions").inc(sessions)
+    registry.counter("agent_tool_calls_total", "Tool calls", ["server"]).inc(2, server="Trello")
+    registry.histogram("agent_stage_latency_seconds", "Latency", ["stage"], buckets=[0.1, 1.0]).observe(latency, stage="llm")
+    registry.gauge("agent_event_loop_lag_recent_seconds", "Recent lag", merge="max").set(latency / 10)
+    return registry
+
+def test_render_prometheus_text():
+    text = render_prometheus(make_registry(2, 0.5).snapshot())
+    assert "# TYPE agent_active_sessions gauge\nagent_active_sessions 2\n" in text
+    assert 'agent_tool_calls_total{server="Trello"} 2' in text
+    assert 'agent_stage_latency_seconds_bucket{stage="llm",le="0.1"} 0' in text
+    assert 'agent_stage_latency_seconds_bucket{stage="llm",le="1.0"} 1' in text
+    assert 'agent_stage_latency_seconds_bucket{stage="llm",le="+Inf"} 1' in text
+    assert 'agent_stage_latency_seconds_count{stage="llm"} 1' in text
+
+def test_merge_sums_processes():
+    merged = merge_snapshots([make_registry(1, 0.05).snapshot(), make_registry(3, 5.0).snapshot()])
+    assert merged["agent_active_sessions"]["samples"] == [[{}, 4.0]]
+    histogram = merged["agent_stage_latency_seconds"]["samples"][0][1]
+    assert histogram["counts"] == [1, 0, 1]
+    assert histogram["count"] == 2
+    # Lag is per process: merged, it is the worst process's rather than a sum
+    assert merged["agent_event_loop_lag_recent_seconds"]["samples"] == [[{}, 0.5]]
+
+def test_publisher_to_aggregator_over_udp():
+    aggregator = MetricsAggregator("127.0.0.1:0").start()
+    try:
+        host, port = aggregator.addr
+        for worker in ("a", "b"):
+            MetricsPublisher(make_registry(1, 0.5), [f"{host}:{port}"], worker_id=worker).publish()
+        deadline = time.monotonic() + 2
+        while len(aggregator.workers()) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        merged = aggregator.aggregate()
+        assert merged["agent_workers_reporting"]["samples"] == [[{}, 2]]
+        assert merged["agent_active_sessions"]["samples"] == [[{}, 2.0]]
+    finally:
+        aggregator.close()
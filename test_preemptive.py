@@ -0,0 +1,62 @@
+import asyncio
+from types import SimpleNamespace
+
+from preemptive import PreemptiveGenerator, similarity
+
+class FakeChatContext:
+    def __init__(self, items=None):
+        self.items = list(items or [])
+
+    def copy(self):
+        return FakeChatContext(self.items)
+
+    def add_message(self, role, content):
+        self.items.append(SimpleNamespace(id=f"item-{len(self.items)}", type="message", role=role, text_content=content))
+
+async def fake_llm(chat_ctx):
+    yield f"answer to {chat_ctx.items[-1].text_content}"
+
+def transcript(text, is_final):
+    return SimpleNamespace(transcript=text, is_final=is_final)
+
+def make_generator():
+    history = FakeChatContext()
+    generator = PreemptiveGenerator(fake_llm, lambda: history, stable_delay=0.01)
+    return generator, history
+
+async def collect(stream):
+    return [chunk async for chunk in stream]
+
+def test_similarity_ignores_case_and_punctuation():
+    assert similarity("Show my boards.", "show my boards") == 1.0
+    assert similarity("show my boards", "delete my boards") < 0.9
+
+def test_matching_final_transcript_reuses_speculation():
+    async def run():
+        generator, history = make_generator()
+        generator._on_transcribed(transcript("show my boards", is_final=False))
+        await asyncio.sleep(0.05)
+        generator._on_transcribed(transcript("Show my boards.", is_final=True))
+
+        final_ctx = history.copy()
+        final_ctx.add_message(role="user", content="Show my boards.")
+        stream = generator.take(final_ctx)
+        assert stream is not None
+        assert await collect(stream) == ["answer to show my boards"]
+        assert generator.stats.hits == 1
+        assert generator.stats.time_saved > 0
+    asyncio.run(run())
+
+def test_diverging_final_transcript_cancels_speculation():
+    async def run():
+        generator, history = make_generator()
+        generator._on_transcribed(transcript("show my boards", is_final=False))
+        await asyncio.sleep(0.05)
+        generator._on_transcribed(transcript("delete all my cards", is_final=True))
+
+        final_ctx = history.copy()
+        final_ctx.add_message(role="user", content="delete all my cards")
+        assert generator.take(final_ctx) is None
+        assert generator.stats.misses == 1
+        assert generator.stats.hit_rate == 0.0
+    asyncio.run(run())
@@ -0,0 +1,45 @@
+import asyncio
+import time
+
+from recovery import RecoveryCoordinator
+
+class FakeServer:
+    def __init__(self, alive=True, reconnect_delay=0.1, reconnect_error=None):
+        self.alive = alive
+        self.reconnect_delay = reconnect_delay
+        self.reconnect_error = reconnect_error
+        self.reconnects = 0
+
+    async def ping(self, timeout):
+        return self.alive
+
+    async def reconnect(self):
+        self.reconnects += 1
+        await asyncio.sleep(self.reconnect_delay)
+        if self.reconnect_error:
+            raise self.reconnect_error
+        self.alive = True
+
+class FakeA2AServer:
+    pass
+
+def test_only_failed_servers_reconnect_in_parallel():
+    servers = {
+        "healthy": FakeServer(),
+        "dead-1": FakeServer(alive=False, reconnect_delay=0.2),
+        "dead-2": FakeServer(alive=False, reconnect_delay=0.2),
+        "broken": FakeServer(alive=False, reconnect_error=RuntimeError("refused")),
+        "a2a": FakeA2AServer(),
+    }
+    started = time.perf_counter()
+    report = asyncio.run(RecoveryCoordinator(servers).recover())
+    assert time.perf_counter() - started < 0.35
+    assert report.healthy == ["healthy", "a2a"]
+    assert report.recovered == ["dead-1", "dead-2"]
+    assert report.failed == ["broken"]
+    assert servers["healthy"].reconnects == 0
+
+def test_reconnect_is_bounded_by_timeout():
+    servers = {"slow": FakeServer(alive=False, reconnect_delay=5)}
+    report = asyncio.run(RecoveryCoordinator(servers, reconnect_timeout=0.1).recover())
+    assert report.failed == ["slow"]
@@ -0,0 +1,29 @@
+import pytest
+
+from frontend.rooms import CapacityError, LocalRoomService, RoomAllocator, parse_pools
+
+def test_session_mode_gives_each_token_its_own_room():
+    allocator = RoomAllocator(mode="session")
+    assert allocator.allocate().room != allocator.allocate().room
+
+def test_team_rooms_overflow_at_capacity():
+    allocator = RoomAllocator(mode="team", room_capacity=2)
+    rooms = [allocator.allocate(team="Design Team").room for _ in range(3)]
+    assert rooms[0] == rooms[1] == "trello-voice-team-design-team"
+    assert rooms[2] == "trello-voice-team-design-team-2"
+
+def test_pools_balanced_by_load_and_capped():
+    allocator = RoomAllocator(mode="session", pools=parse_pools("small:1,big:3"))
+    pools = [allocator.allocate().pool for _ in range(4)]
+    assert sorted(pools) == ["big", "big", "big", "small"]
+    with pytest.raises(CapacityError):
+        allocator.allocate()
+
+def test_reconcile_frees_ended_rooms():
+    service = LocalRoomService()
+    allocator = RoomAllocator(mode="session", pools={"only": 1}, service=service, join_grace=0)
+    room = allocator.allocate().room
+    service.close_room(room)
+    allocator.reconcile()
+    assert allocator.pool_load() == {"only": (0, 1)}
+    assert allocator.allocate().pool == "only"
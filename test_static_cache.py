@@ -0,0 +1,54 @@
+import gzip
+import os
+import re
+
+from frontend.static_cache import IMMUTABLE, REVALIDATE, StaticAssetCache
+
+def make_site(tmp_path):
+    (tmp_path / "index.html").write_text('<link rel="stylesheet" href="style.css"><script src="script.js"></script>')
+    (tmp_path / "script.js").write_text("console.log('hello');\n" * 50)
+    (tmp_path / "style.css").write_text("body { color: red; }\n" * 50)
+    (tmp_path / "server.py").write_text("# not served")
+    return StaticAssetCache(tmp_path).load()
+
+def test_html_references_fingerprinted_assets(tmp_path):
+    cache = make_site(tmp_path)
+    page = cache.get("/").body.decode()
+    script_ref = re.search(r'src="(script\.[0-9a-f]+\.js)"', page).group(1)
+    fingerprinted = cache.get("/" + script_ref)
+    assert fingerprinted.cache_control == IMMUTABLE
+    assert fingerprinted.body == cache.get("/script.js").body
+    assert cache.get("/script.js").cache_control == REVALIDATE
+    assert cache.get("/server.py") is None
+
+def test_precompressed_representations_and_etags(tmp_path):
+    asset = make_site(tmp_path).get("/script.js")
+    body, encoding, etag = asset.representation("gzip, deflate")
+    assert encoding == "gzip"
+    assert gzip.decompress(body) == asset.body
+    assert asset.matches(etag)
+    assert asset.matches(f'"{asset.etag}"')
+    assert not asset.matches('"0123"')
+    body, encoding, _ = asset.representation("gzip;q=0, identity")
+    assert encoding is None and body == asset.body
+
+def test_dev_mode_reloads_changed_files(tmp_path):
+    cache = make_site(tmp_path)
+    cache.dev_mode = True
+    old_etag = cache.get("/style.css").etag
+    path = tmp_path / "style.css"
+    path.write_text("body { color: blue; }")
+    os.utime(path, (1, 1))
+    assert cache.get("/style.css").etag != old_etag
+    (tmp_path / "new.js").write_text("1")
+    assert cache.get("/new.js").body == b"1"
+
+def test_dev_mode_does_not_reload_for_files_never_served(tmp_path, monkeypatch):
+    cache = make_site(tmp_path)
+    cache.dev_mode = True
+    (tmp_path / ".env").write_text("SECRET=1")
+    loads = []
+    monkeypatch.setattr(cache, "load", lambda: loads.append(1) or cache)
+    for path in ["/server.py", "/.env"]:
+        assert cache.get(path) is None
+    assert loads == []
@@ -0,0 +1,91 @@
+import json
+import typing
+
+import pytest
+import typing_extensions
+
+pytest.importorskip("mcp")
+
+from mcp_client.schema import (
+    drop_null_optionals,
+    json_schema_to_annotation,
+    to_strict_json_schema,
+)
+
+CARD_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string"},
+        "position": {"type": "string", "enum": ["top", "bottom"]},
+        "labels": {"type": "array", "items": {"type": "string"}},
+        "due": {
+            "type": "object",
+            "properties": {
+                "date": {"type": "string"},
+                "complete": {"type": "boolean"},
+            },
+            "required": ["date"],
+        },
+    },
+    "required": ["name"],
+}
+
+def test_strict_schema_marks_all_properties_required():
+    strict = to_strict_json_schema(CARD_SCHEMA)
+    assert strict["additionalProperties"] is False
+    assert strict["required"] == ["name", "position", "labels", "due"]
+    assert strict["properties"]["name"]["type"] == "string"
+    assert strict["properties"]["labels"]["type"] == ["array", "null"]
+    assert strict["properties"]["position"]["enum"] == ["top", "bottom", None]
+
+def test_strict_schema_converts_nested_objects():
+    due = to_strict_json_schema(CARD_SCHEMA)["properties"]["due"]
+    assert due["type"] == ["object", "null"]
+    assert due["additionalProperties"] is False
+    assert due["required"] == ["date", "complete"]
+    assert due["properties"]["complete"]["type"] == ["boolean", "null"]
+
+def test_strict_schema_is_memoized_and_leaves_input_untouched():
+    first = to_strict_json_schema(CARD_SCHEMA)
+    second = to_strict_json_schema(dict(CARD_SCHEMA))
+    assert first is second
+    assert CARD_SCHEMA["required"] == ["name"]
+    assert "additionalProperties" not in CARD_SCHEMA
+
+def test_annotation_keeps_nested_types():
+    strict = to_strict_json_schema(CARD_SCHEMA)
+    props = strict["properties"]
+    assert json_schema_to_annotation(props["name"], "card_name") is str
+    assert json_schema_to_annotation(props["labels"], "card_labels") == typing.Optional[typing.List[str]]
+    assert json_schema_to_annotation(props["position"], "card_position") == typing.Optional[typing.Literal["top", "bottom"]]
+
+    due = typing.get_args(typing.get_args(json_schema_to_annotation(props["due"], "card_due"))[0])[0]
+    assert typing_extensions.is_typeddict(due)
+    assert typing.get_type_hints(due) == {"date": str, "complete": typing.Optional[bool]}
+
+def test_drop_null_optionals_uses_original_schema():
+    args = {"name": "Card", "position": None, "due": {"date": "2026-01-01", "complete": None}}
+    assert drop_null_optionals(args, CARD_SCHEMA) == {"name": "Card", "due": {"date": "2026-01-01"}}
+
+def test_livekit_builds_openai_schemas_for_nested_parameters():
+    pytest.importorskip("livekit.agents")
+    from livekit.agents.llm.utils import (build_legacy_openai_schema, build_strict_openai_schema,
+                                          prepare_function_arguments)
+    from mcp_client.agent_tools import MCPToolsIntegration
+    from mcp_client.util import FunctionTool
+
+    async def invoke(context, input_json):
+        return input_json
+    tool = MCPToolsIntegration._create_decorated_tool(
+        FunctionTool("create_card", "Create a card", to_strict_json_schema(CARD_SCHEMA), invoke))
+
+    strict = build_strict_openai_schema(tool)["function"]["parameters"]
+    assert "run_context" not in strict["properties"]
+    due = strict["properties"]["due"]
+    assert due["type"] == ["object", "null"] and due["required"] == ["date", "complete"]
+    legacy = build_legacy_openai_schema(tool)["function"]["parameters"]
+    assert set(legacy["properties"]) == {"name", "position", "labels", "due"}
+    # And the arguments an LLM sends for it validate
+    _, kwargs = prepare_function_arguments(fnc=tool, json_arguments=json.dumps(
+        {"name": "Card", "position": None, "labels": None, "due": {"date": "2026-01-01", "complete": None}}))
+    assert kwargs["due"] == {"date": "2026-01-01", "complete": None}
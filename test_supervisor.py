@@ -0,0 +1,108 @@
+import time
+import threading
+import http.server
+
+from supervisor import ChildSpec, ManagedProcess, Supervisor, probe, unified_specs
+
+def crash():
+    raise SystemExit(3)
+
+def sleep_forever():
+    time.sleep(60)
+
+def test_restart_backoff_grows_and_resets_when_stable():
+    supervisor = Supervisor([], backoff_base=1, backoff_max=5, stable_after=100)
+    child = ManagedProcess(ChildSpec("agent-0", crash))
+    delays = []
+    for _ in range(5):
+        child.started_at = time.monotonic()
+        supervisor._schedule_restart(child, "exited")
+        delays.append(round(child.next_start - time.monotonic()))
+    assert delays == [1, 2, 4, 5, 5]
+
+    child.started_at = time.monotonic() - 200
+    supervisor._schedule_restart(child, "exited")
+    assert round(child.next_start - time.monotonic()) == 1
+
+def test_crashed_child_is_restarted_after_backoff():
+    supervisor = Supervisor([ChildSpec("agent-0", crash)], backoff_base=0.1)
+    child = supervisor.children[0]
+    supervisor._start(child)
+    child.process.join(5)
+    supervisor.check(child)
+    assert child.process is None and child.restarts == 1
+    time.sleep(0.15)
+    supervisor.check(child)
+    assert child.process is not None
+    child.process.join(5)
+
+def test_unhealthy_child_is_replaced_and_stop_terminates():
+    spec = ChildSpec("agent-0", sleep_forever, health_url="http://127.0.0.1:9/")
+    supervisor = Supervisor([spec], startup_grace=0, max_failures=2, health_timeout=0.2, shutdown_timeout=2)
+    child = supervisor.children[0]
+    supervisor._start(child)
+    first = child.process
+    supervisor.check(child)
+    assert child.process is first and child.failures == 1
+    supervisor.check(child)
+    assert child.process is None and not first.is_alive()
+
+    supervisor._start(child)
+    supervisor._terminate(supervisor.children)
+    assert not child.process.is_alive()
+
+def ignore_sigterm():
+    import signal
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    time.sleep(60)
+
+def test_hung_unhealthy_child_is_killed_after_restart_timeout():
+    spec = ChildSpec("agent-0", ignore_sigterm, health_url="http://127.0.0.1:9/")
+    supervisor = Supervisor([spec], startup_grace=0, max_failures=1, health_timeout=0.2, shutdown_timeout=60,
+                            restart_timeout=0.3)
+    child = supervisor.children[0]
+    supervisor._start(child)
+    hung = child.process
+    time.sleep(0.3)
+    started = time.monotonic()
+    supervisor.check(child)
+    # The long shutdown timeout is for draining at stop, not for blocking the supervision loop
+    assert time.monotonic() - started < 5
+    assert child.process is None and not hung.is_alive()
+
+def test_unified_specs_give_workers_distinct_health_ports(monkeypatch):
+    monkeypatch.setenv("AGENT_WORKERS", "3")
+    monkeypatch.setenv("AGENT_HEALTH_PORT", "9000")
+    specs = unified_specs(sleep_forever, sleep_forever, 8080)
+    assert [s.name for s in specs] == ["frontend", "agent-0", "agent-1", "agent-2"]
+    assert [s.env.get("AGENT_HEALTH_PORT") for s in specs[1:]] == ["9000", "9001", "9002"]
+
+def test_workers_split_prewarmed_processes(monkeypatch):
+    monkeypatch.setenv("AGENT_WORKERS", "4")
+    monkeypatch.delenv("AGENT_IDLE_PROCESSES", raising=False)
+    monkeypatch.setattr("os.cpu_count", lambda: 8)
+    specs = unified_specs(sleep_forever, sleep_forever, 8080)
+    assert [s.env["AGENT_IDLE_PROCESSES"] for s in specs[1:]] == ["2"] * 4
+    monkeypatch.setenv("AGENT_IDLE_PROCESSES", "1")
+    assert unified_specs(sleep_forever, sleep_forever, 8080)[1].env["AGENT_IDLE_PROCESSES"] == "1"
+
+class StatusHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(int(self.path.strip("/")))
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+def test_busy_server_counts_as_alive():
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), StatusHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    try:
+        base = f"http://127.0.0.1:{httpd.server_address[1]}"
+        assert probe(f"{base}/200", 2)
+        assert probe(f"{base}/503", 2)
+        assert not probe(f"{base}/500", 2)
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
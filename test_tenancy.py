@@ -0,0 +1,168 @@
+import asyncio
+import logging
+
+import pytest
+
+from benchmarks.fake_mcp_server import FakeServerOptions, running_fake_mcp_server
+from mcp_client.server import MCPServerSse
+from tenancy import QuotaExceeded, TenantConnectionPool, tenant_env, tenant_from_metadata
+
+class FakeServer:
+    def __init__(self, conf, tenant):
+        self.name = conf["name"]
+        self.tenant = tenant
+        self.session = None
+        self.connected_at = None
+        self.last_used = 0.0
+        self.connects = 0
+        self.closed = False
+        self.cancelled = False
+
+    async def connect(self):
+        self.connects += 1
+        await asyncio.sleep(0.01)
+        self.session = object()
+
+    async def call_tool(self, tool_name, arguments=None):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+
+    async def cleanup(self):
+        self.closed = True
+        self.session = None
+
+def make_pool(**kwargs):
+    built = []
+    def factory(conf, tenant):
+        built.append(FakeServer(conf, tenant))
+        return built[-1]
+    return TenantConnectionPool(factory=factory, idle_ttl=0, **kwargs), built
+
+def test_tenant_from_metadata():
+    assert tenant_from_metadata("", '{"tenant": "Acme Corp"}') == "acme_corp"
+    assert tenant_from_metadata("not json", {"team": "ops"}) == "ops"
+    assert tenant_from_metadata('{"tenant": ""}', "[1]", None) is None
+
+def test_tenant_env_does_not_borrow_global_secrets(monkeypatch):
+    monkeypatch.setenv("TRELLO_TOKEN", "global")
+    monkeypatch.setenv("TRELLO_TOKEN__ACME", "acme")
+    monkeypatch.delenv("TENANT_SHARED_SECRETS", raising=False)
+    assert tenant_env("acme")("TRELLO_TOKEN") == "acme"
+    assert tenant_env(None)("TRELLO_TOKEN") == "global"
+    assert tenant_env("other")("TRELLO_TOKEN") == ""
+    monkeypatch.setenv("TENANT_SHARED_SECRETS", "1")
+    assert tenant_env("other")("TRELLO_TOKEN") == "global"
+
+def test_jobs_of_a_tenant_share_sessions():
+    async def scenario():
+        pool, built = make_pool()
+        conf = {"name": "trello", "url": "http://trello"}
+        first, second, other = pool.server("acme", conf), pool.server("acme", conf), pool.server("other", conf)
+        await asyncio.gather(first.connect(), second.connect(), other.connect())
+        sessions = pool.sessions()
+        await pool.close()
+        return built, sessions
+    built, sessions = asyncio.run(scenario())
+    assert sorted(sessions) == [("acme", "trello"), ("other", "trello")]
+    assert sorted((s.tenant, s.connects) for s in built) == [("acme", 1), ("other", 1)]
+
+def test_tenant_quota_evicts_idle_sessions_and_refuses_busy_ones():
+    async def scenario():
+        pool, built = make_pool(max_per_tenant=1)
+        board = pool.server("acme", {"name": "board", "url": "http://board"})
+        await board.connect()
+        with pytest.raises(QuotaExceeded):
+            await pool.server("acme", {"name": "cards", "url": "http://cards"}).connect()
+        # Other tenants have their own quota
+        await pool.server("other", {"name": "cards", "url": "http://cards"}).connect()
+        await board.cleanup()
+        await pool.server("acme", {"name": "cards", "url": "http://cards"}).connect()
+        await asyncio.sleep(0.01)
+        sessions, closed = pool.sessions(), [s.name for s in built if s.closed]
+        await pool.close()
+        return sessions, closed
+    sessions, closed = asyncio.run(scenario())
+    assert closed == ["board"]
+    assert sorted(sessions) == [("acme", "cards"), ("other", "cards")]
+
+def test_stream_cap_evicts_least_recently_used():
+    async def scenario():
+        pool, built = make_pool(max_streams=2)
+        conf = {"name": "trello", "url": "http://trello"}
+        for tenant in ["a", "b", "a"]:
+            server = pool.server(tenant, conf)
+            await server.connect()
+            await server.cleanup()
+        await pool.server("c", conf).connect()
+        await asyncio.sleep(0.01)
+        sessions, closed = pool.sessions(), [s.tenant for s in built if s.closed]
+        await pool.close()
+        return sessions, closed
+    sessions, closed = asyncio.run(scenario())
+    assert sessions == [("a", "trello"), ("c", "trello")]
+    assert closed == ["b"]
+
+def test_idle_sessions_are_closed_after_ttl():
+    async def scenario():
+        pool, built = make_pool()
+        pool.idle_ttl = 0.05
+        server = pool.server("acme", {"name": "trello", "url": "http://trello"})
+        await server.connect()
+        await server.cleanup()
+        await pool.evict_idle()
+        kept = pool.sessions()
+        await asyncio.sleep(0.06)
+        await pool.evict_idle()
+        await asyncio.sleep(0.01)
+        evicted, closed = pool.sessions(), built[0].closed
+        await pool.close()
+        return kept, evicted, closed
+    kept, evicted, closed = asyncio.run(scenario())
+    assert kept == [("acme", "trello")] and evicted == []
+    assert closed
+
+def test_cancelling_a_call_cancels_it_on_the_pool_loop():
+    async def scenario():
+        pool, built = make_pool()
+        server = pool.server("acme", {"name": "trello", "url": "http://trello"})
+        call = asyncio.create_task(server.call_tool("get_board"))
+        await asyncio.sleep(0.05)
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        await asyncio.sleep(0.01)
+        await pool.close()
+        return built
+    built = asyncio.run(scenario())
+    assert built[0].cancelled
+
+def test_pooled_sessions_against_a_real_server_close_cleanly(caplog):
+    async def scenario():
+        async with running_fake_mcp_server(FakeServerOptions(tool_count=2)) as url:
+            pool = TenantConnectionPool(factory=lambda conf, tenant: MCPServerSse({"url": url}, name=f"{tenant}-trello"),
+                                        max_streams=2, idle_ttl=0)
+            conf = {"name": "trello", "url": url}
+            results = []
+            # Three tenants through two streams: each job's session is evicted from another job's task
+            for tenant in ["a", "b", "c", "a"]:
+                server = pool.server(tenant, conf)
+                results.append(await server.call_tool("tool_000", {"query": tenant}))
+                await server.cleanup()
+            late = pool.server("b", conf)
+            await late.connect()
+            await pool.close()
+            # A job still holding a session when the pool closes fails fast rather than waiting forever
+            with pytest.raises(RuntimeError):
+                await asyncio.wait_for(late.call_tool("tool_001", {"query": "b"}), 5)
+            await late.cleanup()
+            await pool.close()
+            return results
+    with caplog.at_level(logging.WARNING):
+        results = asyncio.run(scenario())
+    assert all(result.content for result in results)
+    assert [r.getMessage() for r in caplog.records
+            if r.name in ("mcp_client.server", "tenancy") and r.levelno >= logging.ERROR] == []
+    assert not [r for r in caplog.records if "Failed to close pooled" in r.getMessage()]
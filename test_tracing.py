@@ -0,0 +1,55 @@
+import contextvars
+import json
+
+import pytest
+
+from tracing import JsonlSpanExporter, Tracer
+
+def test_spans_share_turn_trace_and_nest():
+    tracer = Tracer()
+    finished = []
+    tracer.add_listener(finished.append)
+    trace_id = tracer.begin_turn()
+    with tracer.span("tool", tool="get_cards"):
+        with tracer.span("mcp.call_tool", server="Trello"):
+            pass
+    inner, outer = finished
+    assert inner.trace_id == outer.trace_id == trace_id
+    assert inner.parent_id == outer.span_id
+    assert outer.attributes == {"tool": "get_cards"}
+
+def test_spans_outside_a_turn_do_not_join_another_sessions_trace():
+    tracer = Tracer()
+    finished = []
+    tracer.add_listener(finished.append)
+    def outside_turn():
+        with tracer.span("mcp.connect"):
+            pass
+        tracer.record("llm", 0.1)
+    # Another session's turn, then spans from a context with no turn
+    trace_id = contextvars.Context().run(tracer.begin_turn)
+    contextvars.Context().run(outside_turn)
+    assert trace_id not in [span.trace_id for span in finished]
+    assert finished[0].trace_id != finished[1].trace_id
+
+def test_failed_span_is_marked_and_summarized():
+    tracer = Tracer()
+    with pytest.raises(RuntimeError):
+        with tracer.span("mcp.connect"):
+            raise RuntimeError("boom")
+    for duration in (0.1, 0.2, 0.3):
+        tracer.record("tts.first_byte", duration)
+    summary = tracer.summary()
+    assert summary["mcp.connect"]["count"] == 1
+    assert summary["tts.first_byte"]["p50_ms"] == 200.0
+    assert summary["tts.first_byte"]["p99_ms"] == 300.0
+
+def test_jsonl_export(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    tracer = Tracer([JsonlSpanExporter(str(path))], flush_interval=0.01)
+    tracer.record("llm", 0.5, tool_call=True)
+    tracer.shutdown()
+    span = json.loads(path.read_text().splitlines()[0])
+    assert span["name"] == "llm"
+    assert span["duration_ms"] == 500.0
+    assert span["attributes"] == {"tool_call": True}
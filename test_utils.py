@@ -0,0 +1,8 @@
+from utils import percentile
+
+def test_percentile_is_nearest_rank():
+    values = [0.5, 0.1, 0.4, 0.2, 0.3]
+    assert percentile(values, 50) == 0.3
+    assert percentile(values, 90) == percentile(values, 99) == 0.5
+    assert percentile(values, 0) == 0.1
+    assert percentile([], 50) is None
@@ -1,15 +1,159 @@
 """
 tool_integration.py
 
-Handles dynamic tool preparation and MCPToolsIntegration patching for both MCP and A2A servers.
+Builds MCP and A2A servers from their configuration and handles dynamic tool preparation and MCPToolsIntegration
+patching for both.
 """
 
 import fnmatch
 import logging
+from mcp_client import MCPClient, MCPServerSse
 from mcp_client.agent_tools import MCPToolsIntegration
-from a2a import A2AServerConfig, send_a2a_task
+from mcp_config import expand_env_vars
+from tenancy import tenant_env
+from a2a import A2AServerConfig
+from a2a_fanout import A2AFanout
 import re
 
+def build_order(configs):
+    """Config entries in build order: fan-outs after the servers they reference."""
+    return sorted(configs, key=lambda conf: conf.get("type") == "a2a_fanout")
+
+def build_server(conf, servers=None, tenant=None, pool=None):
+    """
+    Create the (unconnected) MCP or A2A server for one entry of mcp_servers.yaml. An `a2a_fanout` entry groups
+    A2A servers from `servers` (built servers by name) listed in its `members`.
+    Credentials are read for `tenant` (see tenancy.tenant_env). With a TenantConnectionPool, MCP servers take
+    their session from `pool`.
+    Raises ValueError for an unknown server type or fan-out member.
+    """
+    server_type = conf.get("type", "mcp")
+    if server_type == "a2a_fanout":
+        members = []
+        for member in conf.get("members", []):
+            server = (servers or {}).get(member)
+            if not isinstance(server, A2AServerConfig):
+                raise ValueError(f"Fan-out '{conf.get('name', '')}' member '{member}' is not a configured A2A server")
+            members.append(server)
+        return A2AFanout(conf.get("name", ""), members, deadline=float(conf.get("deadline", 10)),
+                         description=conf.get("description"))
+    if pool is not None and server_type == "mcp":
+        return pool.server(tenant, conf)
+    env = tenant_env(tenant)
+    headers = {}
+    for k, v in conf.get("headers", {}).items():
+        headers[k] = expand_env_vars(v, env)
+    server_name = conf.get("name", "")
+    server_url = conf["url"]
+
+    if server_type == "mcp":
+        # Existing MCP logic (with/without auth)
+        if "auth" in conf:
+            env_var_name = conf["auth"].get("env_var", "")
+            secret_key = env(env_var_name)
+            if secret_key:
+                logging.info(f"Using {env_var_name} for authentication with {server_name}")
+                return MCPClient(
+                    url=server_url,
+                    secret_key=secret_key,
+                    headers=headers,
+                    name=server_name
+                ).server
+            logging.warning(f"{env_var_name} not set, authentication will not be used for {server_name}")
+        return MCPServerSse(
+            params={"url": server_url, "headers": headers},
+            cache_tools_list=True,
+            name=server_name
+        )
+    if server_type == "a2a":
+        # Only set Authorization header if auth is enabled in config
+        env_var_name = conf.get("auth", {}).get("env_var")
+        if env_var_name:
+            jwt_token = env(env_var_name)
+            if jwt_token:
+                headers["Authorization"] = f"Bearer {jwt_token}"
+                logging.info(f"Using {env_var_name} for authentication with A2A server '{server_name}'")
+            else:
+                logging.warning(f"JWT env var '{env_var_name}' is configured for '{server_name}' but not set in environment.")
+        else:
+            # Ensure no Authorization header is present if auth is not enabled
+            headers.pop("Authorization", None)
+        return A2AServerConfig(
+            base_url=server_url,
+            headers=headers,
+            name=server_name
+        )
+    raise ValueError(f"Unknown server type: {server_type}")
+
+async def prepare_server_tools(server, allowed=None, convert_schemas_to_strict=True):
+    """
+    Prepare the decorated tools of one MCP or A2A server, keeping only MCP tools matching the `allowed` patterns
+    (all tools when None).
+    """
+    prepared_tools = []
+    if isinstance(server, A2AFanout):
+        from mcp_client.util import FunctionTool
+        import json
+        async def on_invoke_fanout(context, input_json, _server=server):
+            args = json.loads(input_json) if input_json else {}
+            return await _server.send_task(args.get("prompt", ""))
+        ft = FunctionTool(
+            name=re.sub(r'[^a-zA-Z0-9_-]', '_', server.name),
+            description=server.description,
+            params_json_schema={
+                "type": "object",
+                "properties": {
+                    "prompt": {"type": "string", "description": "Prompt sent to every agent in the group"}
+                },
+                "required": ["prompt"]
+            },
+            on_invoke_tool=on_invoke_fanout,
+            strict_json_schema=False,
+        )
+        return [MCPToolsIntegration._create_decorated_tool(ft)]
+    # Branch for A2AServerConfig
+    if isinstance(server, A2AServerConfig):
+        skills = await server.list_tools()
+        from mcp_client.util import FunctionTool
+        import json
+        for skill in skills:
+            # Minimal JSON schema: one string parameter 'prompt'
+            params_json_schema = {
+                "type": "object",
+                "properties": {
+                    "prompt": {"type": "string", "description": "Prompt for the A2A skill"}
+                },
+                "required": ["prompt"]
+            }
+            async def on_invoke_tool(context, input_json, _server=server, _skill=skill):
+                args = json.loads(input_json) if input_json else {}
+                prompt = args.get("prompt", "")
+                return await _server.send_task(prompt)
+            ft = FunctionTool(
+                name=re.sub(r'[^a-zA-Z0-9_-]', '_', skill.get("name", skill.get("id", "unknown_skill"))),
+                description=skill.get("description", ""),
+                params_json_schema=params_json_schema,
+                on_invoke_tool=on_invoke_tool,
+                strict_json_schema=False,
+            )
+            decorated_tool = MCPToolsIntegration._create_decorated_tool(ft)
+            prepared_tools.append(decorated_tool)
+        return prepared_tools
+    # MCP logic (unchanged)
+    tools = await server.list_tools()
+    if allowed is not None:
+        allowed_patterns = list(allowed)
+        tools = [t for t in tools if any(fnmatch.fnmatch(t.name, pat) for pat in allowed_patterns)]
+    from mcp_client.util import MCPUtil
+    mcp_tools = [MCPUtil.to_function_tool(t, server, convert_schemas_to_strict) for t in tools]
+    for tool_instance in mcp_tools:
+        try:
+            decorated_tool = MCPToolsIntegration._create_decorated_tool(tool_instance)
+            prepared_tools.append(decorated_tool)
+        except Exception as e:
+            logging.getLogger("mcp-agent-tools").error(f"Failed to prepare tool '{tool_instance.name}': {e}")
+    return prepared_tools
+
 # Patch MCPToolsIntegration to filter tools per server
 async def filtered_prepare_dynamic_tools(mcp_servers, allowed_tools_map, convert_schemas_to_strict=True, auto_connect=True):
     """
@@ -18,47 +162,6 @@ async def filtered_prepare_dynamic_tools(mcp_servers, allowed_tools_map, convert
     """
     prepared_tools = []
     for server in mcp_servers:
-        name = getattr(server, "name", None)
-        allowed = allowed_tools_map.get(name)
-        # Branch for A2AServerConfig
-        if isinstance(server, A2AServerConfig):
-            skills = await server.list_tools()
-            from mcp_client.util import FunctionTool
-            import json
-            for skill in skills:
-                # Minimal JSON schema: one string parameter 'prompt'
-                params_json_schema = {
-                    "type": "object",
-                    "properties": {
-                        "prompt": {"type": "string", "description": "Prompt for the A2A skill"}
-                    },
-                    "required": ["prompt"]
-                }
-                async def on_invoke_tool(context, input_json, _server=server, _skill=skill):
-                    args = json.loads(input_json) if input_json else {}
-                    prompt = args.get("prompt", "")
-                    return send_a2a_task(_server.base_url, prompt, headers=_server.headers)
-                ft = FunctionTool(
-                    name=re.sub(r'[^a-zA-Z0-9_-]', '_', skill.get("name", skill.get("id", "unknown_skill"))),
-                    description=skill.get("description", ""),
-                    params_json_schema=params_json_schema,
-                    on_invoke_tool=on_invoke_tool,
-                    strict_json_schema=False,
-                )
-                decorated_tool = MCPToolsIntegration._create_decorated_tool(ft)
-                prepared_tools.append(decorated_tool)
-            continue
-        # MCP logic (unchanged)
-        tools = await server.list_tools()
-        if allowed is not None:
-            allowed_patterns = list(allowed)
-            tools = [t for t in tools if any(fnmatch.fnmatch(t.name, pat) for pat in allowed_patterns)]
-        from mcp_client.util import MCPUtil
-        mcp_tools = [MCPUtil.to_function_tool(t, server, convert_schemas_to_strict) for t in tools]
-        for tool_instance in mcp_tools:
-            try:
-                decorated_tool = MCPToolsIntegration._create_decorated_tool(tool_instance)
-                prepared_tools.append(decorated_tool)
-            except Exception as e:
-                logging.getLogger("mcp-agent-tools").error(f"Failed to prepare tool '{tool_instance.name}': {e}")
-    return prepared_tools 
\ No newline at end of file
+        allowed = allowed_tools_map.get(getattr(server, "name", None))
+        prepared_tools.extend(await prepare_server_tools(server, allowed, convert_schemas_to_strict))
+    return prepared_tools
@@ -0,0 +1,310 @@
+"""
+tracing.py
+
+Records per-turn latency spans for each stage of a voice turn (STT, LLM, tool calls, MCP transport, TTS),
+exports them from a background thread to a rotating JSONL file and/or an OTLP/HTTP JSON collector, and
+summarizes p50/p95/p99 per stage.
+"""
+
+import os
+import json
+import atexit
+import asyncio
+import time
+import uuid
+import queue
+import logging
+import threading
+import urllib.request
+import logging.handlers
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from utils import percentile
+
+logger = logging.getLogger(__name__)
+
+_current_turn: ContextVar[Optional[str]] = ContextVar("current_turn", default=None)
+_current_span: ContextVar[Optional[str]] = ContextVar("current_span", default=None)
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start: float
+    duration: float = 0.0
+    status: str = "ok"
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start,
+            "duration_ms": round(self.duration * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class JsonlSpanExporter:
+    """Writes one JSON span per line to a size-rotated file."""
+
+    def __init__(self, path: str, max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5):
+        self._handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        self._handler.setFormatter(logging.Formatter("%(message)s"))
+
+    def export(self, spans: List[Span]) -> None:
+        for span in spans:
+            self._handler.emit(logging.makeLogRecord({"msg": json.dumps(span.to_dict(), default=str)}))
+
+    def shutdown(self) -> None:
+        self._handler.close()
+
+
+class OtlpHttpSpanExporter:
+    """Posts spans to an OTLP/HTTP collector using the JSON encoding."""
+
+    def __init__(self, endpoint: str, service_name: str = "trello-voice-agent", headers: Optional[Dict[str, str]] = None,
+                 timeout: float = 5.0):
+        self.endpoint = endpoint if endpoint.endswith("/v1/traces") else endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.timeout = timeout
+
+    @staticmethod
+    def _attribute(key: str, value: Any) -> Dict[str, Any]:
+        if isinstance(value, bool):
+            return {"key": key, "value": {"boolValue": value}}
+        if isinstance(value, int):
+            return {"key": key, "value": {"intValue": str(value)}}
+        if isinstance(value, float):
+            return {"key": key, "value": {"doubleValue": value}}
+        return {"key": key, "value": {"stringValue": str(value)}}
+
+    def _encode(self, spans: List[Span]) -> bytes:
+        otlp_spans = []
+        for span in spans:
+            start_ns = int(span.start * 1e9)
+            otlp_span = {
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": str(start_ns),
+                "endTimeUnixNano": str(start_ns + int(span.duration * 1e9)),
+                "attributes": [self._attribute(k, v) for k, v in span.attributes.items()],
+                "status": {"code": 2 if span.status == "error" else 1, "message": span.status},
+            }
+            if span.parent_id:
+                otlp_span["parentSpanId"] = span.parent_id
+            otlp_spans.append(otlp_span)
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [self._attribute("service.name", self.service_name)]},
+                "scopeSpans": [{"scope": {"name": "tracing"}, "spans": otlp_spans}],
+            }]
+        }
+        return json.dumps(payload).encode("utf-8")
+
+    def export(self, spans: List[Span]) -> None:
+        request = urllib.request.Request(self.endpoint, data=self._encode(spans), headers=self.headers, method="POST")
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+    def shutdown(self) -> None:
+        return
+
+
+class Tracer:
+    """
+    Collects spans and hands them to exporters on a background thread.
+
+    Spans of the same user turn share a trace id, set with begin_turn() and carried by a context variable;
+    nested spans record their parent. A bounded window of recent durations per stage feeds summary().
+    """
+
+    def __init__(self, exporters: Optional[list] = None, window: int = 1000, batch_size: int = 256,
+                 flush_interval: float = 1.0):
+        self.exporters = exporters or []
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._durations: Dict[str, deque] = defaultdict(lambda: deque(maxlen=window))
+        self._in_flight: Dict[str, int] = defaultdict(int)
+        self._listeners: List[Callable[[Span], None]] = []
+        self._queue: "queue.SimpleQueue[Optional[Span]]" = queue.SimpleQueue()
+        self._worker: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def begin_turn(self) -> str:
+        """Start a new trace for a user turn. Returns the trace id."""
+        trace_id = uuid.uuid4().hex
+        _current_turn.set(trace_id)
+        return trace_id
+
+    def _trace_id(self) -> str:
+        # Spans outside any turn's context (connects, keepalive pings, pooled calls) get a trace of their own rather
+        # than joining whichever session last started a turn
+        return _current_turn.get() or uuid.uuid4().hex
+
+    def add_listener(self, listener: Callable[[Span], None]) -> None:
+        """Register a callback invoked with every finished span."""
+        self._listeners.append(listener)
+
+    def in_flight(self, name: str) -> int:
+        return self._in_flight[name]
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """
+        Time a block of code as a span. Yields the Span so attributes can be added while it runs.
+        Exceptions mark the span as 'error', cancellation as 'cancelled'.
+        """
+        span = Span(
+            name=name,
+            trace_id=self._trace_id(),
+            span_id=uuid.uuid4().hex[:16],
+            parent_id=_current_span.get(),
+            start=time.time(),
+            attributes=attributes,
+        )
+        token = _current_span.set(span.span_id)
+        self._in_flight[name] += 1
+        started = time.perf_counter()
+        try:
+            yield span
+        except (asyncio.CancelledError, GeneratorExit):
+            span.status = "cancelled"
+            raise
+        except Exception as e:
+            span.status = "error"
+            span.attributes.setdefault("error", str(e)[:200])
+            raise
+        finally:
+            span.duration = time.perf_counter() - started
+            self._in_flight[name] -= 1
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Async generators can be finalized in a different context
+                pass
+            self._finish(span)
+
+    def record(self, name: str, duration: float, **attributes) -> None:
+        """Record a stage whose duration was measured elsewhere (e.g. LiveKit metrics events)."""
+        self._finish(Span(
+            name=name,
+            trace_id=self._trace_id(),
+            span_id=uuid.uuid4().hex[:16],
+            parent_id=None,
+            start=time.time() - duration,
+            duration=duration,
+            attributes=attributes,
+        ))
+
+    def _finish(self, span: Span) -> None:
+        self._durations[span.name].append(span.duration)
+        for listener in self._listeners:
+            try:
+                listener(span)
+            except Exception as e:
+                logger.error(f"Span listener failed: {e}")
+        if self.exporters:
+            self._ensure_worker()
+            self._queue.put(span)
+
+    def _ensure_worker(self) -> None:
+        if self._worker is not None:
+            return
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._export_loop, name="span-exporter", daemon=True)
+                self._worker.start()
+
+    def _export_loop(self) -> None:
+        batch: List[Span] = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            stop = False
+            try:
+                span = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                if span is None:
+                    stop = True
+                else:
+                    batch.append(span)
+            except queue.Empty:
+                pass
+            if batch and (stop or len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._export(batch)
+                batch = []
+            if time.monotonic() >= deadline:
+                deadline = time.monotonic() + self.flush_interval
+            if stop:
+                return
+
+    def _export(self, batch: List[Span]) -> None:
+        for exporter in self.exporters:
+            try:
+                exporter.export(batch)
+            except Exception as e:
+                logger.warning(f"Span export to {type(exporter).__name__} failed: {e}")
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Flush pending spans and stop the export thread."""
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join(timeout)
+            self._worker = None
+        for exporter in self.exporters:
+            exporter.shutdown()
+
+    def summary(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """
+        Returns count and p50/p95/p99 (milliseconds) per stage over the recent window.
+        """
+        result = {}
+        for name, durations in list(self._durations.items()):
+            values = list(durations)
+            result[name] = {
+                "count": len(values),
+                **{f"p{p}_ms": round(percentile(values, p) * 1000, 1) if values else None for p in (50, 95, 99)},
+            }
+        return result
+
+
+def tracer_from_env() -> Tracer:
+    """
+    Build the process tracer. AGENT_TRACE_FILE enables the JSONL exporter (rotated at AGENT_TRACE_MAX_BYTES,
+    keeping AGENT_TRACE_BACKUPS files); AGENT_TRACE_OTLP_ENDPOINT enables the OTLP/HTTP exporter.
+    Returns the tracer.
+    """
+    exporters = []
+    trace_file = os.environ.get("AGENT_TRACE_FILE")
+    if trace_file:
+        exporters.append(JsonlSpanExporter(
+            trace_file,
+            max_bytes=int(os.environ.get("AGENT_TRACE_MAX_BYTES", str(10 * 1024 * 1024))),
+            backup_count=int(os.environ.get("AGENT_TRACE_BACKUPS", "5")),
+        ))
+    otlp_endpoint = os.environ.get("AGENT_TRACE_OTLP_ENDPOINT")
+    if otlp_endpoint:
+        exporters.append(OtlpHttpSpanExporter(
+            otlp_endpoint,
+            service_name=os.environ.get("OTEL_SERVICE_NAME", "trello-voice-agent"),
+        ))
+    return Tracer(exporters)
+
+
+tracer = tracer_from_env()
+# Jobs shut the tracer down when they end; jobs run as threads share it, so it is also flushed at exit
+atexit.register(tracer.shutdown)
@@ -4,11 +4,33 @@ utils.py
 Provides utility functions for the agent system.
 """
 
+import math
 import re
+from typing import Optional, Sequence
 
 def sanitize_tool_name(name: str) -> str:
     """
     Sanitize a tool name by replacing non-alphanumeric, non-underscore, and non-hyphen characters with underscores.
     Returns the sanitized tool name.
     """
-    return re.sub(r'[^a-zA-Z0-9_-]', '_', name) 
\ No newline at end of file
+    return re.sub(r'[^a-zA-Z0-9_-]', '_', name) 
+
+FILLER_WORDS = {"um", "uh", "er", "erm", "hmm", "please"}
+
+def normalize_utterance(text: str) -> str:
+    """
+    Normalize a spoken utterance for comparison: lowercase, strip punctuation and filler words, collapse whitespace.
+    Returns the normalized utterance.
+    """
+    words = re.sub(r"[^\w\s']", " ", text.lower()).split()
+    return " ".join(w for w in words if w not in FILLER_WORDS)
+
+def percentile(values: Sequence[float], pct: float) -> Optional[float]:
+    """
+    Nearest-rank percentile of the values.
+    Returns None when there are none.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))]